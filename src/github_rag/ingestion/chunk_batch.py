@@ -0,0 +1,159 @@
+from array import array
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+# Per-chunk numeric metadata, stored in typed arrays instead of dicts
+CHUNK_FIELDS = ('chunk_index', 'start_line', 'end_line', 'token_count')
+
+
+class ChunkView(Mapping):
+    """Read-only ``{'content', 'metadata'}`` view of one chunk in a ChunkBatch.
+
+    Code written for chunk dicts (vector stores, validators, the UI) keeps
+    working: ``chunk['content']`` and ``chunk['metadata'][...]`` build their
+    values on access, so only two references are held per view. The
+    metadata is a read-only mapping, since changes to a rebuilt dict would
+    be silently lost; use copy() for a mutable chunk dict.
+    """
+
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch: 'ChunkBatch', index: int):
+        self._batch = batch
+        self._index = index
+
+    def __getitem__(self, key: str):
+        if key == 'content':
+            return self._batch.contents[self._index]
+        if key == 'metadata':
+            return MappingProxyType(self._batch.metadata(self._index))
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(('content', 'metadata'))
+
+    def __len__(self) -> int:
+        return 2
+
+    def copy(self) -> Dict:
+        """A plain (mutable) chunk dict."""
+        return {'content': self['content'], 'metadata': self._batch.metadata(self._index)}
+
+    def __repr__(self) -> str:
+        return f"ChunkView({self._batch.metadata(self._index)!r})"
+
+
+class ChunkBatch:
+    """Compact, column-oriented store for many chunks.
+
+    File-level metadata (path, name, URL, SHA, ...) is kept once per file in
+    ``files``; each chunk stores its content string, an index into that
+    table, and its numeric fields in ``array('l')`` columns. Iterating or
+    indexing yields ChunkView objects that behave like the chunk dicts
+    produced by Chunker.
+    """
+
+    def __init__(self, chunks: Optional[Iterable[Dict]] = None):
+        """
+        Create a batch, optionally filled from chunk dicts.
+
+        Args:
+            chunks: Chunk dicts (or views) to add
+        """
+        self.files: List[Dict[str, str]] = []
+        self._file_ids: Dict[tuple, int] = {}
+        self.contents: List[str] = []
+        self.file_index = array('l')
+        self.columns = {field: array('l') for field in CHUNK_FIELDS}
+        self._extras: Dict[int, Dict] = {}  # rare per-chunk metadata that differs from the file's
+        if chunks is not None:
+            self.extend(chunks)
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __iter__(self) -> Iterator[ChunkView]:
+        return (ChunkView(self, i) for i in range(len(self.contents)))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ChunkView, List[ChunkView]]:
+        if isinstance(index, slice):
+            return [ChunkView(self, i) for i in range(*index.indices(len(self.contents)))]
+        if index < 0:
+            index += len(self.contents)
+        if not 0 <= index < len(self.contents):
+            raise IndexError(index)
+        return ChunkView(self, index)
+
+    def __getattr__(self, name: str) -> array:
+        """Numeric columns as attributes, e.g. ``batch.token_count``."""
+        columns = self.__dict__.get('columns', {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def _file_id(self, metadata: Dict) -> int:
+        key = (metadata.get('file_path'), metadata.get('file_sha'))
+        file_id = self._file_ids.get(key)
+        if file_id is None:
+            file_id = len(self.files)
+            self.files.append({k: v for k, v in metadata.items() if k not in CHUNK_FIELDS})
+            self._file_ids[key] = file_id
+        return file_id
+
+    def add_file(self, metadata: Dict) -> None:
+        """Register a processed file, so ``files`` lists it even if it has no chunks."""
+        self._file_id(metadata)
+
+    def append(self, chunk: Dict) -> None:
+        """Add one chunk dict (or view)."""
+        metadata = chunk['metadata']
+        file_id = self._file_id(metadata)
+        index = len(self.contents)
+
+        self.contents.append(chunk['content'])
+        self.file_index.append(file_id)
+        for field, column in self.columns.items():
+            column.append(int(metadata.get(field, 0)))
+
+        file_metadata = self.files[file_id]
+        extras = {
+            k: v for k, v in metadata.items()
+            if k not in CHUNK_FIELDS and (k not in file_metadata or file_metadata[k] != v)
+        }
+        if extras:
+            self._extras[index] = extras
+
+    def extend(self, chunks: Iterable[Dict]) -> None:
+        """Add many chunk dicts (or views)."""
+        for chunk in chunks:
+            self.append(chunk)
+
+    def metadata(self, index: int) -> Dict:
+        """Full metadata dict for one chunk, as Chunker would have produced it."""
+        metadata = dict(self.files[self.file_index[index]])
+        for field, column in self.columns.items():
+            metadata[field] = column[index]
+        extras = self._extras.get(index)
+        if extras:
+            metadata.update(extras)
+        return metadata
+
+    def select(self, indices: Iterable[int]) -> 'ChunkBatch':
+        """New batch holding the chunks at ``indices``; the file table is shared, not copied."""
+        selected = ChunkBatch()
+        selected.files = self.files
+        selected._file_ids = self._file_ids
+        for i in indices:
+            new_index = len(selected.contents)
+            selected.contents.append(self.contents[i])
+            selected.file_index.append(self.file_index[i])
+            for field, column in self.columns.items():
+                selected.columns[field].append(column[i])
+            if i in self._extras:
+                selected._extras[new_index] = self._extras[i]
+        return selected
+
+    def to_dicts(self) -> List[Dict]:
+        """Expand into plain chunk dicts."""
+        return [view.copy() for view in self]
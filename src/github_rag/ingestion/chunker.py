@@ -1,6 +1,11 @@
-from typing import List, Dict
-import tiktoken
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional
+from github_rag.ingestion.structure_splitter import Block, STRUCTURE_SPLITTERS
 from github_rag.utils.config import get_chunking_config
+from github_rag.utils.token_estimator import get_token_estimator
+from github_rag.utils.tokenizer import get_tokenizer
 
 
 class Chunker:
@@ -11,16 +16,23 @@ class Chunker:
         config = get_chunking_config()
         self.chunk_size = config.get("chunk_size", 1000)
         self.chunk_overlap = config.get("chunk_overlap", 200)
-        self.encoder = tiktoken.get_encoding("cl100k_base")  # OpenAI's encoding
+        self.splitters = config.get("splitters", {})  # extension -> structure splitter name
+        self.tokenizer = get_tokenizer()  # Shared encoder and token count cache
+        self.encoder = self.tokenizer.encoder
+        self.estimator = get_token_estimator(self.tokenizer)  # None when [tokenizer] estimate is off
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text using OpenAI's tokenizer."""
-        return len(self.encoder.encode(text))
+        return self.tokenizer.count(text)
     
     def split_by_lines(self, content: str, metadata: Dict[str, str]) -> List[Dict[str, any]]:
         """
         Split content into chunks by lines, respecting token limits.
         
+        The file is tokenized once. Each line's token span is found from
+        the token byte offsets, so packing lines, sizing the overlap and
+        counting chunk tokens are prefix-sum lookups instead of re-encoding.
+        
         Args:
             content: Normalized file content
             metadata: File metadata
@@ -28,114 +40,418 @@ class Chunker:
         Returns:
             List of chunk dictionaries with content and metadata
         """
+        single = self._single_chunk(content, metadata)
+        if single is not None:
+            return single
+        
         lines = content.split('\n')
+        layout = self._line_token_spans(content, lines, metadata)
         chunks = []
-        current_chunk = []
-        current_tokens = 0
+        self._split_line_range(lines, layout, 0, len(lines), metadata, chunks)
+        return chunks
+    
+    def split_document(self, content: str, metadata: Dict[str, str]) -> List[Dict[str, any]]:
+        """
+        Split content with the structure-aware splitter configured for its
+        extension in [chunking] splitters, or by lines otherwise.
+        
+        Args:
+            content: Normalized file content
+            metadata: File metadata
+        
+        Returns:
+            List of chunk dictionaries with content and metadata
+        """
+        single = self._single_chunk(content, metadata)
+        if single is not None:
+            return single
+        
+        extension = '.' + metadata.get('file_extension', '')
+        splitter = STRUCTURE_SPLITTERS.get(self.splitters.get(extension))
+        blocks = splitter(content) if splitter else None
+        if not blocks:
+            # No splitter for this extension, or the file could not be parsed
+            return self.split_by_lines(content, metadata)
+        
+        lines = content.split('\n')
+        layout = self._line_token_spans(content, lines, metadata)
+        chunks = []
+        self._pack_blocks(lines, layout, blocks, metadata, chunks)
+        return chunks
+    
+    def split_stream(self, lines: Iterable[str], metadata: Dict[str, str]) -> Iterator[Dict[str, any]]:
+        """
+        Split a stream of lines into chunks, yielding each as soon as it is
+        complete, so files too large to load whole are chunked in bounded
+        memory (one chunk window plus the current line).
+        
+        Lines are packed and overlapped like split_by_lines, sized by
+        encoding each line separately. Each chunk is then counted exactly;
+        if it comes out over chunk_size, its last lines move to the next one.
+        
+        Args:
+            lines: Normalized lines, without newlines
+            metadata: File metadata
+        
+        Yields:
+            Chunk dictionaries with content and metadata
+        """
+        numbered = enumerate(lines)
+        backlog = deque()  # (line number, text, tokens) pushed back from an oversized chunk
+        window = deque()   # (line number, text, tokens) of the chunk being built
+        window_tokens = 0
+        new_lines = 0      # lines in the window not yet emitted in a chunk
         chunk_index = 0
         
-        for i, line in enumerate(lines):
-            line_tokens = self.count_tokens(line)
+        while True:
+            if backlog:
+                line_number, line, tokens = backlog.popleft()
+            else:
+                item = next(numbered, None)
+                if item is None:
+                    if not new_lines:
+                        return
+                    # End of stream: emit the rest (re-queueing lines if it is over budget)
+                    chunk, pushed = self._window_chunk(window, new_lines, metadata, chunk_index)
+                    yield chunk
+                    chunk_index += 1
+                    backlog.extend(pushed)
+                    window_tokens = self._keep_overlap(window)
+                    new_lines = 0
+                    continue
+                line_number, line = item
+                tokens = len(self.encoder.encode_ordinary(line + '\n')) if line else 0
+            
+            if tokens > self.chunk_size:
+                if new_lines:
+                    chunk, pushed = self._window_chunk(window, new_lines, metadata, chunk_index)
+                    yield chunk
+                    chunk_index += 1
+                    if pushed:
+                        backlog.extendleft(reversed(pushed + [(line_number, line, tokens)]))
+                        window_tokens = self._keep_overlap(window)
+                        new_lines = 0
+                        continue
+                line_tokens = self.encoder.encode_ordinary(line)
+                line_bytes = line.encode('utf-8')
+                token_offsets = list(accumulate(map(self.tokenizer.token_byte_lengths().__getitem__, line_tokens), initial=0))
+                for start, end in self._token_windows(token_offsets, line_bytes, 0, len(line_tokens)):
+                    piece = line_bytes[token_offsets[start]:token_offsets[end]].decode('utf-8', errors='ignore').strip()
+                    if piece:
+                        yield self._create_chunk(piece, metadata, chunk_index, line_number, line_number, self.count_tokens(piece))
+                        chunk_index += 1
+                window.clear()
+                window_tokens = new_lines = 0
+                continue
+            
+            if new_lines and window_tokens + tokens > self.chunk_size:
+                chunk, pushed = self._window_chunk(window, new_lines, metadata, chunk_index)
+                yield chunk
+                chunk_index += 1
+                window_tokens = self._keep_overlap(window)
+                new_lines = 0
+                if pushed:
+                    backlog.extendleft(reversed(pushed + [(line_number, line, tokens)]))
+                    continue
+            
+            window.append((line_number, line, tokens))
+            window_tokens += tokens
+            new_lines += 1
+    
+    def _keep_overlap(self, window: deque) -> int:
+        """Drop all but the trailing lines worth at most chunk_overlap tokens; return their tokens."""
+        overlap_tokens = 0
+        keep = 0
+        for _, _, line_tokens in reversed(window):
+            if overlap_tokens + line_tokens > self.chunk_overlap:
+                break
+            overlap_tokens += line_tokens
+            keep += 1
+        while len(window) > keep:
+            window.popleft()
+        return overlap_tokens
+    
+    def _window_chunk(
+        self,
+        window: deque,
+        new_lines: int,
+        metadata: Dict[str, str],
+        chunk_index: int
+    ) -> tuple:
+        """
+        Chunk from a split_stream window, with an exact token count. While
+        the chunk is over chunk_size, its last lines (never all of the new
+        ones) are removed from the window and returned to be re-queued;
+        once only one new line is left, overlap lines carried from the
+        previous chunk are dropped instead.
+        
+        Returns:
+            (chunk, [(line number, text, tokens), ...] removed lines in order)
+        """
+        pushed = []
+        while True:
+            content = '\n'.join(text for _, text, _ in window)
+            token_count = self.count_tokens(content)
+            if token_count <= self.chunk_size:
+                break
+            if len(pushed) < new_lines - 1:
+                pushed.append(window.pop())
+            elif len(window) > new_lines - len(pushed):
+                window.popleft()
+            else:
+                break
+        pushed.reverse()
+        chunk = self._create_chunk(content, metadata, chunk_index, window[0][0], window[-1][0], token_count)
+        return chunk, pushed
+    
+    def _single_chunk(self, content: str, metadata: Dict[str, str]) -> Optional[List[Dict[str, any]]]:
+        """
+        The whole file as one chunk when the token estimate puts it clearly
+        under chunk_size, skipping splitters and the per-line layout. The
+        chunk's token_count is still exact.
+        """
+        extension = metadata.get('file_extension', '')
+        if self.estimator is None or self.estimator.upper_bound(content, extension) > self.chunk_size:
+            return None
+        tokens = self.tokenizer.count(content)
+        self.estimator.observe(content, tokens, extension)
+        if tokens > self.chunk_size:
+            return None
+        return [self._create_chunk(content, metadata, 0, 0, content.count('\n'), tokens)]
+    
+    def _pack_blocks(
+        self,
+        lines: List[str],
+        layout: Dict[str, any],
+        blocks: List[Block],
+        metadata: Dict[str, str],
+        chunks: List[Dict[str, any]]
+    ) -> None:
+        """
+        Pack consecutive blocks into chunks of up to chunk_size tokens.
+        
+        A block that does not fit is opened up into its child blocks (e.g. a
+        class into its methods) when it is too large on its own, or when it
+        is over half a chunk and the chunk being built is less than half
+        full; otherwise it starts a new chunk whole. A block too large with
+        no children is split by lines together with the chunk being built,
+        and its last line window is kept open for the blocks that follow.
+        """
+        first, last = layout['first'], layout['last']
+        pending = deque(blocks)
+        chunk_start = None  # first line of the chunk being built
+        chunk_end = None
+        
+        while pending:
+            block = pending.popleft()
+            block_tokens = last[block.end] - first[block.start]
+            fits = chunk_start is None or last[block.end] - first[chunk_start] <= self.chunk_size
+            if fits and block_tokens <= self.chunk_size:
+                if chunk_start is None:
+                    chunk_start = block.start
+                chunk_end = block.end
+                continue
+            
+            # Open the block if it cannot be one chunk, or if it is large and would leave the current chunk half empty
+            current_tokens = 0 if chunk_start is None else last[chunk_end] - first[chunk_start]
+            half = self.chunk_size // 2
+            if block.children and (block_tokens > self.chunk_size or (block_tokens > half and current_tokens < half)):
+                pending.extendleft(reversed(block.children))
+                continue
+            
+            if block_tokens > self.chunk_size:
+                # Split by lines from the start of the chunk being built; the last window stays open for the blocks that follow
+                lo = block.start if chunk_start is None else chunk_start
+                chunk_start = self._split_line_range(lines, layout, lo, block.end + 1, metadata, chunks, keep_last=True)
+                chunk_end = block.end
+                continue
+            
+            if chunk_start is not None:
+                self._append_range(lines, layout, chunk_start, chunk_end, metadata, chunks)
+            chunk_start, chunk_end = block.start, block.end
+        
+        if chunk_start is not None:
+            self._append_range(lines, layout, chunk_start, chunk_end, metadata, chunks)
+    
+    def _append_range(
+        self,
+        lines: List[str],
+        layout: Dict[str, any],
+        start: int,
+        end: int,
+        metadata: Dict[str, str],
+        chunks: List[Dict[str, any]]
+    ) -> None:
+        """Append lines start..end (inclusive) as one chunk."""
+        chunks.append(self._create_chunk(
+            '\n'.join(lines[start:end + 1]),
+            metadata,
+            len(chunks),
+            start,
+            end,
+            layout['last'][end] - layout['first'][start]
+        ))
+    
+    def _split_line_range(
+        self,
+        lines: List[str],
+        layout: Dict[str, any],
+        lo: int,
+        hi: int,
+        metadata: Dict[str, str],
+        chunks: List[Dict[str, any]],
+        keep_last: bool = False
+    ) -> Optional[int]:
+        """
+        Split lines lo..hi-1 into overlapping line windows, appending to chunks.
+        
+        Returns:
+            With keep_last, the first line of the last window, which is left
+            for the caller to extend instead of being appended (None if no
+            lines are left over)
+        """
+        first, last = layout['first'], layout['last']
+        chunk_start = lo  # first line of the chunk being built
+        current_tokens = 0
+        
+        for i in range(lo, hi):
+            line_tokens = last[i] - first[i] if lines[i] else 0
             
             # If single line exceeds chunk size, split it
             if line_tokens > self.chunk_size:
                 # Save current chunk if it has content
-                if current_chunk:
-                    chunks.append(self._create_chunk(
-                        '\n'.join(current_chunk),
-                        metadata,
-                        chunk_index,
-                        i - len(current_chunk),
-                        i - 1
-                    ))
-                    chunk_index += 1
-                    current_chunk = []
-                    current_tokens = 0
+                if chunk_start < i:
+                    self._append_range(lines, layout, chunk_start, i - 1, metadata, chunks)
                 
-                # Split the long line by tokens
-                words = line.split()
-                word_chunk = []
-                word_tokens = 0
+                # Split the long line on token boundaries
+                for piece, piece_tokens in self._split_long_line(layout, i):
+                    chunks.append(self._create_chunk(piece, metadata, len(chunks), i, i, piece_tokens))
                 
-                for word in words:
-                    word_token_count = self.count_tokens(word)
-                    if word_tokens + word_token_count > self.chunk_size:
-                        if word_chunk:
-                            chunks.append(self._create_chunk(
-                                ' '.join(word_chunk),
-                                metadata,
-                                chunk_index,
-                                i,
-                                i
-                            ))
-                            chunk_index += 1
-                        word_chunk = [word]
-                        word_tokens = word_token_count
-                    else:
-                        word_chunk.append(word)
-                        word_tokens += word_token_count
-                
-                if word_chunk:
-                    chunks.append(self._create_chunk(
-                        ' '.join(word_chunk),
-                        metadata,
-                        chunk_index,
-                        i,
-                        i
-                    ))
-                    chunk_index += 1
+                chunk_start = i + 1
+                current_tokens = 0
                 continue
             
             # Check if adding this line would exceed chunk size
             if current_tokens + line_tokens > self.chunk_size:
                 # Save current chunk
-                if current_chunk:
-                    chunks.append(self._create_chunk(
-                        '\n'.join(current_chunk),
-                        metadata,
-                        chunk_index,
-                        i - len(current_chunk),
-                        i - 1
-                    ))
-                    chunk_index += 1
+                if chunk_start < i:
+                    self._append_range(lines, layout, chunk_start, i - 1, metadata, chunks)
                 
                 # Start new chunk with overlap
-                overlap_lines = self._get_overlap_lines(current_chunk)
-                current_chunk = overlap_lines + [line]
-                current_tokens = self.count_tokens('\n'.join(current_chunk))
+                chunk_start = self._get_overlap_start(lines, first, last, chunk_start, i)
+                current_tokens = last[i] - first[chunk_start]
             else:
-                current_chunk.append(line)
                 current_tokens += line_tokens
         
         # Add remaining chunk
-        if current_chunk:
-            chunks.append(self._create_chunk(
-                '\n'.join(current_chunk),
-                metadata,
-                chunk_index,
-                len(lines) - len(current_chunk),
-                len(lines) - 1
-            ))
+        if chunk_start >= hi:
+            return None
+        if keep_last:
+            return chunk_start
+        self._append_range(lines, layout, chunk_start, hi - 1, metadata, chunks)
+        return None
+    
+    def _line_token_spans(self, content: str, lines: List[str], metadata: Dict[str, str]) -> Dict[str, any]:
+        """
+        Encode the file once and locate each line's tokens. The exact count
+        also calibrates the token estimator for the file's extension.
         
-        return chunks
+        Returns:
+            Dictionary with the token list, token byte offsets, line byte
+            offsets, and per line the index of the token containing its
+            first byte ('first') and of the first token starting at or
+            after its end ('last'), so last[b] - first[a] counts the
+            tokens of lines a..b.
+        """
+        tokens = self.encoder.encode_ordinary(content)
+        if self.estimator is not None:
+            self.estimator.observe(content, len(tokens), metadata.get('file_extension', ''))
+        token_offsets = list(accumulate(map(self.tokenizer.token_byte_lengths().__getitem__, tokens), initial=0))
+        
+        if content.isascii():
+            line_lengths = [len(line) for line in lines]
+        else:
+            line_lengths = [len(line.encode('utf-8')) for line in lines]
+        
+        line_offsets = []
+        first, last = [], []
+        offset = 0
+        num_tokens = len(tokens)
+        for length in line_lengths:
+            line_offsets.append(offset)
+            first.append(max(bisect_right(token_offsets, offset, 0, num_tokens) - 1, 0))
+            last.append(bisect_left(token_offsets, offset + length, 0, num_tokens))
+            offset += length + 1
+        
+        return {
+            'content': content,
+            'token_offsets': token_offsets,
+            'line_offsets': line_offsets,
+            'line_lengths': line_lengths,
+            'first': first,
+            'last': last
+        }
     
-    def _get_overlap_lines(self, lines: List[str]) -> List[str]:
-        """Get lines for overlap based on token count."""
-        if not lines:
-            return []
+    def _split_long_line(self, layout: Dict[str, any], i: int) -> List[tuple]:
+        """Cut an over-long line into pieces of at most chunk_size tokens."""
+        content_bytes = layout.get('content_bytes')
+        if content_bytes is None:
+            content_bytes = layout['content_bytes'] = layout['content'].encode('utf-8')
+        token_offsets = layout['token_offsets']
+        line_start = layout['line_offsets'][i]
+        line_end = line_start + layout['line_lengths'][i]
         
-        overlap_lines = []
+        pieces = []
+        for t, t_end in self._token_windows(token_offsets, content_bytes, layout['first'][i], layout['last'][i]):
+            start = max(token_offsets[t], line_start)
+            end = min(token_offsets[t_end], line_end)
+            piece = content_bytes[start:end].decode('utf-8', errors='ignore').strip()
+            if piece:
+                pieces.append((piece, self.count_tokens(piece)))  # Exact: the piece is stripped and re-encoded
+        return pieces
+    
+    def _token_windows(self, token_offsets: List[int], data: bytes, lo: int, hi: int) -> Iterator[tuple]:
+        """
+        Cut tokens lo..hi-1 into windows of at most chunk_size tokens.
+        
+        A multi-byte character can be encoded as several tokens; each cut
+        moves back to a token that starts on a UTF-8 character boundary,
+        so no character is split between two pieces and lost in decoding.
+        
+        Yields:
+            (first token, end token) index pairs covering lo..hi
+        """
+        t = lo
+        while t < hi:
+            t_end = min(t + self.chunk_size, hi)
+            cut = t_end
+            while cut > t + 1 and cut < hi and self._inside_character(data, token_offsets[cut]):
+                cut -= 1
+            if cut < hi and self._inside_character(data, token_offsets[cut]):
+                cut = t_end  # No boundary in the window (chunk_size too small); split the character
+            yield t, cut
+            t = cut
+    
+    @staticmethod
+    def _inside_character(data: bytes, offset: int) -> bool:
+        """Whether a byte offset falls inside a multi-byte UTF-8 character."""
+        return offset < len(data) and data[offset] & 0xC0 == 0x80
+    
+    def _get_overlap_start(self, lines: List[str], first: List[int], last: List[int], chunk_start: int, i: int) -> int:
+        """First line of the overlap carried from lines chunk_start..i-1 into the next chunk."""
+        overlap_start = i
         overlap_tokens = 0
         
         # Take lines from the end until we reach overlap size
-        for line in reversed(lines):
-            line_tokens = self.count_tokens(line)
+        while overlap_start > chunk_start:
+            line = lines[overlap_start - 1]
+            line_tokens = last[overlap_start - 1] - first[overlap_start - 1] if line else 0
             if overlap_tokens + line_tokens > self.chunk_overlap:
                 break
-            overlap_lines.insert(0, line)
+            overlap_start -= 1
             overlap_tokens += line_tokens
         
-        return overlap_lines
+        return overlap_start
     
     def _create_chunk(
         self,
@@ -143,7 +459,8 @@ class Chunker:
         file_metadata: Dict[str, str],
         chunk_index: int,
         start_line: int,
-        end_line: int
+        end_line: int,
+        token_count: int
     ) -> Dict[str, any]:
         """Create a chunk dictionary with content and metadata."""
         return {
@@ -153,6 +470,6 @@ class Chunker:
                 'chunk_index': chunk_index,
                 'start_line': start_line,
                 'end_line': end_line,
-                'token_count': self.count_tokens(content)
+                'token_count': token_count
             }
-        }
\ No newline at end of file
+        }
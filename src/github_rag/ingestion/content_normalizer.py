@@ -1,20 +1,30 @@
-from typing import Optional, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Iterable, Iterator, Callable
 from github import ContentFile
 from github_rag.ingestion.github_client import GitHubClient
-from github_rag.ingestion.notebook_parser import parse_notebook_cells
+from github_rag.ingestion.notebook_parser import CELL_SEPARATOR, iter_selected_cells, parse_notebook_cells
+from github_rag.utils.config import get_filtering_config, get_ingestion_config
 
 
 class ContentNormalizer:
     """Extracts and normalizes content from repository files."""
     
-    def __init__(self, github_client: GitHubClient):
+    def __init__(self, github_client: Optional[GitHubClient] = None):
         """
         Initialize the content normalizer.
         
         Args:
             github_client: GitHubClient instance for fetching file content
+                (not needed to normalize already fetched content)
         """
         self.github_client = github_client
+        self.fetch_workers = max(1, get_ingestion_config().get("fetch_workers", 8))
+        
+        filtering = get_filtering_config()
+        # Larger files are streamed line by line instead of loaded whole
+        self.stream_threshold_bytes = filtering.get("max_file_size_mb", 1) * 1024 * 1024
+        self.stream_large_files = filtering.get("stream_large_files", True)
     
     def extract_content(self, content_file: ContentFile) -> Optional[str]:
         """
@@ -68,6 +78,102 @@ class ContentNormalizer:
         
         return normalized.strip()
     
+    def iter_normalized_lines(self, pieces: Iterable[str], max_line_length: int = 65536) -> Iterator[str]:
+        """
+        Streaming counterpart of normalize_content: assemble lines from text
+        pieces and apply the same clean-up (trailing whitespace removed, at
+        most two consecutive blank lines, no leading or trailing blank
+        lines) while holding at most one line and a few blanks in memory.
+        
+        Args:
+            pieces: Decoded text pieces, in order
+            max_line_length: Longer lines are wrapped at this many characters
+                so a single huge line (e.g. minified data) stays bounded
+        
+        Yields:
+            Normalized lines, without newlines
+        """
+        blank_count = 0
+        started = False
+        for line in self._iter_lines(pieces, max_line_length):
+            line = line.rstrip()
+            if not line:
+                blank_count += 1
+                continue
+            if not started:
+                line = line.lstrip()
+                started = True
+            else:
+                for _ in range(min(blank_count, 2)):
+                    yield ""
+            blank_count = 0
+            yield line
+    
+    @staticmethod
+    def _iter_lines(pieces: Iterable[str], max_line_length: int) -> Iterator[str]:
+        """Split text pieces into lines, wrapping lines longer than max_line_length."""
+        pending = ""
+        for piece in pieces:
+            lines = (pending + piece).split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield from ContentNormalizer._wrap(line, max_line_length)
+            while len(pending) > max_line_length:
+                yield pending[:max_line_length]
+                pending = pending[max_line_length:]
+        yield pending
+    
+    @staticmethod
+    def _wrap(line: str, max_line_length: int) -> Iterator[str]:
+        for start in range(0, max(len(line), 1), max_line_length):
+            yield line[start:start + max_line_length]
+    
+    def should_stream(self, content_file: ContentFile) -> bool:
+        """Whether a file is too large to load whole and should be streamed."""
+        return self.stream_large_files and content_file.size > self.stream_threshold_bytes
+    
+    def iter_file_lines(self, content_file: ContentFile) -> Iterator[str]:
+        """
+        Stream a file's normalized lines.
+        
+        Download and decode errors are raised to the consumer, part-way
+        through the stream, so a truncated file is never taken for a
+        complete one; the consumer drops whatever it chunked of the file.
+        
+        Args:
+            content_file: GitHub ContentFile object
+        
+        Yields:
+            Normalized lines
+        """
+        yield from self.iter_normalized_lines(self.github_client.iter_file_content(content_file))
+    
+    def iter_notebook_lines(self, content_file: ContentFile) -> Iterator[str]:
+        """
+        Stream the normalized lines of the cells extracted from a notebook.
+        
+        The notebook is scanned as it is read, so neither its text nor its
+        outputs are held whole, and reading stops once the configured cells
+        have been found. A notebook that cannot be parsed fails like a
+        broken download; there is no raw-JSON fallback for large notebooks.
+        
+        Args:
+            content_file: GitHub ContentFile object
+        
+        Yields:
+            Normalized lines
+        """
+        cells = iter_selected_cells(self.github_client.iter_file_content(content_file))
+        yield from self.iter_normalized_lines(self._join_cells(cells))
+    
+    @staticmethod
+    def _join_cells(cells: Iterable[str]) -> Iterator[str]:
+        """Text pieces of cell sources joined with CELL_SEPARATOR."""
+        for i, source in enumerate(cells):
+            if i:
+                yield CELL_SEPARATOR
+            yield source
+    
     def create_file_metadata(self, content_file: ContentFile) -> Dict[str, str]:
         """
         Create metadata for a file.
@@ -85,40 +191,161 @@ class ContentNormalizer:
             'file_name': content_file.name,
             'file_extension': file_extension,
             'file_size': str(content_file.size),
-            'file_url': content_file.html_url
+            'file_url': content_file.html_url,
+            'file_sha': content_file.sha
         }
     
-    def process_file(self, content_file: ContentFile) -> Optional[Dict[str, any]]:
+    def normalize_document(self, content: str, file_path: str) -> str:
         """
-        Complete processing pipeline for a single file.
+        Normalize fetched file content, extracting cells from notebooks.
+        
+        Args:
+            content: Raw file content
+            file_path: Path to the file
+        
+        Returns:
+            Normalized content
+        """
+        #Special handling for notebooks
+        if file_path.endswith('.ipynb'):
+            parsed_content = parse_notebook_cells(content)
+            if parsed_content:
+                return parsed_content
+            # Fallback to regular normalization if parsing fails
+        
+        # Regular normalization for non-notebook files
+        return self.normalize_content(content, file_path)
+    
+    def fetch_file(self, content_file: ContentFile) -> Optional[Dict[str, any]]:
+        """
+        Fetch a file's raw content and metadata, without normalizing it.
+        
+        Files over the stream threshold are not downloaded here: they get a
+        lazy 'lines' iterator of normalized lines instead of 'content', and
+        are read as they are chunked (see Chunker.split_stream). Large
+        notebooks are scanned the same way, yielding their extracted cells.
         
         Args:
             content_file: GitHub ContentFile object
         
         Returns:
-            Dictionary with content and metadata, or None if processing fails
+            Dictionary with raw content (or streamed lines) and metadata,
+            or None if extraction fails
         """
-        # Extract content
+        if self.should_stream(content_file):
+            iter_lines = self.iter_notebook_lines if content_file.path.endswith('.ipynb') else self.iter_file_lines
+            return {
+                'lines': iter_lines(content_file),
+                'metadata': self.create_file_metadata(content_file)
+            }
+        
         content = self.extract_content(content_file)
         if content is None:
             return None
         
-        #Special handling for notebooks
-        if content_file.name.endswith('.ipynb'):
-            parsed_content = parse_notebook_cells(content, max_cells=5)
-            if parsed_content:
-                normalized_content = parsed_content
-            else:
-                # Fallback to regular normalization if parsing fails
-                normalized_content = self.normalize_content(content, content_file.path)
-        else:
-            # Regular normalization for non-notebook files
-            normalized_content = self.normalize_content(content, content_file.path)
+        return {
+            'content': content,
+            'metadata': self.create_file_metadata(content_file)
+        }
+    
+    def process_file(self, content_file: ContentFile) -> Optional[Dict[str, any]]:
+        """
+        Complete processing pipeline for a single file.
+        
+        Args:
+            content_file: GitHub ContentFile object
         
-        # Create metadata
-        metadata = self.create_file_metadata(content_file)
+        Returns:
+            Dictionary with content and metadata, or None if processing fails
+        """
+        fetched = self.fetch_file(content_file)
+        if fetched is None or 'lines' in fetched:
+            return fetched
         
-        return {
-            'content': normalized_content,
-            'metadata': metadata
-        }
\ No newline at end of file
+        fetched['content'] = self.normalize_document(fetched['content'], content_file.path)
+        return fetched
+    
+    def iter_process_files(
+        self,
+        content_files: List[ContentFile],
+        progress_callback: Optional[Callable[[int, int, ContentFile], None]] = None
+    ) -> Iterator[Optional[Dict[str, any]]]:
+        """
+        Process files with a bounded pool of concurrent content fetches.
+        
+        Fetching is network-bound, so up to ``fetch_workers`` files are
+        downloaded at once. Results are yielded in input order, and at most
+        ``2 * fetch_workers`` files are in flight at any time.
+        
+        Args:
+            content_files: Files to process
+            progress_callback: Optional callable(done, total, content_file),
+                invoked in the caller's thread as each result is yielded
+        
+        Yields:
+            The process_file result (or None) for each file, in input order
+        """
+        return self._iter_concurrently(self.process_file, content_files, progress_callback)
+    
+    def iter_fetch_files(
+        self,
+        content_files: List[ContentFile],
+        progress_callback: Optional[Callable[[int, int, ContentFile], None]] = None
+    ) -> Iterator[Optional[Dict[str, any]]]:
+        """
+        Like iter_process_files, but yields fetch_file results (raw content),
+        leaving normalization to the caller (e.g. a ParallelChunker worker).
+        """
+        return self._iter_concurrently(self.fetch_file, content_files, progress_callback)
+    
+    def _iter_concurrently(
+        self,
+        fn: Callable[[ContentFile], Optional[Dict[str, any]]],
+        content_files: List[ContentFile],
+        progress_callback: Optional[Callable[[int, int, ContentFile], None]]
+    ) -> Iterator[Optional[Dict[str, any]]]:
+        """Run fn over files on the fetch thread pool, yielding results in input order."""
+        total = len(content_files)
+        files = iter(content_files)
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        
+        try:
+            for content_file in files:
+                pending.append((content_file, executor.submit(fn, content_file)))
+                if len(pending) >= 2 * self.fetch_workers:
+                    break
+            
+            done = 0
+            while pending:
+                content_file, future = pending.popleft()
+                result = future.result()
+                
+                # Refill the window before handing the result back
+                next_file = next(files, None)
+                if next_file is not None:
+                    pending.append((next_file, executor.submit(fn, next_file)))
+                
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total, content_file)
+                yield result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def process_files(
+        self,
+        content_files: List[ContentFile],
+        progress_callback: Optional[Callable[[int, int, ContentFile], None]] = None
+    ) -> List[Optional[Dict[str, any]]]:
+        """
+        Process many files concurrently, keeping input order.
+        
+        Args:
+            content_files: Files to process
+            progress_callback: Optional callable(done, total, content_file)
+        
+        Returns:
+            List of process_file results (None for failed files), in input order
+        """
+        return list(self.iter_process_files(content_files, progress_callback))
@@ -0,0 +1,153 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from github_rag.utils.config import get_ingestion_config
+
+_TRAILING_WHITESPACE = re.compile(r'[ \t]+$', re.MULTILINE)
+
+
+def content_hash(content: str) -> str:
+    """
+    Hash of chunk text after normalizing line endings, trailing whitespace
+    and surrounding blank lines, so copies that differ only in those still match.
+    """
+    normalized = _TRAILING_WHITESPACE.sub('', content.replace('\r\n', '\n')).strip('\n')
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def format_location(metadata: Dict) -> str:
+    """Chunk location as "path:start_line-end_line"."""
+    return f"{metadata['file_path']}:{metadata['start_line']}-{metadata['end_line']}"
+
+
+def dedup_enabled() -> bool:
+    """Whether [ingestion] dedup_chunks is on."""
+    return get_ingestion_config().get("dedup_chunks", True)
+
+
+class ChunkDeduplicator:
+    """Embeds each distinct chunk text once and fans the vector out to every copy.
+
+    Vendored copies, repeated license headers and boilerplate produce
+    identical chunks; only the first copy of a text is sent to the
+    embedding API. Vectors are remembered (bounded, LRU) across calls, so
+    the streaming pipeline also reuses them between batches.
+    """
+
+    def __init__(self, cache_size: Optional[int] = None):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            cache_size: Vectors remembered across calls (default: [ingestion] dedup_cache_size)
+        """
+        self.cache_size = cache_size or get_ingestion_config().get("dedup_cache_size", 10000)
+        self._vectors: OrderedDict = OrderedDict()
+        self.chunks_seen = 0
+        self.duplicate_chunks = 0
+        self.tokens_saved = 0
+
+    def group(self, chunks: List[Dict]) -> Dict[str, List[int]]:
+        """Chunk indexes grouped by content hash, in first-seen order."""
+        groups: Dict[str, List[int]] = {}
+        for i, chunk in enumerate(chunks):
+            groups.setdefault(content_hash(chunk['content']), []).append(i)
+        return groups
+
+    def _cached(self, key: str) -> Optional[List[float]]:
+        vector = self._vectors.get(key)
+        if vector is not None:
+            self._vectors.move_to_end(key)
+        return vector
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._vectors[key] = vector
+        self._vectors.move_to_end(key)
+        while len(self._vectors) > self.cache_size:
+            self._vectors.popitem(last=False)
+
+    def embed(
+        self,
+        chunks: List[Dict],
+        embed_fn: Callable[[List[str], List[Optional[int]]], List[List[float]]],
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[List[float]]:
+        """
+        Embeddings for chunks, calling embed_fn only for texts not embedded before.
+
+        Args:
+            chunks: Chunks to embed
+            embed_fn: Callable(texts, token_counts) -> vectors, e.g.
+                EmbeddingGenerator.generate_embeddings_batch
+            batch_size: Texts per embed_fn call (default: all in one call,
+                leaving request packing to embed_fn)
+            progress_callback: Optional callable(done, total) over the texts actually embedded
+
+        Returns:
+            One embedding per chunk, in order; copies share the same vector
+        """
+        groups = self.group(chunks)
+        vectors = {}
+        for key in groups:
+            cached = self._cached(key)
+            if cached is not None:
+                vectors[key] = cached
+
+        pending = [key for key in groups if key not in vectors]
+        batch_size = batch_size or max(len(pending), 1)
+        for i in range(0, len(pending), batch_size):
+            keys = pending[i:i + batch_size]
+            firsts = [chunks[groups[key][0]] for key in keys]
+            embedded = embed_fn([c['content'] for c in firsts], [c['metadata'].get('token_count') for c in firsts])
+            for key, vector in zip(keys, embedded):
+                vectors[key] = vector
+                self._remember(key, vector)
+            if progress_callback:
+                progress_callback(min(i + batch_size, len(pending)), len(pending))
+
+        embedded_now = set(pending)
+        embeddings = [None] * len(chunks)
+        for key, indexes in groups.items():
+            for i in indexes:
+                embeddings[i] = vectors[key]
+            # The first copy was paid for here, unless an earlier call embedded the text
+            reused = indexes[1:] if key in embedded_now else indexes
+            self.duplicate_chunks += len(reused)
+            self.tokens_saved += sum(chunks[i]['metadata'].get('token_count', 0) for i in reused)
+        self.chunks_seen += len(chunks)
+        return embeddings
+
+    def merge(self, chunks: List[Dict], embeddings: List[List[float]]) -> Tuple[List[Dict], List[List[float]]]:
+        """
+        Collapse copies into one stored chunk per distinct text.
+
+        The first copy is kept; when there are others, its metadata gains
+        ``duplicate_locations`` listing every copy (itself included) as
+        "path:start_line-end_line", comma-separated.
+
+        Args:
+            chunks: Chunks, as passed to embed()
+            embeddings: Embeddings returned by embed()
+
+        Returns:
+            (chunks, embeddings) with one entry per distinct text
+        """
+        merged_chunks, merged_embeddings = [], []
+        for indexes in self.group(chunks).values():
+            first = chunks[indexes[0]]
+            if len(indexes) > 1:
+                locations = ", ".join(format_location(chunks[i]['metadata']) for i in indexes)
+                first = {'content': first['content'], 'metadata': {**first['metadata'], 'duplicate_locations': locations}}
+            merged_chunks.append(first)
+            merged_embeddings.append(embeddings[indexes[0]])
+        return merged_chunks, merged_embeddings
+
+    def stats(self) -> Dict[str, int]:
+        """Chunks seen, chunks whose embedding was reused, and embedding tokens saved."""
+        return {
+            'chunks_seen': self.chunks_seen,
+            'duplicate_chunks': self.duplicate_chunks,
+            'tokens_saved': self.tokens_saved
+        }
@@ -0,0 +1,218 @@
+from typing import Iterable, List, Optional, Tuple
+from github_rag.ingestion.file_filter import PathMatcher
+from github_rag.utils.config import get_filtering_config
+
+# Reason codes for files skipped before download
+SKIP_BINARY = "binary"
+SKIP_EMPTY = "empty"
+SKIP_LOCKFILE = "lockfile"
+SKIP_MINIFIED = "minified"
+SKIP_GENERATED = "generated"
+SKIP_VENDORED = "vendored"
+SKIP_DATA = "data"
+
+SKIP_LABELS = {
+    SKIP_BINARY: "Binary file",
+    SKIP_EMPTY: "Empty file",
+    SKIP_LOCKFILE: "Lockfile",
+    SKIP_MINIFIED: "Minified",
+    SKIP_GENERATED: "Generated code",
+    SKIP_VENDORED: "Vendored code",
+    SKIP_DATA: "Large data file",
+}
+
+# Path heuristics, a subset of GitHub linguist's generated.rb and vendor.yml
+BINARY_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tiff", ".psd",
+    ".pdf", ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".jar", ".war",
+    ".exe", ".dll", ".so", ".dylib", ".a", ".o", ".obj", ".class", ".pyc", ".pyo", ".wasm",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".mp3", ".mp4", ".wav", ".ogg", ".avi", ".mov", ".webm",
+    ".sqlite", ".db", ".pkl", ".npy", ".npz", ".parquet", ".h5", ".onnx", ".pt", ".bin",
+})
+LOCKFILES = [
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "npm-shrinkwrap.json", "bun.lockb",
+    "Cargo.lock", "poetry.lock", "Pipfile.lock", "uv.lock", "pdm.lock", "Gemfile.lock",
+    "composer.lock", "go.sum", "mix.lock", "pubspec.lock", "Podfile.lock", "flake.lock",
+]
+MINIFIED_PATTERNS = ["*.min.js", "*.min.css", "*-min.js", "*.bundle.js", "*.chunk.js", "*.js.map", "*.css.map"]
+GENERATED_PATTERNS = [
+    "*_pb2.py", "*_pb2_grpc.py", "*.pb.go", "*.pb.cc", "*.pb.h", "*.pb.swift", "*_grpc.pb.go",
+    "*.designer.cs", "*.g.dart", "*.freezed.dart", "*.generated.*", "*_generated.*",
+    "__generated__/", "generated/", "*.pyi.gen",
+]
+VENDORED_PATTERNS = [
+    "vendor/", "vendors/", "third_party/", "third-party/", "3rdparty/", "external/",
+    "node_modules/", "bower_components/", ".yarn/", "Godeps/_workspace/",
+]
+# Large notebooks are streamed cell by cell and .txt is prose, so neither is treated as data
+DATA_EXTENSIONS = frozenset({".json", ".csv", ".tsv", ".svg", ".xml", ".yaml", ".yml"})
+
+# Markers tools put near the top of generated sources
+GENERATED_MARKERS = (
+    b"@generated", b"DO NOT EDIT", b"Code generated by", b"Autogenerated by",
+    b"auto-generated", b"This file is automatically generated", b"Generated by the protocol buffer compiler",
+)
+
+SAMPLE_BYTES = 8000  # git's own binary check looks at the first 8000 bytes
+MAX_AVERAGE_LINE_LENGTH = 500
+
+
+class FileClassifier:
+    """Spots files that would only produce useless chunks, before they are downloaded.
+
+    Classification uses what the tree listing already provides (path and
+    size) plus ``linguist-generated`` / ``linguist-vendored`` markers from
+    the repository's .gitattributes. When a file's body is already in the
+    blob cache, a short prefix is sniffed for NUL bytes, generated-code
+    banners and minified line lengths as well; nothing is fetched for that.
+    """
+
+    def __init__(self, github_client=None):
+        """
+        Initialize the classifier from config.toml.
+
+        Args:
+            github_client: Client used to read .gitattributes and reach the
+                blob cache (optional)
+        """
+        config = get_filtering_config()
+        self.github_client = github_client
+        self.blob_cache = getattr(github_client, "blob_cache", None)
+        self.skip_generated = config.get("skip_generated", True)
+        self.max_data_file_bytes = config.get("max_data_file_kb", 256) * 1024
+
+        self._lockfiles = frozenset(LOCKFILES)
+        self._minified = PathMatcher(MINIFIED_PATTERNS)
+        self._generated = PathMatcher(GENERATED_PATTERNS)
+        self._vendored = PathMatcher(VENDORED_PATTERNS)
+        self._attributes = {
+            SKIP_GENERATED: (PathMatcher([]), PathMatcher([])),
+            SKIP_VENDORED: (PathMatcher([]), PathMatcher([])),
+        }
+
+    def load_gitattributes(self, entries: Iterable) -> None:
+        """
+        Read linguist markers from the .gitattributes files in a listing.
+
+        Patterns in a nested .gitattributes are scoped to its directory.
+        ``linguist-generated=false`` (or ``-linguist-generated``) overrides
+        the built-in heuristics for matching paths.
+
+        Args:
+            entries: Repository listing (ContentFile or TreeEntry objects)
+        """
+        rules = {SKIP_GENERATED: ([], []), SKIP_VENDORED: ([], [])}
+        for entry in entries:
+            if entry.name != ".gitattributes" or self.github_client is None:
+                continue
+            content = self.github_client.get_file_content(entry)
+            if not content:
+                continue
+            base = entry.path.rpartition("/")[0]
+            for line in content.splitlines():
+                fields = line.split()
+                if len(fields) < 2 or fields[0].startswith("#"):
+                    continue
+                pattern = fields[0]
+                if base:
+                    pattern = f"{base}/{pattern.lstrip('/')}" if "/" in pattern else f"{base}/**/{pattern}"
+                for attribute in fields[1:]:
+                    for reason in rules:
+                        name = f"linguist-{reason}"
+                        if attribute in (name, f"{name}=true"):
+                            rules[reason][0].append(pattern)
+                        elif attribute in (f"-{name}", f"{name}=false"):
+                            rules[reason][1].append(pattern)
+
+        self._attributes = {
+            reason: (PathMatcher(marked), PathMatcher(unmarked))
+            for reason, (marked, unmarked) in rules.items()
+        }
+
+    def _attribute(self, reason: str, path: str, name: str) -> Optional[bool]:
+        """True/False if .gitattributes sets/unsets the linguist marker, else None."""
+        marked, unmarked = self._attributes[reason]
+        if unmarked.matches(path, name, is_dir=False):
+            return False
+        if marked.matches(path, name, is_dir=False):
+            return True
+        return None
+
+    def _matches_tree(self, matcher: PathMatcher, path: str) -> bool:
+        """Match a file against patterns for itself or any directory above it."""
+        parts = path.split("/")
+        for depth in range(1, len(parts) + 1):
+            if matcher.matches("/".join(parts[:depth]), parts[depth - 1], is_dir=depth < len(parts)):
+                return True
+        return False
+
+    def _sniff(self, sha: str) -> Optional[str]:
+        """Classify from a cached content prefix, if the blob is cached."""
+        if self.blob_cache is None or not sha:
+            return None
+        sample = self.blob_cache.peek(sha, SAMPLE_BYTES)
+        if sample is None:
+            return None
+        if b"\0" in sample:
+            return SKIP_BINARY
+        if self.skip_generated:
+            head = sample[:1024]
+            if any(marker in head for marker in GENERATED_MARKERS):
+                return SKIP_GENERATED
+        if len(sample) == SAMPLE_BYTES and len(sample) / (sample.count(b"\n") + 1) > MAX_AVERAGE_LINE_LENGTH:
+            return SKIP_MINIFIED
+        return None
+
+    def classify(self, content_file) -> Optional[str]:
+        """
+        Decide whether a file is worth downloading.
+
+        Args:
+            content_file: ContentFile or TreeEntry
+
+        Returns:
+            None if the file looks like useful source, otherwise a SKIP_* code
+        """
+        path, name = content_file.path, content_file.name
+        extension = name[name.rfind("."):].lower() if "." in name else ""
+
+        if extension in BINARY_EXTENSIONS:
+            return SKIP_BINARY
+        if content_file.size == 0:
+            return SKIP_EMPTY
+        if name in self._lockfiles:
+            return SKIP_LOCKFILE
+
+        if self.skip_generated:
+            for reason, matcher in ((SKIP_GENERATED, self._generated), (SKIP_VENDORED, self._vendored)):
+                marked = self._attribute(reason, path, name)
+                if marked is None:
+                    marked = self._matches_tree(matcher, path)
+                if marked:
+                    return reason
+            if self._minified.matches(path, name, is_dir=False):
+                return SKIP_MINIFIED
+            if extension in DATA_EXTENSIONS and content_file.size > self.max_data_file_bytes:
+                return SKIP_DATA
+
+        return self._sniff(getattr(content_file, "sha", None))
+
+    def filter_entries(self, entries: Iterable) -> Tuple[List, List[Tuple]]:
+        """
+        Split a listing into files worth fetching and files to skip.
+
+        Args:
+            entries: ContentFile or TreeEntry objects
+
+        Returns:
+            Tuple of (kept entries, [(entry, SKIP_* code), ...])
+        """
+        kept, skipped = [], []
+        for entry in entries:
+            reason = self.classify(entry)
+            if reason is None:
+                kept.append(entry)
+            else:
+                skipped.append((entry, reason))
+        return kept, skipped
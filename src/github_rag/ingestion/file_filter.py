@@ -1,52 +1,275 @@
-from typing import List
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
 from github import ContentFile
 from github_rag.utils.config import get_filtering_config
 
+# Reason codes returned for rejected files
+REASON_NOT_FILE = "not_file"
+REASON_EXCLUDED_PATH = "excluded_path"
+REASON_UNSUPPORTED_EXTENSION = "unsupported_extension"
+REASON_TOO_LARGE = "too_large"
+
+REASON_LABELS = {
+    REASON_NOT_FILE: "Not a regular file",
+    REASON_EXCLUDED_PATH: "Excluded path",
+    REASON_UNSUPPORTED_EXTENSION: "Unsupported extension",
+    REASON_TOO_LARGE: "Too large",
+}
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore-style glob into a regex over '/'-separated paths."""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                regex.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex.append(f"[{body}]")
+                i = end + 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(regex)
+
+
+class PathMatcher:
+    """A set of gitignore-style patterns compiled into a few combined regexes.
+
+    Patterns without a slash match a single path segment at any depth
+    (``node_modules``, ``*.min.js``); literal ones are a set lookup.
+    Patterns containing a slash are anchored to the repository root
+    (``docs/build``, ``src/**/fixtures``). A trailing slash restricts a
+    pattern to directories.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.names = set()
+        self.dir_names = set()
+        name_globs, dir_name_globs, path_globs, dir_path_globs = [], [], [], []
+
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if "/" in pattern:
+                regex = _glob_to_regex(pattern.lstrip("/"))
+                (dir_path_globs if dir_only else path_globs).append(regex)
+            elif _GLOB_CHARS.search(pattern):
+                (dir_name_globs if dir_only else name_globs).append(_glob_to_regex(pattern))
+            else:
+                (self.dir_names if dir_only else self.names).add(pattern)
+
+        self.name_regex = self._combine(name_globs)
+        self.dir_name_regex = self._combine(name_globs + dir_name_globs)
+        self.path_regex = self._combine(path_globs)
+        self.dir_path_regex = self._combine(path_globs + dir_path_globs)
+        self.dir_names |= self.names
+
+    @staticmethod
+    def _combine(regexes: List[str]) -> Optional[re.Pattern]:
+        if not regexes:
+            return None
+        return re.compile("|".join(f"(?:{r})" for r in regexes))
+
+    def matches(self, path: str, name: str, is_dir: bool) -> bool:
+        """Whether a directory or file (not its ancestors) matches."""
+        if is_dir:
+            names, name_regex, path_regex = self.dir_names, self.dir_name_regex, self.dir_path_regex
+        else:
+            names, name_regex, path_regex = self.names, self.name_regex, self.path_regex
+        return (
+            name in names
+            or (name_regex is not None and name_regex.fullmatch(name) is not None)
+            or (path_regex is not None and path_regex.fullmatch(path) is not None)
+        )
+
 
 class FileFilter:
-    """Filters repository files based on config rules."""
-    
-    def __init__(self):
-        """Load filtering rules from config.toml."""
+    """Filters repository files based on config rules.
+
+    ``exclude_patterns`` use gitignore syntax: ``build`` excludes any file
+    or directory named exactly ``build`` (not ``rebuild.py``), ``/build``
+    or ``docs/build`` only that path, ``*.min.js`` any matching file name,
+    and ``!pattern`` re-includes files not under an excluded directory.
+    """
+
+    def __init__(self, exclude_patterns: Optional[List[str]] = None):
+        """
+        Load filtering rules from config.toml and compile them.
+
+        Args:
+            exclude_patterns: Override for [filtering] exclude_patterns
+        """
         config = get_filtering_config()
         self.include_extensions = config.get("include_extensions", [])
         self.include_exact_names = config.get("include_exact_names", [])
-        self.exclude_patterns = config.get("exclude_patterns", [])
+        self.exclude_patterns = config.get("exclude_patterns", []) if exclude_patterns is None else exclude_patterns
         self.max_file_size_mb = config.get("max_file_size_mb", 1)
         self.max_file_size_bytes = self.max_file_size_mb * 1024 * 1024
-    
+        # Files above max_file_size_mb are streamed up to this size
+        self.max_stream_file_size_bytes = self.max_file_size_bytes
+        if config.get("stream_large_files", True):
+            self.max_stream_file_size_bytes = max(
+                config.get("max_stream_file_size_mb", 50) * 1024 * 1024, self.max_file_size_bytes
+            )
+
+        self._extensions = frozenset(self.include_extensions)
+        self._exact_names = frozenset(self.include_exact_names)
+        self._exclude = PathMatcher(p for p in self.exclude_patterns if not p.startswith("!"))
+        self._include = PathMatcher(p[1:] for p in self.exclude_patterns if p.startswith("!"))
+        self._excluded_dirs: Dict[str, bool] = {"": False}
+
+    @staticmethod
+    def _has_extension(filename: str, extensions) -> bool:
+        """Set lookup of every dotted suffix, so multi-part extensions like '.d.ts' match."""
+        dot = filename.rfind(".")
+        if dot > 0 and filename[dot:] in extensions:
+            return True
+        dot = filename.find(".", 1 if filename.startswith(".") else 0)
+        while dot != -1:
+            if filename[dot:] in extensions:
+                return True
+            dot = filename.find(".", dot + 1)
+        return filename.startswith(".") and filename in extensions
+
     def is_valid_extension(self, filename: str) -> bool:
         """Check if file has an allowed extension."""
-        return any(filename.endswith(ext) for ext in self.include_extensions)
-    
+        return self._has_extension(filename, self._extensions)
+
     def is_exact_name_match(self, filename: str) -> bool:
         """Check if filename matches any exact name in the include list."""
-        return filename in self.include_exact_names
-    
+        return filename in self._exact_names
+
+    def _is_excluded_dir(self, directory: str) -> bool:
+        """Whether a directory or any of its ancestors is excluded (memoized per directory)."""
+        excluded = self._excluded_dirs.get(directory)
+        if excluded is None:
+            parent, _, name = directory.rpartition("/")
+            excluded = self._is_excluded_dir(parent) or (
+                self._exclude.matches(directory, name, is_dir=True)
+                and not self._include.matches(directory, name, is_dir=True)
+            )
+            self._excluded_dirs[directory] = excluded
+        return excluded
+
     def is_excluded_path(self, file_path: str) -> bool:
-        """Check if file path contains any excluded patterns."""
-        return any(pattern in file_path for pattern in self.exclude_patterns)
-    
+        """Check if a file path, or any directory above it, matches an exclude pattern."""
+        directory, _, name = file_path.rpartition("/")
+        if self._is_excluded_dir(directory):
+            return True
+        return (
+            self._exclude.matches(file_path, name, is_dir=False)
+            and not self._include.matches(file_path, name, is_dir=False)
+        )
+
     def is_within_size_limit(self, content_file: ContentFile) -> bool:
-        """Check if file is within the max size limit."""
-        return content_file.size <= self.max_file_size_bytes
-    
-    def should_include(self, content_file: ContentFile) -> bool:
+        """Check if file is within the max size limit (the streaming limit)."""
+        return content_file.size <= self.max_stream_file_size_bytes
+
+    def rejection_reason(self, content_file: ContentFile, extensions=None) -> Optional[str]:
         """
         Run all filter checks on a file.
-        
+
         Args:
-            content_file: GitHub ContentFile object
-        
+            content_file: GitHub ContentFile or TreeEntry
+            extensions: Optional set of extensions overriding include_extensions
+
         Returns:
-            True if file should be included, False otherwise
+            None if the file should be included, otherwise a REASON_* code
         """
         if content_file.type != "file":
-            return False
-        if not self.is_valid_extension(content_file.name) and not self.is_exact_name_match(content_file.name):
-            return False
+            return REASON_NOT_FILE
+        name = content_file.name
+        if name not in self._exact_names and not self._has_extension(name, extensions or self._extensions):
+            return REASON_UNSUPPORTED_EXTENSION
         if self.is_excluded_path(content_file.path):
-            return False
+            return REASON_EXCLUDED_PATH
         if not self.is_within_size_limit(content_file):
-            return False
-        return True
\ No newline at end of file
+            return REASON_TOO_LARGE
+        return None
+
+    def should_include(self, content_file: ContentFile) -> bool:
+        """
+        Run all filter checks on a file.
+
+        Args:
+            content_file: GitHub ContentFile object
+
+        Returns:
+            True if file should be included, False otherwise
+        """
+        return self.rejection_reason(content_file) is None
+
+    def filter_entries(self, entries: Iterable, extensions: Optional[Iterable[str]] = None) -> Tuple[List, List[Tuple]]:
+        """
+        Filter a whole listing in one pass.
+
+        Directory exclusion is evaluated once per directory and shared by
+        every file beneath it, so large tree listings cost roughly one set
+        lookup per file.
+
+        Args:
+            entries: ContentFile or TreeEntry objects
+            extensions: Optional extensions overriding include_extensions
+                (e.g. the ones selected in the UI)
+
+        Returns:
+            Tuple of (included entries, [(entry, reason code), ...] for rejected ones)
+        """
+        extensions = frozenset(extensions) if extensions else self._extensions
+        exact_names = self._exact_names
+        has_extension = self._has_extension
+        excluded_dirs = self._excluded_dirs
+        is_excluded_dir = self._is_excluded_dir
+        exclude, include = self._exclude, self._include
+        size_limit = self.max_stream_file_size_bytes
+
+        included, rejected = [], []
+        for entry in entries:
+            if entry.type != "file":
+                rejected.append((entry, REASON_NOT_FILE))
+                continue
+            path = entry.path
+            directory, _, name = path.rpartition("/")
+            if name not in exact_names and not has_extension(name, extensions):
+                rejected.append((entry, REASON_UNSUPPORTED_EXTENSION))
+                continue
+            dir_excluded = excluded_dirs.get(directory)
+            if dir_excluded is None:
+                dir_excluded = is_excluded_dir(directory)
+            if dir_excluded or (
+                exclude.matches(path, name, is_dir=False)
+                and not include.matches(path, name, is_dir=False)
+            ):
+                rejected.append((entry, REASON_EXCLUDED_PATH))
+            elif entry.size > size_limit:
+                rejected.append((entry, REASON_TOO_LARGE))
+            else:
+                included.append(entry)
+        return included, rejected
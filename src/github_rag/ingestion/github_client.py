@@ -1,19 +1,70 @@
+import codecs
 import os
-from typing import List, Dict, Optional
+from collections import deque
+from typing import Iterator, List, Dict, Optional
+from urllib.parse import quote
+import requests
 from github import Github, Repository, ContentFile
 from dotenv import load_dotenv
+from urllib3.util.retry import Retry
+from github_rag.ingestion.rate_limiter import RateLimitScheduler
+from github_rag.ingestion.repo_tree import TreeEntry, list_repo_tree
+from github_rag.utils.blob_cache import get_blob_cache
+from github_rag.utils.config import get_ingestion_config
+from github_rag.utils.http_cache import conditional_get
 
 # Load environment variables
 load_dotenv()
 
 
+def get_directory_contents(repo: Repository, path: str = "") -> List[ContentFile]:
+    """
+    List a directory via the contents API, revalidated through the ETag cache.
+    
+    Args:
+        repo: Repository object
+        path: Path within the repository (default: root)
+    
+    Returns:
+        List of ContentFile objects
+    """
+    data, headers = conditional_get(repo.requester, f"{repo.url}/contents/{quote(path)}")
+    items = data if isinstance(data, list) else [data]
+    return [
+        ContentFile.ContentFile(repo.requester, headers, item, completed=False)
+        for item in items
+    ]
+
+
 class GitHubClient:
     """Client for interacting with GitHub API."""
     
     def __init__(self):
         """Initialize GitHub client with optional token."""
+        config = get_ingestion_config()
         github_token = os.getenv("GITHUB_TOKEN")
-        self.client = Github(github_token) if github_token else Github()
+        
+        # Only transient server errors are retried by urllib3; rate limits are
+        # handled by the scheduler, which replaces PyGithub's fixed throttle
+        client_options = {
+            'retry': Retry(total=3, backoff_factor=1, status_forcelist=(500, 502, 503, 504),
+                           respect_retry_after_header=False, raise_on_status=False),
+            'seconds_between_requests': None
+        }
+        self.client = Github(github_token, **client_options) if github_token else Github(**client_options)
+        
+        self.rate_limiter = RateLimitScheduler(
+            max_concurrency=config.get("fetch_workers", 8),
+            reserve=config.get("rate_limit_reserve", 50),
+            slowdown_threshold=config.get("rate_limit_slowdown", 0.25)
+        )
+        self.rate_limiter.instrument(self.client.requester)
+        self.listing_mode = config.get("listing_mode", "tree")
+        self.blob_cache = get_blob_cache()
+    
+    def get_rate_limit_status(self) -> Dict:
+        """Current GitHub API budget as seen by the request scheduler."""
+        return self.rate_limiter.status()
     
     def parse_repo_url(self, repo_url: str) -> tuple[str, str]:
         """
@@ -50,8 +101,8 @@ class GitHubClient:
             Repository object
         """
         owner, repo_name = self.parse_repo_url(repo_url)
-        repo = self.client.get_repo(f"{owner}/{repo_name}")
-        return repo
+        data, headers = conditional_get(self.client.requester, f"/repos/{owner}/{repo_name}")
+        return self.client.create_from_raw_data(Repository.Repository, data, headers)
     
     def get_repo_contents(self, repo: Repository, path: str = "") -> List[ContentFile]:
         """
@@ -64,8 +115,7 @@ class GitHubClient:
         Returns:
             List of ContentFile objects
         """
-        contents = repo.get_contents(path)
-        return contents if isinstance(contents, list) else [contents]
+        return get_directory_contents(repo, path)
     
     def get_file_content(self, content_file: ContentFile) -> Optional[str]:
         """
@@ -78,10 +128,101 @@ class GitHubClient:
             Decoded file content as string, or None if binary
         """
         try:
-            return content_file.decoded_content.decode('utf-8')
+            if self.blob_cache is not None and content_file.sha:
+                # Blob SHAs are content hashes, so a cached body is never stale
+                data = self.blob_cache.get_or_load(content_file.sha, lambda: content_file.decoded_content)
+            else:
+                data = content_file.decoded_content
+            return data.decode('utf-8')
         except Exception:
             return None
         
+    def iter_file_bytes(self, content_file: ContentFile, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Read a file's raw body in blocks, without holding it in memory.
+        
+        Cached blobs are read from disk; otherwise the body is streamed from
+        the Git blobs API (raw media type) and stored in the blob cache as it
+        arrives. Sources without a blob URL (local checkouts) stream their own.
+        
+        Args:
+            content_file: ContentFile or TreeEntry
+            chunk_size: Block size in bytes
+        
+        Yields:
+            Blocks of the raw file body
+        """
+        sha = content_file.sha
+        if self.blob_cache is not None and sha:
+            cached = self.blob_cache.open(sha)
+            if cached is not None:
+                with cached:
+                    yield from iter(lambda: cached.read(chunk_size), b'')
+                return
+        
+        git_url = getattr(content_file, 'git_url', None)
+        if git_url:
+            blocks = self._stream_blob(git_url, chunk_size)
+            if self.blob_cache is not None and sha:
+                blocks = self.blob_cache.put_stream(sha, blocks)
+            yield from blocks
+        elif hasattr(content_file, 'iter_content'):
+            yield from content_file.iter_content(chunk_size)
+        else:
+            yield content_file.decoded_content
+    
+    def iter_file_content(self, content_file: ContentFile, chunk_size: int = 65536) -> Iterator[str]:
+        """
+        Read a file's text in pieces, decoding UTF-8 incrementally so
+        characters split across blocks are reassembled. Invalid bytes are
+        replaced rather than failing the whole file.
+        
+        Args:
+            content_file: ContentFile or TreeEntry
+            chunk_size: Block size in bytes
+        
+        Yields:
+            Decoded text pieces
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        for block in self.iter_file_bytes(content_file, chunk_size):
+            text = decoder.decode(block)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
+    def _stream_blob(self, url: str, chunk_size: int) -> Iterator[bytes]:
+        """Stream a blob's raw body from the Git blobs API, scheduled by the rate limiter."""
+        headers = {"Accept": "application/vnd.github.raw+json", "User-Agent": "github-rag-assistant"}
+        if self.client.requester.auth is not None:
+            self.client.requester.auth.authentication(headers)
+        
+        self.rate_limiter.acquire()
+        try:
+            response = requests.get(url, headers=headers, stream=True, timeout=30)
+        finally:
+            self.rate_limiter.release()
+        self.rate_limiter.update(response.headers)
+        
+        with response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size)
+    
+    def get_tree_entries(self, repo: Repository, ref: Optional[str] = None) -> List[TreeEntry]:
+        """
+        List the whole repository tree in a single Git Trees API request.
+        
+        Args:
+            repo: Repository object
+            ref: Branch, tag or commit SHA (default: the default branch)
+        
+        Returns:
+            List of TreeEntry objects (files and directories)
+        """
+        return list_repo_tree(repo, ref)
+        
     def get_all_files(self, repo: Repository) -> List[ContentFile]:
         """
         Recursively fetch all files from a repository.
@@ -90,13 +231,17 @@ class GitHubClient:
             repo: Repository object
         
         Returns:
-            List of all ContentFile objects in the repo
+            List of all files in the repo (TreeEntry objects in "tree"
+            listing mode, ContentFile objects in "contents" mode)
         """
+        if self.listing_mode == "tree":
+            return [entry for entry in self.get_tree_entries(repo) if entry.type == "file"]
+        
         all_files = []
-        contents = self.get_repo_contents(repo)
+        contents = deque(self.get_repo_contents(repo))
         
         while contents:
-            current = contents.pop(0)
+            current = contents.popleft()
             if current.type == "dir":
                 # If it's a directory, fetch its contents and add to the list
                 contents.extend(self.get_repo_contents(repo, current.path))
@@ -104,4 +249,4 @@ class GitHubClient:
                 # If it's a file, add to our results
                 all_files.append(current)
         
-        return all_files
\ No newline at end of file
+        return all_files
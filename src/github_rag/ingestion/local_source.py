@@ -0,0 +1,323 @@
+import base64
+import hashlib
+import os
+import shutil
+import tarfile
+import tempfile
+import urllib.request
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import git
+from github_rag.ingestion.github_client import GitHubClient
+from github_rag.ingestion.repo_tree import TreeEntry
+from github_rag.utils.config import get_ingestion_config
+
+
+def git_blob_sha(file_path: Path) -> str:
+    """Compute the git blob SHA of a file on disk without loading it whole."""
+    digest = hashlib.sha1(f"blob {file_path.stat().st_size}\0".encode())
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Git tree entry mode of a symbolic link
+SYMLINK_MODE = 0o120000
+
+
+def _disk_path(root: Path, path: str) -> Path:
+    """A file inside a checkout, refusing paths that resolve outside it (e.g. through a symlink)."""
+    file_path = (root / path).resolve()
+    if not file_path.is_relative_to(root.resolve()):
+        raise ValueError(f"{path} resolves outside the checkout")
+    return file_path
+
+
+def _read_from_disk(root: Path):
+    """Build a loader that reads file bodies from a directory on disk."""
+    def load(entry: TreeEntry) -> bytes:
+        return _disk_path(root, entry.path).read_bytes()
+    return load
+
+
+def _stream_from_disk(root: Path):
+    """Build a streamer that reads file bodies from a directory on disk in blocks."""
+    def stream(entry: TreeEntry, chunk_size: int) -> Iterator[bytes]:
+        with open(_disk_path(root, entry.path), 'rb') as f:
+            yield from iter(lambda: f.read(chunk_size), b'')
+    return stream
+
+
+class LocalRepository:
+    """A repository checked out on disk (shallow clone, working tree or extracted tarball).
+
+    Mirrors the Repository attributes the UI displays, and lists its files
+    as TreeEntry objects read straight from disk.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        full_name: str,
+        html_url: str = "",
+        default_branch: Optional[str] = None,
+        description: Optional[str] = None
+    ):
+        self.root = Path(root)
+        self.full_name = full_name
+        self.html_url = html_url
+        self.default_branch = default_branch or "HEAD"
+        self.description = description
+        self.stargazers_count = 0
+        self.forks_count = 0
+        self.language = None
+        self._entries: Optional[List[TreeEntry]] = None
+        self._shas: Dict[str, Tuple[int, int, str]] = {}  # path -> (size, mtime_ns, blob SHA)
+
+    def _file_url(self, path: str) -> str:
+        """Link to a file on GitHub when known, otherwise on disk."""
+        if self.html_url:
+            return f"{self.html_url}/blob/{self.default_branch}/{path}"
+        return (self.root / path).resolve().as_uri()
+
+    def _blob_sha(self, path: str) -> Tuple[int, str]:
+        """Size and git blob SHA of a file on disk, re-hashed only when its size or mtime changed."""
+        file_path = self.root / path
+        stat = file_path.stat()
+        cached = self._shas.get(path)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return stat.st_size, cached[2]
+        sha = git_blob_sha(file_path)
+        self._shas[path] = (stat.st_size, stat.st_mtime_ns, sha)
+        return stat.st_size, sha
+
+    def list_entries(self, refresh: bool = False) -> List[TreeEntry]:
+        """
+        List all files and directories in the checkout.
+
+        Bodies are read from the working tree, so every file is listed with
+        the blob SHA of its content on disk. In git checkouts, files that
+        match HEAD take their size and SHA from the object database; modified,
+        staged and untracked (not ignored) files are hashed from disk. The
+        listing is kept until refresh=True, and hashes are reused for files
+        whose size and mtime have not changed.
+
+        Args:
+            refresh: Re-read the checkout instead of returning the last listing
+
+        Returns:
+            List of TreeEntry objects, sorted by path
+        """
+        if self._entries is None or refresh:
+            if (self.root / ".git").exists():
+                self._entries = self._list_git_checkout()
+            else:
+                self._entries = self._list_directory()
+        return list(self._entries)
+
+    def _file_entry(self, path: str, size: int, sha: str) -> TreeEntry:
+        return TreeEntry(path, "file", size, sha, self._file_url(path),
+                         _read_from_disk(self.root), streamer=_stream_from_disk(self.root))
+
+    def _list_git_checkout(self) -> List[TreeEntry]:
+        """List a git working tree: HEAD's object database plus local changes."""
+        git_repo = git.Repo(self.root)
+        head = git_repo.head.commit
+
+        # Paths whose working-tree content differs from HEAD, and what replaced them
+        diffs = head.diff(None)
+        stale = {diff.a_path for diff in diffs if diff.a_path}
+        changed = {diff.b_path for diff in diffs if diff.b_path and not diff.deleted_file}
+        changed.update(git_repo.untracked_files)
+
+        files, entries = [], []
+        for item in head.tree.traverse():
+            if item.type == "blob" and item.mode == SYMLINK_MODE:
+                continue  # Its target may lie outside the checkout
+            if item.type == "blob" and item.path not in stale:
+                files.append(self._file_entry(item.path, item.size, item.hexsha))
+            elif item.type == "commit":
+                entries.append(TreeEntry(item.path, "submodule", 0, item.hexsha))
+
+        for path in changed:
+            file_path = self.root / path
+            if file_path.is_symlink() or not file_path.is_file():
+                continue
+            files.append(self._file_entry(path, *self._blob_sha(path)))
+
+        # Directories are those holding at least one listed file
+        dirs = {path.rsplit('/', 1)[0] for path in (entry.path for entry in files) if '/' in path}
+        for folder in list(dirs):
+            while '/' in folder:
+                folder = folder.rsplit('/', 1)[0]
+                dirs.add(folder)
+        entries.extend(TreeEntry(folder, "dir") for folder in dirs)
+
+        return sorted(files + entries, key=lambda e: e.path)
+
+    def _list_directory(self) -> List[TreeEntry]:
+        """List a plain directory by walking it on disk."""
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if d != ".git")
+            rel_dir = Path(dirpath).relative_to(self.root).as_posix()
+            prefix = "" if rel_dir == "." else rel_dir + "/"
+
+            for dirname in dirnames:
+                entries.append(TreeEntry(prefix + dirname, "dir"))
+
+            for filename in filenames:
+                file_path = Path(dirpath) / filename
+                if file_path.is_symlink() or not file_path.is_file():
+                    continue
+                entries.append(self._file_entry(prefix + filename, *self._blob_sha(prefix + filename)))
+
+        return sorted(entries, key=lambda e: e.path)
+
+
+class LocalRepoClient(GitHubClient):
+    """GitHubClient-compatible source that ingests repositories from disk.
+
+    Modes (``[ingestion] source``):
+        clone   - shallow ``git clone --depth 1`` into the checkout directory
+        tarball - download and extract the repository tarball
+        local   - use an existing working tree; the "URL" is a filesystem path
+
+    File bodies are read from disk, so ingestion makes no per-file API calls.
+    """
+
+    def __init__(self, mode: Optional[str] = None):
+        """Initialize the local source from config.toml."""
+        super().__init__()
+        config = get_ingestion_config()
+        self.mode = mode or config.get("source", "clone")
+        self.checkout_directory = Path(config.get("checkout_directory", "data/repos"))
+        self.github_token = os.getenv("GITHUB_TOKEN")
+        self.blob_cache = None  # Files are already on local disk
+
+    def parse_repo_url(self, repo_url: str) -> tuple[str, str]:
+        """Parse a GitHub URL, or name a local directory as (parent, directory)."""
+        local_path = Path(repo_url).expanduser()
+        if local_path.is_dir():
+            local_path = local_path.resolve()
+            return local_path.parent.name, local_path.name
+        return super().parse_repo_url(repo_url)
+    
+    def get_repository(self, repo_url: str) -> LocalRepository:
+        """
+        Make the repository available on disk and return it.
+
+        Args:
+            repo_url: GitHub repository URL, or a directory path in "local" mode
+
+        Returns:
+            LocalRepository object
+        """
+        if self.mode == "local" or Path(repo_url).expanduser().is_dir():
+            root = Path(repo_url).expanduser().resolve()
+            if not root.is_dir():
+                raise ValueError(f"Not a directory: {repo_url}")
+            return self._open_working_tree(root)
+
+        owner, repo_name = self.parse_repo_url(repo_url)
+        html_url = f"https://github.com/{owner}/{repo_name}"
+        target = self.checkout_directory / f"{owner}__{repo_name}"
+
+        if self.mode == "clone":
+            ref = self._shallow_clone(html_url, target)
+        elif self.mode == "tarball":
+            ref = self._download_tarball(owner, repo_name, target)
+        else:
+            raise ValueError(f"Unknown ingestion source: {self.mode}")
+
+        return LocalRepository(target, f"{owner}/{repo_name}", html_url, ref)
+
+    def get_repo_contents(self, repo: LocalRepository, path: str = "") -> List[TreeEntry]:
+        """Get the direct children of a directory in the checkout."""
+        prefix = path.rstrip('/') + '/' if path else ''
+        return [
+            entry for entry in repo.list_entries()
+            if entry.path.startswith(prefix) and '/' not in entry.path[len(prefix):]
+        ]
+
+    def get_tree_entries(self, repo: LocalRepository, ref: Optional[str] = None) -> List[TreeEntry]:
+        """List the whole checkout (ref is fixed by the checkout)."""
+        return repo.list_entries()
+
+    def get_all_files(self, repo: LocalRepository) -> List[TreeEntry]:
+        """Get all files in the checkout."""
+        return [entry for entry in repo.list_entries() if entry.type == "file"]
+
+    def _open_working_tree(self, root: Path) -> LocalRepository:
+        """Wrap an existing directory, picking up git metadata when present."""
+        html_url = ""
+        ref = None
+        full_name = root.name
+
+        if (root / ".git").exists():
+            git_repo = git.Repo(root)
+            ref = git_repo.head.commit.hexsha
+            if git_repo.remotes and "github.com" in git_repo.remotes[0].url:
+                remote_url = git_repo.remotes[0].url.replace("git@github.com:", "github.com/")
+                owner, repo_name = self.parse_repo_url(remote_url)
+                full_name = f"{owner}/{repo_name}"
+                html_url = f"https://github.com/{full_name}"
+
+        return LocalRepository(root, full_name, html_url, ref)
+
+    def _git_auth_env(self) -> Dict[str, str]:
+        """
+        Environment that authenticates one git command to GitHub with GITHUB_TOKEN.
+
+        The token travels as an HTTP header set through GIT_CONFIG_* variables,
+        so it is neither written to .git/config nor visible in the process list.
+        """
+        if not self.github_token:
+            return {}
+        credentials = base64.b64encode(f"x-access-token:{self.github_token}".encode()).decode()
+        return {
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.https://github.com/.extraheader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+        }
+
+    def _shallow_clone(self, html_url: str, target: Path) -> str:
+        """Clone (or refresh) a depth-1 checkout and return its commit SHA."""
+        clone_url = html_url + ".git"
+        if (target / ".git").exists():
+            git_repo = git.Repo(target)
+            git_repo.remotes.origin.set_url(clone_url)  # Drops a token older versions stored in the URL
+            with git_repo.git.custom_environment(**self._git_auth_env()):
+                git_repo.remotes.origin.fetch(depth=1)
+            git_repo.head.reset("FETCH_HEAD", index=True, working_tree=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            git_repo = git.Repo.clone_from(clone_url, target, env=self._git_auth_env(), depth=1, single_branch=True)
+
+        return git_repo.head.commit.hexsha
+
+    def _download_tarball(self, owner: str, repo_name: str, target: Path, ref: str = "") -> str:
+        """Download and extract the repository tarball; return the archive's commit SHA."""
+        url = f"https://api.github.com/repos/{owner}/{repo_name}/tarball/{ref}".rstrip('/')
+        request = urllib.request.Request(url, headers={"Accept": "application/vnd.github+json"})
+        if self.github_token:
+            request.add_header("Authorization", f"Bearer {self.github_token}")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=target.parent) as tmp_dir:
+            archive_path = Path(tmp_dir) / "repo.tar.gz"
+            with urllib.request.urlopen(request) as response, open(archive_path, 'wb') as f:
+                shutil.copyfileobj(response, f, length=1024 * 1024)
+
+            extract_dir = Path(tmp_dir) / "extract"
+            with tarfile.open(archive_path, 'r:gz') as archive:
+                archive.extractall(extract_dir, filter="data")
+
+            # GitHub archives contain a single "<owner>-<repo>-<sha>" directory
+            (top_level,) = list(extract_dir.iterdir())
+            if target.exists():
+                shutil.rmtree(target)
+            shutil.move(str(top_level), target)
+
+        return top_level.name.rsplit('-', 1)[-1]
@@ -0,0 +1,167 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from github_rag.rag.vector_store import get_chunk_id
+from github_rag.utils.config import get_ingestion_config
+
+
+class IngestionManifest:
+    """Persisted record of an ingested repository: file path -> blob SHA -> chunk IDs.
+
+    Re-runs compare the current file listing against the manifest so only
+    added or modified files are fetched, chunked and embedded, and only the
+    vectors of modified or deleted files are removed from the store.
+    """
+
+    def __init__(self, repo_full_name: str, collection: str = ""):
+        """
+        Load (or start) the manifest for a repository.
+
+        Args:
+            repo_full_name: Repository name, e.g. "owner/repo"
+            collection: Vector store collection/index the chunks live in; a
+                manifest recorded against another collection is ignored
+        """
+        config = get_ingestion_config()
+        manifest_directory = Path(config.get("manifest_directory", "data/manifests"))
+        self.path = manifest_directory / f"{repo_full_name.replace('/', '__')}.json"
+        self.repo_full_name = repo_full_name
+        self.collection = collection
+        self.files: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get("collection", "") == collection:
+                self.files = data.get("files", {})
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def plan(self, content_files: List) -> Dict[str, List]:
+        """
+        Compare the current file listing against the manifest.
+
+        Files previously ingested but absent from ``content_files`` count as
+        deleted, so the index mirrors the current selection. An unchanged
+        file that shares a stored chunk with a modified or deleted file
+        (copies merged by ChunkDeduplicator.merge) counts as modified, so
+        it is re-ingested when that chunk is removed.
+
+        Args:
+            content_files: Files selected for ingestion (ContentFile or TreeEntry)
+
+        Returns:
+            Dictionary with 'added', 'modified' and 'unchanged' files, and
+            'deleted' file paths
+        """
+        plan = {'added': [], 'modified': [], 'unchanged': [], 'deleted': []}
+        current_paths = set()
+
+        for content_file in content_files:
+            current_paths.add(content_file.path)
+            recorded = self.files.get(content_file.path)
+            if recorded is None:
+                plan['added'].append(content_file)
+            elif recorded['sha'] != content_file.sha:
+                plan['modified'].append(content_file)
+            else:
+                plan['unchanged'].append(content_file)
+
+        plan['deleted'] = sorted(path for path in self.files if path not in current_paths)
+
+        replaced = [f.path for f in plan['modified']] + plan['deleted']
+        while replaced:
+            stale = {chunk_id for path in replaced for chunk_id in self.files.get(path, {}).get('chunk_ids', [])}
+            sharing = [f for f in plan['unchanged'] if stale.intersection(self.files[f.path]['chunk_ids'])]
+            plan['unchanged'] = [f for f in plan['unchanged'] if f not in sharing]
+            plan['modified'].extend(sharing)
+            replaced = [f.path for f in sharing]
+        return plan
+
+    def files_to_ingest(self, plan: Dict[str, List]) -> List:
+        """Files that need fetching, chunking and embedding."""
+        return plan['added'] + plan['modified']
+
+    def stale_chunk_ids(self, plan: Dict[str, List]) -> List[str]:
+        """Chunk IDs of modified and deleted files, to delete before upserting."""
+        paths = [f.path for f in plan['modified']] + plan['deleted']
+        chunk_ids = (chunk_id for path in paths for chunk_id in self.files.get(path, {}).get('chunk_ids', []))
+        return list(dict.fromkeys(chunk_ids))  # Merged chunks are listed under every copy's file
+
+    def apply(self, plan: Dict[str, List], chunks: List[Dict], files: Iterable[Dict] = ()) -> None:
+        """
+        Update the manifest after a sync.
+
+        Args:
+            plan: Plan returned by plan()
+            chunks: Chunks stored for the added and modified files
+            files: Metadata of every file that was processed, including
+                files that produced no (valid) chunks
+        """
+        for path in plan['deleted']:
+            self.files.pop(path, None)
+        for content_file in plan['modified']:
+            self.files.pop(content_file.path, None)
+        self.record_files(files)
+        self.record_chunks(chunks)
+
+    def _entry(self, metadata: Dict) -> Dict:
+        """The manifest entry for a file, started afresh if its blob SHA changed."""
+        entry = self.files.get(metadata['file_path'])
+        if entry is None or entry['sha'] != metadata.get('file_sha'):
+            entry = {'sha': metadata.get('file_sha'), 'chunk_ids': []}
+            self.files[metadata['file_path']] = entry
+        return entry
+
+    def record_files(self, files: Iterable[Dict]) -> None:
+        """
+        Record processed files by blob SHA, so files without chunks (empty,
+        or entirely rejected by the validator) are not processed again.
+
+        Args:
+            files: File metadata dicts with 'file_path' and 'file_sha'
+        """
+        for metadata in files:
+            self._entry(metadata)
+
+    def record_chunks(self, chunks: List[Dict], merged: Optional[Iterable[List[int]]] = None) -> None:
+        """
+        Record chunk IDs per file, keyed by the file's blob SHA.
+
+        Args:
+            chunks: Chunks stored for the files
+            merged: Chunk indexes of each set of copies stored as one chunk,
+                the first of the set (ChunkDeduplicator.group() order, as
+                used by merge()); every copy's file records that chunk's ID
+        """
+        if merged is None:
+            merged = ([i] for i in range(len(chunks)))
+        for indexes in merged:
+            chunk_id = get_chunk_id(chunks[indexes[0]])
+            for i in indexes:
+                self._entry(chunks[i]['metadata'])['chunk_ids'].append(chunk_id)
+
+    def discard_files(self, files: Iterable[Dict]) -> None:
+        """
+        Forget files whose ingestion failed part-way, so the next sync retries them.
+
+        Args:
+            files: File metadata dicts with 'file_path'
+        """
+        for metadata in files:
+            self.files.pop(metadata['file_path'], None)
+
+    def clear(self) -> None:
+        """Forget all ingested files (e.g. after the collection is cleared)."""
+        self.files = {}
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({
+                "repo": self.repo_full_name,
+                "collection": self.collection,
+                "files": self.files
+            }, f, indent=2)
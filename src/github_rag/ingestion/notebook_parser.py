@@ -1,45 +1,269 @@
 import json
-from typing import Optional
+import re
+from typing import Iterable, Iterator, Optional, Tuple, Union
+from github_rag.utils.config import get_notebook_config
 
+CELL_SEPARATOR = '\n\n# --- Next Cell ---\n\n'
 
-def parse_notebook_cells(content: str, max_cells: int = 5) -> Optional[str]:
+_WHITESPACE = re.compile(r'\s*')
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_SCALAR_END = re.compile(r'[,\]}\s]')
+
+
+class _NotebookScanner:
+    """Walks notebook JSON in place, decoding only the values asked for.
+
+    Values that are skipped (outputs, attachments, metadata) are stepped
+    over with regexes that match whole strings and brackets at once, so
+    large base64 image outputs are never turned into Python objects. The
+    text may arrive in pieces; only the unconsumed tail of what has been
+    read is kept, so a streamed notebook is never held whole.
     """
-    Parse Jupyter notebook and extract only first N code cells.
-    
+
+    def __init__(self, content: Union[str, Iterable[str]]):
+        self._pieces = iter((content,) if isinstance(content, str) else content)
+        self.text = ''
+        self.pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _read_more(self) -> bool:
+        """Append more text to the buffer, dropping what has been consumed.
+
+        At least as much as is still buffered is read, so values re-scanned
+        after a refill cost linear time overall.
+
+        Returns:
+            False if the content is exhausted
+        """
+        pending = self.text[self.pos:]
+        pieces, wanted = [pending], max(len(pending), 1)
+        for piece in self._pieces:
+            pieces.append(piece)
+            wanted -= len(piece)
+            if wanted <= 0:
+                break
+        if len(pieces) == 1:
+            return False
+        self.text = ''.join(pieces)
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self._read_more():
+                return
+
+    def _expect(self, char: str) -> None:
+        if not self._next_is(char):
+            raise ValueError(f"Expected {char!r}, found {self.text[self.pos:self.pos + 20]!r}")
+
+    def _next_is(self, char: str) -> bool:
+        """Consume ``char`` if it is the next non-whitespace character."""
+        self._skip_whitespace()
+        if self.text[self.pos:self.pos + 1] == char:
+            self.pos += 1
+            return True
+        return False
+
+    def decode_value(self):
+        """Decode the value at the current position."""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                # Usually a value cut off at the end of the buffer
+                if self._read_more():
+                    continue
+                raise
+            # A number or literal ending the buffer may continue in the next piece
+            if end < len(self.text) or not self._read_more():
+                self.pos = end
+                return value
+
+    def skip_value(self) -> None:
+        """Step over the value at the current position without decoding it."""
+        self._skip_whitespace()
+        char = self.text[self.pos:self.pos + 1]
+        if char == '"':
+            self._skip_string()
+        elif char in ('[', '{'):
+            depth = 0
+            while True:
+                match = _STRUCTURAL.search(self.text, self.pos)
+                if match is None:
+                    self.pos = len(self.text)
+                    if not self._read_more():
+                        raise ValueError("Unterminated JSON container")
+                    continue
+                token = match.group()
+                self.pos = match.start()
+                if token == '"':
+                    self._skip_string()
+                    continue
+                self.pos += 1
+                depth += 1 if token in '[{' else -1
+                if depth == 0:
+                    return
+        else:
+            while True:
+                match = _SCALAR_END.search(self.text, self.pos)
+                if match is not None:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.text)
+                if not self._read_more():
+                    return
+
+    def _skip_string(self) -> None:
+        """Step over the JSON string opening at the current position."""
+        end = self.pos
+        while True:
+            # str.find scans at C speed; most strings (base64 outputs) have no escapes
+            end = self.text.find('"', end + 1)
+            if end == -1:
+                # Keep the trailing backslashes, which may escape a quote in the next piece,
+                # and the character before them, which stops the look-back below
+                end = len(self.text) - 1
+                while self.text[end] == '\\':
+                    end -= 1
+                self.pos = end
+                if not self._read_more():
+                    raise ValueError("Unterminated JSON string")
+                end = self.pos
+                continue
+            backslashes = 0
+            while self.text[end - 1 - backslashes] == '\\':
+                backslashes += 1
+            if backslashes % 2 == 0:
+                self.pos = end + 1
+                return
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of the object at the current position; the caller consumes each value."""
+        self._expect('{')
+        if self._next_is('}'):
+            return
+        while True:
+            key = self.decode_value()
+            self._expect(':')
+            yield key
+            if self._next_is('}'):
+                return
+            self._expect(',')
+
+    def iter_array(self) -> Iterator[None]:
+        """Yield once per element of the array at the current position; the caller consumes each element."""
+        self._expect('[')
+        if self._next_is(']'):
+            return
+        while True:
+            yield None
+            if self._next_is(']'):
+                return
+            self._expect(',')
+
+
+def iter_notebook_cells(content: Union[str, Iterable[str]]) -> Iterator[Tuple[str, str]]:
+    """
+    Stream (cell_type, source) pairs from a notebook's cells array.
+
+    Only each cell's ``cell_type`` and ``source`` are decoded; outputs and
+    metadata are skipped in place. Stopping the iteration stops the scan,
+    so the rest of the notebook is never looked at (or downloaded, when
+    the content is streamed).
+
     Args:
-        content: Raw .ipynb file content (JSON string)
-        max_cells: Maximum number of code cells to extract
-    
+        content: Raw .ipynb file content (JSON string), or its text in
+            pieces (e.g. GitHubClient.iter_file_content)
+
+    Yields:
+        Tuples of (cell type, cell source)
+    """
+    scanner = _NotebookScanner(content)
+    for key in scanner.iter_object():
+        if key != 'cells':
+            scanner.skip_value()
+            continue
+
+        for _ in scanner.iter_array():
+            cell_type, source = None, ''
+            for cell_key in scanner.iter_object():
+                if cell_key == 'cell_type':
+                    cell_type = scanner.decode_value()
+                elif cell_key == 'source':
+                    source = scanner.decode_value()
+                else:
+                    scanner.skip_value()
+            if isinstance(source, list):
+                source = ''.join(source)
+            yield cell_type, source
+        return
+
+
+def iter_selected_cells(
+    content: Union[str, Iterable[str]],
+    max_cells: Optional[int] = None,
+    include_markdown: Optional[bool] = None,
+    max_markdown_cells: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Stream the sources of the cells parse_notebook_cells extracts, in notebook order.
+
+    Arguments are as for parse_notebook_cells, but parse errors are raised
+    rather than turned into None.
+
+    Yields:
+        Non-empty cell sources
+    """
+    config = get_notebook_config()
+    limits = {'code': config.get('max_code_cells', 5) if max_cells is None else max_cells}
+    if config.get('include_markdown', False) if include_markdown is None else include_markdown:
+        limits['markdown'] = config.get('max_markdown_cells', 5) if max_markdown_cells is None else max_markdown_cells
+    counts = dict.fromkeys(limits, 0)
+
+    def is_full(cell_type: str) -> bool:
+        return limits[cell_type] > 0 and counts[cell_type] >= limits[cell_type]
+
+    for cell_type, source in iter_notebook_cells(content):
+        if cell_type not in limits or is_full(cell_type) or not source.strip():
+            continue
+        yield source
+        counts[cell_type] += 1
+
+        # Stop scanning once every selected cell type has what it needs
+        if all(is_full(t) for t in limits):
+            return
+
+
+def parse_notebook_cells(
+    content: Union[str, Iterable[str]],
+    max_cells: Optional[int] = None,
+    include_markdown: Optional[bool] = None,
+    max_markdown_cells: Optional[int] = None
+) -> Optional[str]:
+    """
+    Parse Jupyter notebook and extract the first N code (and optionally markdown) cells.
+
+    Args:
+        content: Raw .ipynb file content (JSON string), or its text in pieces
+        max_cells: Maximum number of code cells to extract, 0 for all
+            (default: [notebooks] max_code_cells)
+        include_markdown: Also extract markdown cells, in notebook order
+            (default: [notebooks] include_markdown)
+        max_markdown_cells: Maximum number of markdown cells, 0 for all
+            (default: [notebooks] max_markdown_cells)
+
     Returns:
-        Extracted code as string, or None if parsing fails
+        Extracted cells as string, or None if parsing fails
     """
     try:
-        notebook = json.loads(content)
-        
-        if 'cells' not in notebook:
-            return None
-        
-        code_cells = []
-        for cell in notebook['cells']:
-            if cell.get('cell_type') == 'code':
-                # Get source (can be string or list of strings)
-                source = cell.get('source', '')
-                if isinstance(source, list):
-                    source = ''.join(source)
-                
-                # Skip empty cells
-                if source.strip():
-                    code_cells.append(source)
-                
-                # Stop after max_cells
-                if len(code_cells) >= max_cells:
-                    break
-        
-        if not code_cells:
+        cells = list(iter_selected_cells(content, max_cells, include_markdown, max_markdown_cells))
+        if not cells:
             return None
-        
-        # Join with separators
-        return '\n\n# --- Next Cell ---\n\n'.join(code_cells)
-    
+
+        return CELL_SEPARATOR.join(cells)
+
     except Exception:
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from github import ContentFile
+from github_rag.ingestion.chunk_batch import ChunkBatch
+from github_rag.ingestion.chunker import Chunker
+from github_rag.ingestion.content_normalizer import ContentNormalizer
+from github_rag.utils.config import get_chunking_config
+
+# Per-process state, created once by _init_worker
+_worker_normalizer: Optional[ContentNormalizer] = None
+_worker_chunker: Optional[Chunker] = None
+
+
+def _init_worker() -> None:
+    """Load the normalizer and the tokenizer once per worker process."""
+    global _worker_normalizer, _worker_chunker
+    _worker_normalizer = ContentNormalizer()
+    _worker_chunker = Chunker()
+
+
+def _chunk_document(content: str, metadata: Dict[str, str]) -> List[Dict[str, any]]:
+    """Normalize and chunk one fetched file inside a worker process."""
+    normalized = _worker_normalizer.normalize_document(content, metadata['file_path'])
+    return _worker_chunker.split_document(normalized, metadata)
+
+
+def get_cpu_workers() -> int:
+    """Chunking processes from [chunking] cpu_workers (0 = one per CPU)."""
+    workers = get_chunking_config().get("cpu_workers", 0)
+    return max(1, workers or os.cpu_count() or 1)
+
+
+class ParallelChunker:
+    """Normalizes and chunks files on a process pool.
+
+    Downloads stay on the normalizer's thread pool; the CPU-bound part
+    (normalization, tokenization, chunking) is spread over ``cpu_workers``
+    processes, each loading the tokenizer once. Chunks come back in input
+    file order, so results match the serial path exactly.
+
+    Worker processes are started with the "spawn" method, which is safe
+    inside threaded hosts such as Streamlit. Call close() (or use the
+    chunker as a context manager) to stop them.
+    """
+
+    def __init__(
+        self,
+        normalizer: ContentNormalizer,
+        chunker: Optional[Chunker] = None,
+        workers: Optional[int] = None
+    ):
+        """
+        Initialize the parallel chunker.
+
+        Args:
+            normalizer: ContentNormalizer used to fetch files
+            chunker: Chunker used in this process (single worker, streamed files)
+            workers: Number of processes (default: [chunking] cpu_workers)
+        """
+        self.normalizer = normalizer
+        self.chunker = chunker
+        self.workers = workers or get_cpu_workers()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _split_stream(self, fetched: Dict[str, any]) -> Optional[List[Dict[str, any]]]:
+        """Chunk a streamed file in this process; None if its download fails part-way."""
+        try:
+            return list(self.chunker.split_stream(fetched['lines'], fetched['metadata']))
+        except Exception as e:
+            print(f"Warning: Failed to stream content from {fetched['metadata']['file_path']}: {e}")
+            return None
+
+    def iter_chunk_files(
+        self,
+        content_files: List[ContentFile],
+        progress_callback: Optional[Callable[[int, int, ContentFile], None]] = None
+    ) -> Iterator[Tuple[Dict[str, str], List[Dict[str, any]]]]:
+        """
+        Fetch, normalize and chunk files.
+
+        Args:
+            content_files: Files to chunk
+            progress_callback: Optional callable(done, total, content_file),
+                invoked in the caller's thread as each file is fetched
+
+        Yields:
+            (file metadata, list of chunks) for each file fetched (or
+            streamed) in full, in input order
+        """
+        if self.chunker is None:
+            self.chunker = Chunker()
+        
+        if self.workers <= 1:
+            for processed in self.normalizer.iter_process_files(content_files, progress_callback):
+                if processed is None:
+                    continue
+                if 'lines' in processed:
+                    chunks = self._split_stream(processed)
+                    if chunks is not None:
+                        yield processed['metadata'], chunks
+                else:
+                    yield processed['metadata'], self.chunker.split_document(processed['content'], processed['metadata'])
+            return
+
+        executor = self._get_executor()
+        pending = deque()
+        try:
+            for fetched in self.normalizer.iter_fetch_files(content_files, progress_callback):
+                if fetched is None:
+                    continue
+                if 'lines' in fetched:
+                    # Streamed (oversized) files are read and chunked here, in order
+                    while pending:
+                        metadata, future = pending.popleft()
+                        yield metadata, future.result()
+                    chunks = self._split_stream(fetched)
+                    if chunks is not None:
+                        yield fetched['metadata'], chunks
+                    continue
+                future = executor.submit(_chunk_document, fetched['content'], fetched['metadata'])
+                pending.append((fetched['metadata'], future))
+
+                # Keep a bounded number of documents queued per worker
+                while len(pending) >= 2 * self.workers:
+                    metadata, future = pending.popleft()
+                    yield metadata, future.result()
+
+            while pending:
+                metadata, future = pending.popleft()
+                yield metadata, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def chunk_files(
+        self,
+        content_files: List[ContentFile],
+        progress_callback: Optional[Callable[[int, int, ContentFile], None]] = None
+    ) -> ChunkBatch:
+        """
+        Fetch, normalize and chunk files, returning all chunks in input order.
+
+        Chunk dicts only exist one file at a time; everything kept is
+        stored compactly in a ChunkBatch, whose ``files`` table lists every
+        processed file, including files that produced no chunks.
+
+        Args:
+            content_files: Files to chunk
+            progress_callback: Optional callable(done, total, content_file)
+
+        Returns:
+            ChunkBatch, iterable as chunk dicts
+        """
+        batch = ChunkBatch()
+        for metadata, chunks in self.iter_chunk_files(content_files, progress_callback):
+            batch.add_file(metadata)
+            batch.extend(chunks)
+        return batch
@@ -0,0 +1,285 @@
+import queue
+import threading
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from github_rag.ingestion.chunker import Chunker
+from github_rag.ingestion.content_normalizer import ContentNormalizer
+from github_rag.ingestion.deduplicator import ChunkDeduplicator, dedup_enabled
+from github_rag.rag.vector_store import get_chunk_id
+from github_rag.utils.chunk_validator import ChunkValidator
+from github_rag.utils.config import get_ingestion_config
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+class _FileDone:
+    """Follows a file's last chunk through the queues, so the file is recorded once all its chunks are stored."""
+
+    __slots__ = ('metadata',)
+
+    def __init__(self, metadata: Dict):
+        self.metadata = metadata
+
+
+class _FileFailed:
+    """Follows the chunks of a file whose stream failed part-way, so they are dropped or deleted."""
+
+    __slots__ = ('metadata', 'chunk_ids')
+
+    def __init__(self, metadata: Dict, chunk_ids: List[str]):
+        self.metadata = metadata
+        self.chunk_ids = chunk_ids
+
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    """Group an iterable into lists of up to size items."""
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+class IngestionPipeline:
+    """Streams files through fetch -> normalize -> chunk -> validate -> embed -> upsert.
+
+    Each stage runs in its own thread and hands work to the next through a
+    bounded queue, so downloads, chunking, embedding requests and vector
+    upserts overlap, and memory holds only a few batches at a time no
+    matter how large the repository is.
+    """
+
+    def __init__(
+        self,
+        normalizer: ContentNormalizer,
+        chunker: Chunker,
+        embedding_generator,
+        vector_store,
+        validator: Optional[ChunkValidator] = None,
+        manifest=None,
+        deduplicator: Optional[ChunkDeduplicator] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            normalizer: ContentNormalizer used to fetch and normalize files
+            chunker: Chunker used to split documents
+            embedding_generator: EmbeddingGenerator used to embed chunks
+            vector_store: Vector store chunks are upserted into
+            validator: Optional ChunkValidator (default: 500-token limit)
+            manifest: Optional IngestionManifest updated as chunks are stored
+            deduplicator: Optional ChunkDeduplicator (default: one per pipeline
+                if [ingestion] dedup_chunks is on)
+        """
+        config = get_ingestion_config()
+        self.normalizer = normalizer
+        self.chunker = chunker
+        self.embedding_gen = embedding_generator
+        self.vector_store = vector_store
+        self.validator = validator or ChunkValidator(max_chunk_tokens=500)
+        self.manifest = manifest
+        self.deduplicator = deduplicator or (ChunkDeduplicator() if dedup_enabled() else None)
+        self.batch_size = config.get("batch_size", 100)
+        self.queue_size = config.get("queue_size", 4)
+
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def run(
+        self,
+        content_files: List,
+        progress_callback: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Ingest files end to end.
+
+        Args:
+            content_files: Files to ingest (ContentFile or TreeEntry)
+            progress_callback: Optional callable(stats), invoked in the
+                caller's thread after every upserted batch
+
+        Returns:
+            Dictionary of ingestion statistics
+        """
+        self._stop.clear()
+        self._errors = []
+        stats = {
+            'files_total': len(content_files),
+            'files_processed': 0,
+            'files_failed': 0,
+            'chunks_stored': 0,
+            'tokens_stored': 0,
+            'batches_stored': 0,
+            'duplicate_chunks': 0,
+            'tokens_saved': 0,
+            'warnings': []
+        }
+
+        documents = queue.Queue(maxsize=self.queue_size)
+        chunks = queue.Queue(maxsize=self.queue_size * self.batch_size)
+        batches = queue.Queue(maxsize=self.queue_size)
+
+        stages = [
+            threading.Thread(target=self._fetch_stage, args=(content_files, documents, stats), daemon=True),
+            threading.Thread(target=self._chunk_stage, args=(documents, chunks, stats), daemon=True),
+            threading.Thread(target=self._embed_stage, args=(chunks, batches), daemon=True)
+        ]
+        for stage in stages:
+            stage.start()
+
+        # Upsert in the caller's thread so progress callbacks can touch the UI
+        try:
+            while True:
+                batch = self._get(batches)
+                if batch is _DONE:
+                    break
+                batch_chunks, embeddings, files_done, files_failed = batch
+                if batch_chunks:
+                    self.vector_store.add_chunks(batch_chunks, embeddings)
+                    stats['batches_stored'] += 1
+                if files_failed:
+                    # Chunks of a truncated file stored by earlier batches
+                    self.vector_store.delete_chunks([i for failed in files_failed for i in failed.chunk_ids])
+                if self.manifest is not None:
+                    self.manifest.record_chunks(batch_chunks)
+                    self.manifest.record_files(files_done)
+                    self.manifest.discard_files(failed.metadata for failed in files_failed)
+
+                stats['chunks_stored'] += len(batch_chunks)
+                stats['tokens_stored'] += sum(c['metadata']['token_count'] for c in batch_chunks)
+                if self.deduplicator is not None:
+                    stats['duplicate_chunks'] = self.deduplicator.duplicate_chunks
+                    stats['tokens_saved'] = self.deduplicator.tokens_saved
+                if progress_callback:
+                    progress_callback(stats)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for stage in stages:
+                stage.join()
+
+        if self._errors:
+            raise self._errors[0]
+        if self.deduplicator is not None:
+            stats['duplicate_chunks'] = self.deduplicator.duplicate_chunks
+            stats['tokens_saved'] = self.deduplicator.tokens_saved
+        return stats
+
+    def _fetch_stage(self, content_files: List, documents: queue.Queue, stats: Dict) -> None:
+        """Fetch and normalize files (concurrently, in order)."""
+        try:
+            for processed in self.normalizer.iter_process_files(content_files):
+                if self._stop.is_set():
+                    break
+                stats['files_processed'] += 1
+                if processed is None:
+                    stats['files_failed'] += 1
+                    continue
+                self._put(documents, processed)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(documents, _DONE, force=True)
+
+    def _chunk_stage(self, documents: queue.Queue, chunks: queue.Queue, stats: Dict) -> None:
+        """Split documents into chunks and validate them."""
+        try:
+            while True:
+                document = self._get(documents)
+                if document is _DONE:
+                    break
+                if 'lines' in document:
+                    # Oversized file: chunks are produced as its lines stream in
+                    file_chunks = self.chunker.split_stream(document['lines'], document['metadata'])
+                else:
+                    file_chunks = self.chunker.split_document(document['content'], document['metadata'])
+                chunk_ids = []
+                try:
+                    for group in _batched(file_chunks, self.batch_size):
+                        valid_chunks, warnings = self.validator.validate_chunks(group)
+                        stats['warnings'].extend(warnings)
+                        for chunk in valid_chunks:
+                            self._put(chunks, chunk)
+                            chunk_ids.append(get_chunk_id(chunk))
+                        if self._stop.is_set():
+                            break
+                except Exception as e:
+                    # A streamed file failed part-way: none of it is kept or recorded
+                    path = document['metadata']['file_path']
+                    print(f"Warning: Failed to stream content from {path}: {e}")
+                    stats['files_failed'] += 1
+                    stats['warnings'].append(f"Failed to stream {path}: {e}")
+                    self._put(chunks, _FileFailed(document['metadata'], chunk_ids))
+                    continue
+                self._put(chunks, _FileDone(document['metadata']))
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(chunks, _DONE, force=True)
+
+    def _embed_stage(self, chunks: queue.Queue, batches: queue.Queue) -> None:
+        """Group chunks into batches and embed them."""
+        try:
+            batch, files_done, files_failed = [], [], []
+            while not self._stop.is_set():
+                chunk = self._get(chunks)
+                if isinstance(chunk, _FileDone):
+                    files_done.append(chunk.metadata)
+                elif isinstance(chunk, _FileFailed):
+                    path = chunk.metadata['file_path']
+                    batch = [c for c in batch if c['metadata']['file_path'] != path]  # Not embedded
+                    files_failed.append(chunk)
+                elif chunk is not _DONE:
+                    batch.append(chunk)
+                if (batch or files_done or files_failed) and (chunk is _DONE or len(batch) >= self.batch_size):
+                    if not batch:
+                        embeddings = []
+                    elif self.deduplicator is not None:
+                        # Copies within the batch, or of recently embedded chunks, reuse vectors
+                        embeddings = self.deduplicator.embed(batch, self.embedding_gen.generate_embeddings_batch)
+                    else:
+                        embeddings = self.embedding_gen.generate_embeddings_batch(
+                            [c['content'] for c in batch], [c['metadata'].get('token_count') for c in batch]
+                        )
+                    self._put(batches, (batch, embeddings, files_done, files_failed))
+                    batch, files_done, files_failed = [], [], []
+                if chunk is _DONE:
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(batches, _DONE, force=True)
+
+    def _fail(self, error: BaseException) -> None:
+        """Record a stage failure and stop every other stage."""
+        self._errors.append(error)
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, item, force: bool = False) -> None:
+        """Put with back-pressure, giving up once the pipeline is stopping."""
+        while True:
+            if self._stop.is_set() and not force:
+                return
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    # Make room so the end-of-stream marker still gets through
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def _get(self, q: queue.Queue):
+        """Get the next item, or _DONE once the pipeline is stopping."""
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _DONE
@@ -0,0 +1,304 @@
+import math
+import time
+from typing import Callable, Dict, List, Optional
+from github import ContentFile
+from github_rag.ingestion.chunker import Chunker
+from github_rag.ingestion.content_normalizer import ContentNormalizer
+from github_rag.ingestion.deduplicator import dedup_enabled
+from github_rag.ingestion.local_source import LocalRepoClient
+from github_rag.ingestion.parallel_chunker import get_cpu_workers
+from github_rag.rag.embeddings import pack_batches
+from github_rag.utils.blob_cache import get_blob_cache
+from github_rag.utils.config import get_embeddings_config, get_ingestion_config, get_planner_config
+from github_rag.utils.usage_tracker import UsageTracker
+
+# Bytes per cl100k token by extension, used until sampling measures the repository
+DEFAULT_BYTES_PER_TOKEN = {
+    ".py": 3.6, ".js": 3.4, ".ts": 3.5, ".jsx": 3.4, ".tsx": 3.5, ".java": 3.8,
+    ".go": 3.4, ".rs": 3.4, ".md": 4.2, ".txt": 4.3, ".ipynb": 6.0
+}
+_SAMPLE_QUANTILES = (0.5, 0.75, 0.25, 0.9, 0.1)  # file sizes sampled per extension, in order
+
+
+def file_extension(path: str) -> str:
+    """Extension with its dot (".py"), or "" for files like Makefile."""
+    name = path.rsplit('/', 1)[-1]
+    return f".{name.rsplit('.', 1)[-1].lower()}" if '.' in name else ""
+
+
+def file_folder(path: str) -> str:
+    """Parent folder of a path, "." for top-level files (as in the folder scan)."""
+    return path.rsplit('/', 1)[0] if '/' in path else '.'
+
+
+class IngestionPlanner:
+    """Projects the size, cost and duration of an ingestion before running it.
+
+    Works from tree-listing metadata alone: each file's byte size is turned
+    into tokens with a per-extension bytes-per-token ratio, and tokens into
+    chunks with the [chunking] size and overlap. A few files can be sampled
+    (downloaded, normalized and chunked for real) to replace the default
+    ratios with ones measured on this repository and to correct the
+    chunk-count model for the structure splitters. Sampled files land in
+    the blob cache, so the real run does not download them again.
+    """
+
+    def __init__(
+        self,
+        normalizer: Optional[ContentNormalizer] = None,
+        chunker: Optional[Chunker] = None,
+        usage_tracker: Optional[UsageTracker] = None
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            normalizer: ContentNormalizer used to fetch sampled files (no sampling without one)
+            chunker: Chunker used on sampled files, and for chunk size and overlap
+            usage_tracker: Source of embedding pricing
+        """
+        config = get_planner_config()
+        self.normalizer = normalizer
+        self.chunker = chunker or Chunker()
+        self.usage_tracker = usage_tracker or UsageTracker()
+        self.sample_files = config.get("sample_files", 6)
+        self.default_bytes_per_token = config.get("default_bytes_per_token", 3.5)
+        self.bytes_per_token = {**DEFAULT_BYTES_PER_TOKEN, **config.get("bytes_per_token", {})}
+        self.fetch_latency = config.get("fetch_latency_s", 0.3)
+        self.embed_request_latency = config.get("embed_request_latency_s", 0.8)
+        self.chunk_throughput = config.get("chunk_throughput_bytes_s", 2_000_000)
+
+        ingestion = get_ingestion_config()
+        self.fetch_workers = max(1, ingestion.get("fetch_workers", 8))
+        embeddings = get_embeddings_config()
+        self.max_request_tokens = embeddings.get("max_request_tokens", 250000)
+        self.max_request_items = embeddings.get("max_request_items", 2048)
+
+        self._measured: Dict[str, List[int]] = {}  # extension -> [bytes, tokens] over samples
+        self._chunk_factor = 1.0   # real chunks / modelled chunks on samples
+        self._embed_factor = 1.0   # real chunk tokens / modelled chunk tokens on samples
+        self.sampled: List[str] = []
+
+    def ratio(self, extension: str) -> float:
+        """Bytes per token for an extension: measured, configured, or overall measured/default."""
+        measured = self._measured.get(extension)
+        if measured and measured[1]:
+            return measured[0] / measured[1]
+        if extension in self.bytes_per_token:
+            return self.bytes_per_token[extension]
+        size = sum(m[0] for m in self._measured.values())
+        tokens = sum(m[1] for m in self._measured.values())
+        return size / tokens if tokens else self.default_bytes_per_token
+
+    def _model_chunks(self, tokens: float) -> tuple:
+        """(chunks, embedded tokens) for a file of this many tokens, overlap included."""
+        size, overlap = self.chunker.chunk_size, self.chunker.chunk_overlap
+        if tokens <= size:
+            return 1, tokens
+        chunks = math.ceil((tokens - overlap) / max(size - overlap, 1))
+        return chunks, tokens + (chunks - 1) * overlap
+
+    def _pick_samples(self, content_files: List[ContentFile]) -> List[ContentFile]:
+        """
+        Files to sample: the median-sized file of each extension, extensions
+        with the most bytes first, then other size quantiles while the budget lasts.
+        """
+        by_extension: Dict[str, List[ContentFile]] = {}
+        for content_file in content_files:
+            if self.normalizer.should_stream(content_file) or not content_file.size:
+                continue
+            by_extension.setdefault(file_extension(content_file.path), []).append(content_file)
+
+        order = sorted(by_extension, key=lambda ext: -sum(f.size for f in by_extension[ext]))
+        for files in by_extension.values():
+            files.sort(key=lambda f: f.size)
+
+        picked, paths = [], set()
+        for quantile in _SAMPLE_QUANTILES:
+            for ext in order:
+                files = by_extension[ext]
+                content_file = files[min(int(quantile * len(files)), len(files) - 1)]
+                if len(picked) < self.sample_files and content_file.path not in paths:
+                    picked.append(content_file)
+                    paths.add(content_file.path)
+        return picked
+
+    def sample(
+        self,
+        content_files: List[ContentFile],
+        progress_callback: Optional[Callable[[int, int, ContentFile], None]] = None
+    ) -> None:
+        """
+        Download, normalize and chunk a few representative files to calibrate
+        bytes per token, the chunk-count model, fetch latency and chunking speed.
+
+        Args:
+            content_files: Files that would be ingested
+            progress_callback: Optional callable(done, total, content_file)
+        """
+        if self.normalizer is None or self.sample_files <= 0:
+            return
+        samples = self._pick_samples(content_files)
+        modelled_chunks = real_chunks = 0
+        modelled_tokens = real_tokens = 0
+        fetch_time = chunk_time = chunk_bytes = 0.0
+
+        for i, content_file in enumerate(samples, 1):
+            started = time.perf_counter()
+            processed = self.normalizer.process_file(content_file)
+            fetched = time.perf_counter()
+            if processed is not None:
+                chunks = self.chunker.split_document(processed['content'], processed['metadata'])
+                chunk_time += time.perf_counter() - fetched
+                chunk_bytes += content_file.size
+                fetch_time += fetched - started
+
+                tokens = self.chunker.count_tokens(processed['content'])
+                measured = self._measured.setdefault(file_extension(content_file.path), [0, 0])
+                measured[0] += content_file.size
+                measured[1] += tokens
+
+                model = self._model_chunks(tokens)
+                modelled_chunks += model[0]
+                modelled_tokens += model[1]
+                real_chunks += len(chunks)
+                real_tokens += sum(c['metadata']['token_count'] for c in chunks)
+                self.sampled.append(content_file.path)
+            if progress_callback:
+                progress_callback(i, len(samples), content_file)
+
+        if modelled_chunks:
+            self._chunk_factor = real_chunks / modelled_chunks
+            self._embed_factor = real_tokens / modelled_tokens if modelled_tokens else 1.0
+        if self.sampled:
+            latency = fetch_time / len(self.sampled)
+            if latency > 0.01:  # Otherwise the samples came from the blob cache
+                self.fetch_latency = latency
+            if chunk_time > 0:
+                self.chunk_throughput = chunk_bytes / chunk_time
+
+    def plan(self, content_files: List[ContentFile]) -> Dict[str, any]:
+        """
+        Project an ingestion of content_files from their sizes.
+
+        Files sharing a blob SHA are downloaded once, and (with
+        [ingestion] dedup_chunks) embedded once; blobs already in the
+        local cache need no GitHub request. Embedding requests are packed
+        from the modelled chunk token counts within the [embeddings]
+        per-request limits, as EmbeddingGenerator packs them.
+
+        Args:
+            content_files: Files that would be ingested
+
+        Returns:
+            Dictionary with totals ('files', 'bytes', 'tokens', 'chunks',
+            'embedding_tokens', 'cost_usd', 'github_requests',
+            'embedding_requests', 'seconds'; duplicate blobs count as
+            chunks but not as embedding tokens or requests), 'ratios'
+            (bytes per token by extension), 'sampled' paths, and 'folders'
+            mapping each folder to its own 'files', 'bytes', 'tokens',
+            'chunks', 'embedding_tokens' and 'cost_usd'
+        """
+        blob_cache = get_blob_cache()
+        # Checkouts on disk are read without API calls
+        on_disk = isinstance(getattr(self.normalizer, 'github_client', None), LocalRepoClient)
+        dedup = dedup_enabled()
+        seen_shas = set()
+        folders: Dict[str, Dict[str, float]] = {}
+        ratios: Dict[str, float] = {}
+        github_requests = 0
+        chunk_tokens: List[int] = []  # modelled tokens of each chunk sent for embedding, in order
+        total_bytes = 0
+
+        for content_file in content_files:
+            extension = file_extension(content_file.path)
+            if extension not in ratios:
+                ratios[extension] = self.ratio(extension)
+            tokens = content_file.size / ratios[extension]
+            chunks, embedded = self._model_chunks(tokens)
+            chunks = max(1, round(chunks * self._chunk_factor))
+            embedded *= self._embed_factor
+
+            first_copy = not content_file.sha or content_file.sha not in seen_shas
+            if first_copy:
+                seen_shas.add(content_file.sha)
+                cached = blob_cache is not None and content_file.sha and content_file.sha in blob_cache
+                if not on_disk and not cached:
+                    github_requests += 1
+            if dedup and not first_copy:
+                embedded = 0
+            else:
+                per_chunk = min(math.ceil(embedded / chunks), self.max_request_tokens)
+                chunk_tokens.extend([per_chunk] * chunks)
+
+            folder = folders.setdefault(file_folder(content_file.path), {
+                'files': 0, 'bytes': 0, 'tokens': 0, 'chunks': 0, 'embedding_tokens': 0, 'cost_usd': 0.0
+            })
+            folder['files'] += 1
+            folder['bytes'] += content_file.size
+            folder['tokens'] += tokens
+            folder['chunks'] += chunks
+            folder['embedding_tokens'] += embedded
+            total_bytes += content_file.size
+
+        for folder in folders.values():
+            folder['tokens'] = round(folder['tokens'])
+            folder['embedding_tokens'] = round(folder['embedding_tokens'])
+            folder['cost_usd'] = self.usage_tracker.embedding_cost_usd(folder['embedding_tokens'])
+
+        chunks = sum(f['chunks'] for f in folders.values())
+        embedding_tokens = sum(f['embedding_tokens'] for f in folders.values())
+        embedding_requests = len(pack_batches(chunk_tokens, self.max_request_tokens, self.max_request_items))
+        seconds = (
+            github_requests * self.fetch_latency / self.fetch_workers
+            + total_bytes / self.chunk_throughput / get_cpu_workers()
+            + embedding_requests * self.embed_request_latency
+        )
+
+        return {
+            'files': len(content_files),
+            'bytes': total_bytes,
+            'tokens': sum(f['tokens'] for f in folders.values()),
+            'chunks': chunks,
+            'embedding_tokens': embedding_tokens,
+            'cost_usd': self.usage_tracker.embedding_cost_usd(embedding_tokens),
+            'github_requests': github_requests,
+            'embedding_requests': embedding_requests,
+            'seconds': seconds,
+            'ratios': ratios,
+            'sampled': list(self.sampled),
+            'folders': dict(sorted(folders.items()))
+        }
+
+    @staticmethod
+    def suggest_drops(plan: Dict[str, any], budget_usd: float, key: str = 'cost_usd') -> List[str]:
+        """
+        Folders to leave out so the plan fits a budget.
+
+        The most expensive folders are dropped until the rest fits; then
+        dropped folders are added back, cheapest first, wherever they still
+        fit, so as little as possible is left out.
+
+        Args:
+            plan: Result of plan()
+            budget_usd: Budget, in the units of ``key``
+            key: Folder total to budget ('cost_usd', 'embedding_tokens' or 'chunks')
+
+        Returns:
+            Folder paths to deselect, most expensive first (empty if the plan fits)
+        """
+        folders = plan['folders']
+
+        def kept_total(dropped: List[str]) -> float:
+            return math.fsum(f[key] for name, f in folders.items() if name not in dropped)
+
+        dropped = []
+        for name in sorted(folders, key=lambda n: -folders[n][key]):
+            if kept_total(dropped) <= budget_usd:
+                break
+            dropped.append(name)
+
+        for name in sorted(dropped, key=lambda n: folders[n][key]):
+            if kept_total([d for d in dropped if d != name]) <= budget_usd:
+                dropped.remove(name)
+        return dropped
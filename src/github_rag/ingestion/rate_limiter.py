@@ -0,0 +1,161 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class RateLimitScheduler:
+    """Paces GitHub API requests against the X-RateLimit budget.
+
+    Every response updates the budget from its X-RateLimit-* headers. While
+    plenty of budget is left requests run at full concurrency. Below the
+    slowdown threshold, concurrency shrinks towards one request at a time
+    and requests are spaced so the remaining budget lasts until the reset.
+    Rate-limited responses (403/429) are retried after Retry-After or the
+    reset time instead of failing the ingestion.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        reserve: int = 50,
+        slowdown_threshold: float = 0.25,
+        max_retries: int = 3
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Requests in flight while the budget is healthy
+            reserve: Requests kept back for the UI and other callers
+            slowdown_threshold: Fraction of the hourly limit below which pacing starts
+            max_retries: Retries for a rate-limited request before giving up
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserve = reserve
+        self.slowdown_threshold = slowdown_threshold
+        self.max_retries = max_retries
+
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.requests_made = 0
+        self.seconds_waited = 0.0
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._next_slot = 0.0
+
+    def update(self, headers: Dict[str, Any]) -> None:
+        """Update the budget from (lower-cased) response headers."""
+        if "x-ratelimit-remaining" not in headers:
+            return
+        with self._condition:
+            self.remaining = int(headers["x-ratelimit-remaining"])
+            self.limit = int(headers.get("x-ratelimit-limit", self.limit or 0)) or None
+            if "x-ratelimit-reset" in headers:
+                self.reset_at = float(headers["x-ratelimit-reset"])
+            self._condition.notify_all()
+
+    def concurrency(self) -> int:
+        """Requests allowed in flight for the current budget."""
+        if self.remaining is None or not self.limit:
+            return self.max_concurrency
+
+        fraction = self.remaining / self.limit
+        if fraction >= self.slowdown_threshold:
+            return self.max_concurrency
+        return max(1, int(self.max_concurrency * fraction / self.slowdown_threshold))
+
+    def pacing_interval(self) -> float:
+        """Seconds to leave between request starts for the current budget."""
+        if self.remaining is None or not self.limit or self.reset_at is None:
+            return 0.0
+        if self.remaining / self.limit >= self.slowdown_threshold:
+            return 0.0
+
+        seconds_left = max(self.reset_at - time.time(), 0.0)
+        budget = self.remaining - self.reserve
+        if budget <= 0:
+            return 0.0  # acquire() waits for the reset instead
+        return seconds_left / budget
+
+    def budget_exhausted(self) -> bool:
+        """Whether only the reserve is left before the next reset."""
+        return (
+            self.remaining is not None and self.reset_at is not None
+            and self.remaining <= self.reserve and self.reset_at > time.time()
+        )
+
+    def acquire(self) -> None:
+        """Block until a request may start."""
+        with self._condition:
+            while self._in_flight >= self.concurrency():
+                self._condition.wait(timeout=1.0)
+            self._in_flight += 1
+
+            start_at = max(self._next_slot, time.time())
+            if self.budget_exhausted():
+                start_at = max(start_at, self.reset_at + 1.0)
+            self._next_slot = start_at + self.pacing_interval()
+
+        delay = start_at - time.time()
+        if delay > 0:
+            self._sleep(delay)
+
+    def release(self) -> None:
+        """Mark a request as finished."""
+        with self._condition:
+            self._in_flight -= 1
+            self.requests_made += 1
+            self._condition.notify_all()
+
+    def retry_delay(self, status: int, headers: Dict[str, Any]) -> Optional[float]:
+        """Seconds to wait before retrying a rate-limited response, or None if not rate limited."""
+        if status not in (403, 429):
+            return None
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+        if str(headers.get("x-ratelimit-remaining")) == "0" and "x-ratelimit-reset" in headers:
+            return max(float(headers["x-ratelimit-reset"]) - time.time(), 0.0) + 1.0
+        return None
+
+    def wrap(self, request_fn: Callable) -> Callable:
+        """
+        Wrap a function returning (status, headers, body), such as
+        Requester.requestJson, with pacing and rate-limit retries.
+        """
+        def scheduled_request(*args, **kwargs):
+            for attempt in range(self.max_retries + 1):
+                self.acquire()
+                try:
+                    status, headers, output = request_fn(*args, **kwargs)
+                finally:
+                    self.release()
+
+                self.update(headers)
+                delay = self.retry_delay(status, headers)
+                if delay is None or attempt == self.max_retries:
+                    return status, headers, output
+                self._sleep(delay)
+
+        return scheduled_request
+
+    def instrument(self, requester) -> None:
+        """Route a PyGithub Requester's JSON requests through the scheduler."""
+        requester.requestJson = self.wrap(requester.requestJson)
+
+    def status(self) -> Dict[str, Any]:
+        """Current budget, for display in the UI."""
+        return {
+            'remaining': self.remaining,
+            'limit': self.limit,
+            'reset_in_seconds': max(int(self.reset_at - time.time()), 0) if self.reset_at else None,
+            'concurrency': self.concurrency(),
+            'throttled': self.pacing_interval() > 0 or self.budget_exhausted(),
+            'requests_made': self.requests_made,
+            'seconds_waited': round(self.seconds_waited, 1)
+        }
+
+    def _sleep(self, seconds: float) -> None:
+        self.seconds_waited += seconds
+        time.sleep(seconds)
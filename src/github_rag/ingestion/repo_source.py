@@ -0,0 +1,15 @@
+from github_rag.utils.config import get_ingestion_config
+
+def get_repo_source():
+    """Factory function to get the repository source (API or on-disk) based on config."""
+    config = get_ingestion_config()
+    source = config.get("source", "api").lower()
+    
+    if source == "api":
+        from github_rag.ingestion.github_client import GitHubClient
+        return GitHubClient()
+    elif source in ("clone", "tarball", "local"):
+        from github_rag.ingestion.local_source import LocalRepoClient
+        return LocalRepoClient(source)
+    else:
+        raise ValueError(f"Unknown ingestion source: {source}")
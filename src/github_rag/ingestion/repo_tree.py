@@ -0,0 +1,336 @@
+import base64
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from github import Repository
+from github_rag.utils.config import get_ingestion_config
+from github_rag.utils.http_cache import conditional_get
+
+# Git tree element types mapped onto the ContentFile vocabulary
+TREE_TYPES = {
+    "blob": "file",
+    "tree": "dir",
+    "commit": "submodule"
+}
+
+
+class TreeEntry:
+    """Lightweight file or directory entry from a repository tree listing.
+
+    Exposes the same attributes as a ContentFile (path, name, type, size,
+    sha, html_url, git_url, decoded_content) so FileFilter, ContentNormalizer
+    and the folder scanner can use it directly.
+    """
+
+    __slots__ = ("path", "name", "type", "size", "sha", "html_url", "git_url", "_loader", "_streamer")
+
+    def __init__(
+        self,
+        path: str,
+        type: str,
+        size: int = 0,
+        sha: Optional[str] = None,
+        html_url: str = "",
+        loader: Optional[Callable[["TreeEntry"], bytes]] = None,
+        git_url: Optional[str] = None,
+        streamer: Optional[Callable[["TreeEntry", int], Iterator[bytes]]] = None
+    ):
+        self.path = path
+        self.name = path.rsplit('/', 1)[-1]
+        self.type = type
+        self.size = size
+        self.sha = sha
+        self.html_url = html_url
+        self.git_url = git_url  # Git blobs API URL, for streaming large files
+        self._loader = loader
+        self._streamer = streamer
+
+    @property
+    def decoded_content(self) -> bytes:
+        """Fetch the raw file body (one request per access)."""
+        if self._loader is None:
+            raise ValueError(f"No content loader for {self.path}")
+        return self._loader(self)
+
+    def iter_content(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        """Read the raw file body in blocks (whole, if the source cannot stream)."""
+        if self._streamer is not None:
+            return self._streamer(self, chunk_size)
+        return iter((self.decoded_content,))
+
+    def __repr__(self) -> str:
+        return f'TreeEntry(path="{self.path}", type="{self.type}", size={self.size})'
+
+
+def _blob_loader(repo: Repository) -> Callable[[TreeEntry], bytes]:
+    """Build a loader that fetches file bodies through the Git blobs API."""
+    def load(entry: TreeEntry) -> bytes:
+        blob = repo.get_git_blob(entry.sha)
+        return base64.b64decode(blob.content)
+    return load
+
+
+def _fetch_tree(repo: Repository, tree_sha: str, recursive: bool = False) -> Dict[str, Any]:
+    """Fetch a Git tree as raw JSON, revalidated through the ETag cache."""
+    parameters = {"recursive": "1"} if recursive else None
+    data, _ = conditional_get(repo.requester, f"{repo.url}/git/trees/{tree_sha}", parameters)
+    return data
+
+
+def _to_entries(repo: Repository, ref: str, elements: List[Dict[str, Any]], prefix: str = "") -> List[TreeEntry]:
+    """Convert raw tree elements into TreeEntry objects."""
+    loader = _blob_loader(repo)
+    entries = []
+
+    for element in elements:
+        path = prefix + element["path"]
+        entry_type = TREE_TYPES.get(element["type"], element["type"])
+        entries.append(TreeEntry(
+            path=path,
+            type=entry_type,
+            size=element.get("size") or 0,
+            sha=element["sha"],
+            html_url=f"{repo.html_url}/{'blob' if entry_type == 'file' else 'tree'}/{ref}/{path}",
+            loader=loader if entry_type == "file" else None,
+            git_url=f"{repo.url}/git/blobs/{element['sha']}" if entry_type == "file" else None
+        ))
+
+    return entries
+
+
+class RepoTreeSnapshot:
+    """In-memory snapshot of a repository tree at one commit.
+
+    Built once per repository and tree SHA, then shared by the folder scan
+    and the file fetch. Folder counts, extension sets and "files under these
+    folders" queries are answered locally from a sorted path index. In lazy
+    mode (and whenever GitHub truncates the recursive listing), only the top
+    level is listed up front and deeper folders are expanded on demand.
+    """
+
+    def __init__(
+        self,
+        repo: Repository,
+        ref: Optional[str] = None,
+        lazy: bool = False,
+        root: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Build the snapshot.
+
+        Args:
+            repo: Repository object (or LocalRepository)
+            ref: Branch, tag or commit SHA (default: the default branch)
+            lazy: List only the top level now and expand folders on demand
+            root: Already-fetched non-recursive root tree, if any
+        """
+        self.repo = repo
+        self.ref = ref or repo.default_branch
+        self.tree_sha = None
+        self._files: Dict[str, TreeEntry] = {}
+        self._dirs: Dict[str, TreeEntry] = {}
+        self._pending: Dict[str, str] = {}  # folder path -> tree SHA, contents not listed yet
+        self._folders: Dict[str, Dict[str, Any]] = {}
+        self._sorted_paths: Optional[List[str]] = None
+
+        # Checkouts on disk (LocalRepository) list themselves without the API
+        if hasattr(repo, "list_entries"):
+            self._add(repo.list_entries(refresh=True))
+            return
+
+        if not lazy:
+            tree = _fetch_tree(repo, root["sha"] if root else self.ref, recursive=True)
+            self.tree_sha = tree["sha"]
+            if not tree.get("truncated", False):
+                self._add(_to_entries(repo, self.ref, tree["tree"]))
+                return
+
+        # Lazy or truncated: list the top level and leave subfolders pending
+        root = root or _fetch_tree(repo, self.ref)
+        self.tree_sha = root["sha"]
+        self._add(_to_entries(repo, self.ref, root["tree"]), pending=True)
+
+    def _add(self, entries: List[TreeEntry], pending: bool = False) -> None:
+        """Index entries; with pending=True, directories are marked as not yet listed."""
+        for entry in entries:
+            if entry.type == "dir":
+                self._dirs[entry.path] = entry
+                if pending:
+                    self._pending[entry.path] = entry.sha
+            elif entry.type == "file":
+                self._files[entry.path] = entry
+                folder = entry.path.rsplit('/', 1)[0] if '/' in entry.path else '.'
+                extension = entry.name.split('.')[-1] if '.' in entry.name else 'no-ext'
+                info = self._folders.setdefault(folder, {'count': 0, 'extensions': set()})
+                info['count'] += 1
+                info['extensions'].add(f".{extension}")
+        self._sorted_paths = None
+
+    def _expand_dir(self, path: str) -> None:
+        """List one pending folder, recursively where GitHub allows it."""
+        tree_sha = self._pending.pop(path)
+        prefix = path + "/"
+        tree = _fetch_tree(self.repo, tree_sha, recursive=True)
+        if not tree.get("truncated", False):
+            self._add(_to_entries(self.repo, self.ref, tree["tree"], prefix))
+        else:
+            level = _fetch_tree(self.repo, tree_sha)
+            self._add(_to_entries(self.repo, self.ref, level["tree"], prefix), pending=True)
+
+    def expand(self, folder: str = ".") -> None:
+        """Make sure everything under a folder ("." for the whole repo) is listed."""
+        prefix = "" if folder == "." else folder.rstrip('/') + '/'
+        while True:
+            targets = [
+                path for path in self._pending
+                if (path + '/').startswith(prefix) or prefix.startswith(path + '/')
+            ]
+            if not targets:
+                return
+            for path in targets:
+                self._expand_dir(path)
+
+    @property
+    def fully_listed(self) -> bool:
+        """Whether every folder has been listed."""
+        return not self._pending
+
+    def _paths(self) -> List[str]:
+        if self._sorted_paths is None:
+            self._sorted_paths = sorted(self._files)
+        return self._sorted_paths
+
+    def folder_summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        File count and extensions per folder (files directly in the folder).
+
+        Folders not listed yet are included with a count of None.
+
+        Returns:
+            Dictionary of folder -> {'count', 'extensions'}, sorted by folder
+        """
+        folders = {
+            folder: {'count': info['count'], 'extensions': sorted(info['extensions'])}
+            for folder, info in self._folders.items()
+        }
+        for path in self._pending:
+            folders.setdefault(path, {'count': None, 'extensions': []})
+        return dict(sorted(folders.items()))
+
+    def extensions(self) -> List[str]:
+        """All file extensions seen so far."""
+        return sorted(set().union(*(info['extensions'] for info in self._folders.values())))
+
+    def files_under(self, folders: List[str]) -> List[TreeEntry]:
+        """
+        Files anywhere under the given folders ("." selects everything).
+
+        Args:
+            folders: Folder paths as returned by folder_summary()
+
+        Returns:
+            List of file TreeEntry objects, sorted by path
+        """
+        if "." in folders:
+            self.expand(".")
+            return [self._files[path] for path in self._paths()]
+
+        for folder in folders:
+            self.expand(folder)
+
+        paths = self._paths()
+        selected = set()
+        for folder in folders:
+            prefix = folder.rstrip('/') + '/'
+            i = bisect_left(paths, prefix)
+            while i < len(paths) and paths[i].startswith(prefix):
+                selected.add(paths[i])
+                i += 1
+
+        return [self._files[path] for path in sorted(selected)]
+
+    def files_above(self, name: str, folders: List[str]) -> List[TreeEntry]:
+        """
+        Files with a given name at the root and in each folder down to the
+        given folders (e.g. the .gitattributes that apply to them). Only
+        folders already listed are searched; nothing is expanded.
+
+        Args:
+            name: File name, e.g. ".gitattributes"
+            folders: Folder paths as returned by folder_summary()
+
+        Returns:
+            List of file TreeEntry objects, sorted by path
+        """
+        paths = {name}
+        for folder in folders:
+            if folder == ".":
+                continue
+            parts = folder.strip('/').split('/')
+            for depth in range(1, len(parts) + 1):
+                paths.add('/'.join(parts[:depth]) + '/' + name)
+        return [self._files[path] for path in sorted(paths) if path in self._files]
+
+    def entries(self) -> List[TreeEntry]:
+        """Every file and directory, listing any pending folders first."""
+        self.expand(".")
+        return sorted(list(self._files.values()) + list(self._dirs.values()), key=lambda e: e.path)
+
+
+# Recently built snapshots, keyed by (repository, root tree SHA)
+_snapshots: "OrderedDict[tuple, RepoTreeSnapshot]" = OrderedDict()
+_MAX_SNAPSHOTS = 8
+
+
+def get_tree_snapshot(repo: Repository, ref: Optional[str] = None, lazy: Optional[bool] = None) -> RepoTreeSnapshot:
+    """
+    Get the tree snapshot for a repository, reusing one built for the same tree.
+
+    Checking for an existing snapshot costs one root-tree request, which the
+    ETag cache turns into a free 304 when nothing changed.
+
+    Args:
+        repo: Repository object (or LocalRepository)
+        ref: Branch, tag or commit SHA (default: the default branch)
+        lazy: Expand folders on demand (default: [ingestion] lazy_tree)
+
+    Returns:
+        RepoTreeSnapshot object
+    """
+    if lazy is None:
+        lazy = get_ingestion_config().get("lazy_tree", False)
+
+    if hasattr(repo, "list_entries"):
+        return RepoTreeSnapshot(repo, ref)
+
+    ref = ref or repo.default_branch
+    root = _fetch_tree(repo, ref)
+    key = (repo.full_name, root["sha"])
+
+    if key in _snapshots:
+        _snapshots.move_to_end(key)
+        return _snapshots[key]
+
+    snapshot = RepoTreeSnapshot(repo, ref, lazy=lazy, root=root)
+    _snapshots[key] = snapshot
+    if len(_snapshots) > _MAX_SNAPSHOTS:
+        _snapshots.popitem(last=False)
+    return snapshot
+
+
+def list_repo_tree(repo: Repository, ref: Optional[str] = None) -> List[TreeEntry]:
+    """
+    List every file and directory in a repository via the Git Trees API.
+
+    A single recursive tree request covers most repositories. GitHub
+    truncates very large trees, in which case the listing falls back to
+    walking subtrees (each one again fetched recursively where possible).
+
+    Args:
+        repo: Repository object
+        ref: Branch, tag or commit SHA (default: the default branch)
+
+    Returns:
+        List of TreeEntry objects, sorted by path
+    """
+    return get_tree_snapshot(repo, ref).entries()
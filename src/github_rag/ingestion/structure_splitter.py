@@ -0,0 +1,217 @@
+import ast
+import re
+from typing import Callable, Dict, List, Optional
+
+
+class Block:
+    """A run of lines (0-based, inclusive) that should stay in one chunk if it fits.
+
+    ``children`` cover the same lines split at the next level down (a
+    class into its methods) and are used when the block is too large.
+    """
+
+    __slots__ = ("start", "end", "children")
+
+    def __init__(self, start: int, end: int, children: Optional[List["Block"]] = None):
+        self.start = start
+        self.end = end
+        self.children = children or []
+
+    def __repr__(self) -> str:
+        return f"Block({self.start}, {self.end}, children={len(self.children)})"
+
+
+def _cover(boundaries: List[tuple], start: int, end: int) -> List[Block]:
+    """
+    Turn (node_end, children_fn) pairs, in order, into blocks covering
+    lines start..end with no gaps: blank lines and comments between nodes
+    go to the following node, trailing lines to the last one.
+    """
+    blocks = []
+    block_start = start
+    for i, (node_end, children_fn) in enumerate(boundaries):
+        block_end = end if i == len(boundaries) - 1 else min(max(node_end, block_start), end)
+        blocks.append(Block(block_start, block_end, children_fn(block_start, block_end) if children_fn else None))
+        block_start = block_end + 1
+        if block_start > end:
+            break
+    return blocks
+
+
+def _python_blocks(nodes: List[ast.stmt], start: int, end: int) -> List[Block]:
+    """Blocks for a list of statements, splitting classes into their members."""
+    boundaries = []
+    for node in nodes:
+        children_fn = None
+        if isinstance(node, ast.ClassDef) and node.body:
+            children_fn = lambda s, e, body=node.body: _python_blocks(body, s, e)
+        boundaries.append((node.end_lineno - 1, children_fn))
+    if not boundaries:
+        return [Block(start, end)]
+    return _cover(boundaries, start, end)
+
+
+def split_python(content: str) -> Optional[List[Block]]:
+    """
+    Split Python source at top-level statement boundaries with the stdlib
+    ast module, so functions and classes (with their decorators and leading
+    comments) stay whole; oversized classes split into their members.
+
+    Returns:
+        Blocks covering every line, or None if the source does not parse
+    """
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    last_line = content.count("\n")
+    return _python_blocks(tree.body, 0, last_line)
+
+
+# Comments and string literals are matched whole so brackets inside them are ignored
+_BRACE_TOKENS = re.compile(
+    r'//[^\n]*'
+    r'|/\*.*?(?:\*/|$)'
+    r'|"(?:[^"\\\n]|\\.)*"'
+    r"|'(?:[^'\\\n]|\\.)*'"  # unterminated quotes (e.g. Rust lifetimes) are not matched
+    r'|`(?:[^`\\]|\\.)*`'
+    # JavaScript regex literals, where an expression starts: `= /[{]/`, `(/}/`, `return /x/`
+    r'|(?:(?<=[=(,:;!&|?{\[+\-*%~^])|(?<=\breturn)|(?<=\btypeof))[ \t]*'
+    r'/(?![/*])(?:[^/\\\n\[]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/'
+    r'|[(\[{]|[)\]}]|\n',
+    re.DOTALL
+)
+# Lines that belong to the declaration below them: blanks, comments, annotations, attributes
+_LEADING_LINE = re.compile(r'\s*(?:$|//|/\*|\*|@|#\[)')
+
+
+def _bracket_depths(content: str) -> Optional[List[int]]:
+    """
+    Bracket depth at the end of every line, skipping strings and comments.
+
+    Returns:
+        Depths, or None if the brackets do not balance (syntax the scanner
+        misread, such as an unrecognised regex literal)
+    """
+    depths = []
+    depth = 0
+    for match in _BRACE_TOKENS.finditer(content):
+        token = match.group()
+        if token == "\n":
+            depths.append(depth)
+        elif token in "([{":
+            depth += 1
+        elif token in ")]}":
+            if depth == 0:
+                return None
+            depth -= 1
+        else:
+            # Comment, string or regex literal: carry the depth over its lines
+            depths.extend([depth] * token.count("\n"))
+    if depth:
+        return None
+    depths.append(depth)
+    return depths
+
+
+def _brace_blocks(lines: List[str], depths: List[int], start: int, end: int, base: int) -> List[Block]:
+    """
+    Blocks for lines start..end at bracket depth ``base``: a unit ends on a
+    code line that closes back to ``base``. Units that opened a bracket get
+    the declarations one level deeper as children.
+    """
+    boundaries = []
+    unit_deepest = base
+    in_annotation = False  # inside a multi-line @Decorator(...) that belongs to the next declaration
+    for i in range(start, end + 1):
+        unit_deepest = max(unit_deepest, depths[i])
+        if lines[i].lstrip().startswith("@") and depths[i] > base:
+            in_annotation = True
+        if depths[i] <= base and in_annotation:
+            in_annotation = False
+            continue
+        if depths[i] <= base and not _LEADING_LINE.match(lines[i]):
+            children_fn = None
+            if unit_deepest > base:
+                children_fn = lambda s, e, b=base + 1: _brace_blocks(lines, depths, s, e, b)
+            boundaries.append((i, children_fn))
+            unit_deepest = base
+    if not boundaries or (len(boundaries) == 1 and base > 0):
+        return [Block(start, end)]
+    return _cover(boundaries, start, end)
+
+
+def split_braces(content: str) -> Optional[List[Block]]:
+    """
+    Split C-family source (JavaScript/TypeScript, Java, Go, Rust, C/C++, ...)
+    at top-level declarations using bracket depth, ignoring brackets in
+    strings and comments. Leading comments and annotations stay with the
+    declaration below them; oversized declarations split into their members.
+
+    Returns:
+        Blocks covering every line, or None if the brackets do not balance
+    """
+    lines = content.split("\n")
+    depths = _bracket_depths(content)
+    if depths is None:
+        return None
+    return _brace_blocks(lines, depths, 0, len(lines) - 1, 0)
+
+
+_HEADING = re.compile(r' {0,3}(#{1,6})(?:\s|$)')
+_FENCE = re.compile(r' {0,3}(```|~~~)')
+
+
+def _markdown_sections(headings: List[tuple], start: int, end: int) -> List[Block]:
+    """Blocks for lines start..end, one per section at the highest heading level present."""
+    if not headings:
+        return [Block(start, end)]
+    top = min(level for _, level in headings)
+    tops = [line for line, level in headings if level == top]
+
+    boundaries = []
+    if tops[0] > start:
+        boundaries.append((tops[0] - 1, None))  # Text before the first heading
+    for k, line in enumerate(tops):
+        section_end = tops[k + 1] - 1 if k + 1 < len(tops) else end
+        subheadings = [(l, level) for l, level in headings if line < l <= section_end]
+        children_fn = None
+        if subheadings:
+            children_fn = lambda s, e, sub=subheadings: _markdown_sections(sub, s, e)
+        boundaries.append((section_end, children_fn))
+    return _cover(boundaries, start, end)
+
+
+def split_markdown(content: str) -> Optional[List[Block]]:
+    """
+    Split Markdown by heading hierarchy: each section keeps its heading and
+    text together, oversized sections split into their subsections.
+    Headings inside fenced code blocks are ignored.
+
+    Returns:
+        Blocks covering every line
+    """
+    lines = content.split("\n")
+    headings = []
+    fence = None
+    for i, line in enumerate(lines):
+        fence_match = _FENCE.match(line)
+        if fence_match:
+            if fence is None:
+                fence = fence_match.group(1)
+            elif fence_match.group(1) == fence:
+                fence = None
+            continue
+        if fence is None:
+            heading = _HEADING.match(line)
+            if heading:
+                headings.append((i, len(heading.group(1))))
+    return _markdown_sections(headings, 0, len(lines) - 1)
+
+
+# Splitter name (as used in [chunking] splitters) -> function(content) -> blocks
+STRUCTURE_SPLITTERS: Dict[str, Callable[[str], Optional[List[Block]]]] = {
+    "python": split_python,
+    "braces": split_braces,
+    "markdown": split_markdown,
+}
@@ -2,6 +2,7 @@ import chromadb
 from chromadb.config import Settings
 from typing import List, Dict
 from github_rag.utils.config import get_vector_store_config
+from github_rag.rag.vector_store import get_chunk_id
 
 
 class ChromaDBStore:
@@ -23,7 +24,7 @@ class ChromaDBStore:
         )
     
     def add_chunks(self, chunks: List[Dict], embeddings: List[List[float]]) -> None:
-        """Add chunks with embeddings to the vector store."""
+        """Add (or overwrite) chunks with embeddings in the vector store."""
         if len(chunks) != len(embeddings):
             raise ValueError("Number of chunks must match number of embeddings")
         
@@ -32,19 +33,24 @@ class ChromaDBStore:
         metadatas = []
         
         for idx, chunk in enumerate(chunks):
-            chunk_id = f"{chunk['metadata']['file_path']}_chunk_{chunk['metadata']['chunk_index']}"
+            chunk_id = get_chunk_id(chunk)
             ids.append(chunk_id)
             documents.append(chunk['content'])
             metadata = {k: str(v) for k, v in chunk['metadata'].items()}
             metadatas.append(metadata)
         
-        self.collection.add(
+        self.collection.upsert(
             ids=ids,
             embeddings=embeddings,
             documents=documents,
             metadatas=metadatas
         )
     
+    def delete_chunks(self, chunk_ids: List[str]) -> None:
+        """Delete chunks by ID (unknown IDs are ignored)."""
+        if chunk_ids:
+            self.collection.delete(ids=chunk_ids)
+    
     def search(self, query_embedding: List[float], n_results: int = 5) -> Dict:
         """Search for similar chunks using a query embedding."""
         results = self.collection.query(
@@ -1,65 +1,424 @@
+import asyncio
+import math
 import os
-from typing import List
-from openai import OpenAI
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+import openai
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
-from github_rag.utils.config import get_model_config
+from github_rag.utils.config import get_embeddings_config, get_model_config
+from github_rag.utils.embedding_cache import get_embedding_cache, text_hash
+from github_rag.utils.tokenizer import Tokenizer, get_tokenizer_for_model
 from github_rag.utils.usage_tracker import UsageTracker
 
 # Load environment variables
 load_dotenv()
 
+# Transient failures worth retrying: 429, 5xx, timeouts and dropped connections
+_RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
 
-class EmbeddingGenerator:
-    """Generates embeddings using OpenAI's API."""
-    
-    def __init__(self):
-        """Initialize OpenAI client and load model config."""
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the server's Retry-After (or retry-after-ms) header, if any."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(error: Exception, attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    Seconds to wait before retrying a failed request.
+
+    The server's Retry-After is honored (plus a little jitter, so parallel
+    requests do not return at the same instant); otherwise the delay is
+    drawn uniformly from an exponentially growing window ("full jitter").
+
+    Args:
+        error: The exception the request raised
+        attempt: Retries already made (0 for the first)
+        base_delay: Window of the first retry, in seconds
+        max_delay: Largest backoff window, in seconds
+    """
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        return retry_after + random.uniform(0, base_delay)
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def pack_batches(token_counts: Sequence[int], max_tokens: int, max_items: int) -> List[range]:
+    """
+    Split inputs, in order, into the fewest consecutive request batches
+    within a per-request token and item limit.
+
+    Filling each batch greedily is optimal when order must be kept.
+
+    Args:
+        token_counts: Token count of each input (each at most max_tokens)
+        max_tokens: Tokens allowed per request
+        max_items: Inputs allowed per request
+
+    Returns:
+        Index ranges, one per request
+    """
+    batches = []
+    start, tokens = 0, 0
+    for i, count in enumerate(token_counts):
+        if i > start and (tokens + count > max_tokens or i - start >= max_items):
+            batches.append(range(start, i))
+            start, tokens = i, 0
+        tokens += count
+    if start < len(token_counts):
+        batches.append(range(start, len(token_counts)))
+    return batches
+
+
+def combine_embeddings(vectors: List[List[float]], weights: List[int]) -> List[float]:
+    """Weighted average of the embeddings of a split input, re-normalized to unit length."""
+    total = sum(weights) or 1
+    combined = [sum(v[d] * w for v, w in zip(vectors, weights)) / total for d in range(len(vectors[0]))]
+    norm = math.sqrt(sum(x * x for x in combined)) or 1.0
+    return [x / norm for x in combined]
+
+
+class OpenAIEmbeddingBackend:
+    """Embeds texts with the OpenAI embeddings API.
+
+    Texts are packed into as few requests as the [embeddings] per-request
+    token and input limits allow. A text longer than the model's input
+    limit is embedded in pieces and gets the length-weighted average of
+    the pieces' vectors.
+
+    Up to [embeddings] max_concurrent_requests requests are in flight at
+    once on an AsyncOpenAI client; results are put back in input order.
+    Rate limits (429), server errors (5xx) and connection failures are
+    retried with jittered exponential backoff, honoring Retry-After.
+    """
+
+    cacheable = True  # Vectors are worth keeping in the embedding cache
+
+    def __init__(self, model: str, dimensions: int = 0, tracker: Optional[UsageTracker] = None):
+        """
+        Initialize the OpenAI clients.
+
+        Args:
+            model: OpenAI embedding model, e.g. "text-embedding-3-small"
+            dimensions: Requested vector size (0 = the model's default)
+            tracker: UsageTracker that billed tokens are logged to
+        """
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
-        
-        self.client = OpenAI(api_key=api_key)
-        
+
+        embeddings_config = get_embeddings_config()
+        self.api_key = api_key
+        self.base_url = embeddings_config.get("api_base_url") or None  # None = OpenAI
+        # Retries are done here, with backoff shared by the sync and async paths
+        self.client = OpenAI(api_key=api_key, base_url=self.base_url, max_retries=0)
+
+        self.embedding_model = model
+        self.dimensions = dimensions
+        self.tracker = tracker or UsageTracker()
+
+        self.max_request_tokens = embeddings_config.get("max_request_tokens", 250000)
+        self.max_request_items = embeddings_config.get("max_request_items", 2048)
+        self.max_input_tokens = embeddings_config.get("max_input_tokens", 8191)
+        self.max_concurrent_requests = max(1, embeddings_config.get("max_concurrent_requests", 4))
+        self.max_retries = embeddings_config.get("max_retries", 6)
+        self.retry_base_delay = embeddings_config.get("retry_base_delay_s", 0.5)
+        self.retry_max_delay = embeddings_config.get("retry_max_delay_s", 30.0)
+        self._tokenizer: Optional[Tokenizer] = None
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        """Tokenizer of the embedding model, loaded on first use."""
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer_for_model(self.embedding_model)
+        return self._tokenizer
+
+    def embed(
+        self,
+        texts: List[str],
+        token_counts: List[Optional[int]],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[List[List[float]], List[int]]:
+        """
+        Embed texts with as few requests as the token and item limits allow.
+
+        Args:
+            texts: Texts to embed
+            token_counts: Token count of each text (None where unknown)
+            progress_callback: Optional callable(done, total), called after each request
+
+        Returns:
+            (one vector per text, in order; tokens each text cost)
+        """
+        missing = [i for i, count in enumerate(token_counts) if count is None]
+        if missing:
+            for i, count in zip(missing, self.tokenizer.count_batch([texts[i] for i in missing])):
+                token_counts[i] = count
+
+        # Texts over the model's input limit are sent as several pieces
+        pieces, piece_counts, owners = [], [], []
+        for i, (text, count) in enumerate(zip(texts, token_counts)):
+            if count <= self.max_input_tokens:
+                pieces.append(text)
+                piece_counts.append(count)
+                owners.append(i)
+                continue
+            tokens = self.tokenizer.encode(text)
+            # A cut inside a multi-byte character re-encodes a few tokens longer
+            step = self.max_input_tokens - 8
+            for start in range(0, len(tokens), step):
+                piece = tokens[start:start + step]
+                pieces.append(self.tokenizer.decode(piece))
+                piece_counts.append(len(piece))
+                owners.append(i)
+
+        batches = [
+            [pieces[i] for i in batch]
+            for batch in pack_batches(piece_counts, self.max_request_tokens, self.max_request_items)
+        ]
+        piece_vectors = [vector for result in self._send(batches, progress_callback) for vector in result]
+
+        grouped: List[List[int]] = [[] for _ in texts]
+        for piece_index, owner in enumerate(owners):
+            grouped[owner].append(piece_index)
+        vectors = [
+            piece_vectors[group[0]] if len(group) == 1
+            else combine_embeddings([piece_vectors[j] for j in group], [piece_counts[j] for j in group])
+            for group in grouped
+        ]
+        tokens = [sum(piece_counts[j] for j in group) for group in grouped]
+        return vectors, tokens
+
+    def _send(
+        self,
+        batches: List[List[str]],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[List[List[float]]]:
+        """
+        Send request batches, concurrently when configured and possible.
+
+        Returns:
+            Vectors of each batch, in batch order
+        """
+        try:
+            asyncio.get_running_loop()
+            in_event_loop = True  # asyncio.run() is not allowed here
+        except RuntimeError:
+            in_event_loop = False
+
+        if self.max_concurrent_requests > 1 and len(batches) > 1 and not in_event_loop:
+            return asyncio.run(self._send_async(batches, progress_callback))
+
+        total = sum(len(batch) for batch in batches)
+        done = 0
+        results = []
+        for batch in batches:
+            results.append(self._request(batch)[0])
+            done += len(batch)
+            if progress_callback:
+                progress_callback(done, total)
+        return results
+
+    async def _send_async(
+        self,
+        batches: List[List[str]],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[List[List[float]]]:
+        """Send request batches with at most max_concurrent_requests in flight."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        results: List[Optional[List[List[float]]]] = [None] * len(batches)
+        total = sum(len(batch) for batch in batches)
+        done = 0
+
+        async with AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0) as client:
+            async def send(index: int, texts: List[str]) -> None:
+                nonlocal done
+                async with semaphore:
+                    results[index] = (await self._request_async(client, texts))[0]
+                done += len(texts)
+                if progress_callback:
+                    progress_callback(done, total)
+
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for index, texts in enumerate(batches):
+                        group.create_task(send(index, texts))
+            except ExceptionGroup as errors:
+                # The other requests were cancelled; report the failure itself
+                raise errors.exceptions[0]
+        return results
+
+    def _request(self, texts: List[str]) -> Tuple[List[List[float]], int]:
+        """
+        Embed texts with one API call, retrying transient failures, and log the tokens used.
+
+        Returns:
+            (embedding vectors in input order, total tokens billed)
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.client.embeddings.create(
+                    model=self.embedding_model,
+                    input=texts,
+                    **self._request_options()
+                )
+                return self._read_response(response)
+            except _RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(retry_delay(e, attempt, self.retry_base_delay, self.retry_max_delay))
+                attempt += 1
+
+    async def _request_async(self, client: AsyncOpenAI, texts: List[str]) -> Tuple[List[List[float]], int]:
+        """Async counterpart of _request()."""
+        attempt = 0
+        while True:
+            try:
+                response = await client.embeddings.create(
+                    model=self.embedding_model,
+                    input=texts,
+                    **self._request_options()
+                )
+                return self._read_response(response)
+            except _RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(retry_delay(e, attempt, self.retry_base_delay, self.retry_max_delay))
+                attempt += 1
+
+    def _request_options(self) -> dict:
+        return {'dimensions': self.dimensions} if self.dimensions else {}
+
+    def _read_response(self, response) -> Tuple[List[List[float]], int]:
+        """Log an embeddings response's usage and return its vectors in input order."""
+        #Track usage
+        total_tokens = response.usage.total_tokens
+        self.tracker.log_embedding(total_tokens)
+
+        # Sort by index to maintain order
+        embeddings = [item.embedding for item in sorted(response.data, key=lambda x: x.index)]
+        return embeddings, total_tokens
+
+
+class EmbeddingGenerator:
+    """Generates embeddings with the backend chosen by [models] embedding_model.
+
+    OpenAI model names use the embeddings API; "local-hashing" embeds on
+    the CPU with no network (see get_embedding_backend). Vectors from a
+    cacheable backend are looked up in the local embedding cache first
+    (when [cache] embedding_cache is on); only texts it does not hold are
+    embedded, and their vectors are cached for the next ingest or query.
+    """
+
+    def __init__(self, backend=None):
+        """
+        Load model config and create the embedding backend.
+
+        Args:
+            backend: Optional backend to use instead of the configured one
+        """
         # Get embedding model from config
         model_config = get_model_config()
         self.embedding_model = model_config.get("embedding_model", "text-embedding-3-small")
+        self.dimensions = model_config.get("embedding_dimensions", 0)  # 0 = the model's default
         self.tracker = UsageTracker()
+        self.backend = backend or get_embedding_backend(self.embedding_model, self.dimensions, self.tracker)
+        self.cache = get_embedding_cache() if self.backend.cacheable else None  # None when disabled
 
     def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text.
-        
+
         Args:
             text: Text to embed
-        
+
         Returns:
             List of floats representing the embedding vector
         """
-        response = self.client.embeddings.create(
-            model=self.embedding_model,
-            input=text
-        )
-        return response.data[0].embedding
-    
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        return self.generate_embeddings_batch([text])[0]
+
+    def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        token_counts: Optional[Sequence[Optional[int]]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[List[float]]:
         """
-        Generate embeddings for multiple texts in a single API call.
-        
+        Generate embeddings for multiple texts; those not cached are embedded in one backend call.
+
         Args:
-            texts: List of texts to embed
-        
+            texts: List of texts to embed, any number
+            token_counts: Optional token count of each text (e.g. chunk
+                metadata token_count); missing counts are computed
+            progress_callback: Optional callable(done, total) over the texts
+                not found in the cache
+
         Returns:
-            List of embedding vectors
+            List of embedding vectors, in input order
         """
-        response = self.client.embeddings.create(
-            model=self.embedding_model,
-            input=texts
-        )
+        counts = list(token_counts) if token_counts is not None else [None] * len(texts)
+        if self.cache is None:
+            return self.backend.embed(texts, counts, progress_callback)[0]
 
-        #Track usage
-        total_tokens = response.usage.total_tokens
-        self.tracker.log_embedding(total_tokens)
-        
-        # Sort by index to maintain order
-        embeddings = [item.embedding for item in sorted(response.data, key=lambda x: x.index)]
-        return embeddings
\ No newline at end of file
+        hashes = [text_hash(text) for text in texts]
+        cached = self.cache.get_many(self.embedding_model, self.dimensions, hashes)
+
+        # Each missing text is sent once, even if it repeats within the batch
+        missing = {}
+        for i, key in enumerate(hashes):
+            if key not in cached and key not in missing:
+                missing[key] = i
+
+        vectors = {key: vector for key, (vector, _) in cached.items()}
+        if missing:
+            indexes = list(missing.values())
+            embedded, tokens = self.backend.embed(
+                [texts[i] for i in indexes], [counts[i] for i in indexes], progress_callback
+            )
+            entries = []
+            for key, vector, text_tokens in zip(missing, embedded, tokens):
+                vectors[key] = vector
+                entries.append((key, vector, text_tokens))
+            self.cache.put_many(self.embedding_model, self.dimensions, entries)
+
+        hits = sum(1 for key in hashes if key in cached)
+        self.tracker.log_embedding_cache(hits, len(texts) - hits, sum(cached[key][1] for key in hashes if key in cached))
+        return [vectors[key] for key in hashes]
+
+
+def get_embedding_backend(model: str, dimensions: int = 0, tracker: Optional[UsageTracker] = None):
+    """
+    Factory function to get the embedding backend for a [models] embedding_model.
+
+    Backends provide ``embed(texts, token_counts, progress_callback)``
+    returning (vectors, tokens per text), and a ``cacheable`` flag.
+
+    Args:
+        model: "local-hashing" for the NumPy backend, otherwise an OpenAI model name
+        dimensions: Requested vector size (0 = the backend's default)
+        tracker: UsageTracker for billed tokens
+    """
+    if model.startswith("local-"):
+        if model == "local-hashing":
+            from github_rag.rag.local_embeddings import HashingEmbeddingBackend
+            return HashingEmbeddingBackend(dimensions)
+        raise ValueError(f"Unknown local embedding model: {model}")
+    return OpenAIEmbeddingBackend(model, dimensions, tracker)
@@ -0,0 +1,142 @@
+import re
+import zlib
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Identifiers and numbers, plus their camelCase / snake_case parts
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[0-9]+")
+_SUBWORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+_NGRAM_SIZES = (3, 4, 5)  # byte n-grams of the lowercased text
+_NGRAM_WEIGHT = 0.5       # relative to whole words
+_BATCH_SIZE = 1024        # texts hashed per NumPy pass
+_PRIME = np.uint64(0x100000001B3)
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """Spread hash bits (splitmix64 finalizer); uint64 arithmetic wraps."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _stable_hash(word: str) -> int:
+    """Stable 64-bit hash of a word (Python's hash() differs between processes)."""
+    data = word.lower().encode('utf-8')
+    return zlib.crc32(data) | (zlib.crc32(data, 0x9E3779B9) << 32)
+
+
+@lru_cache(maxsize=1 << 16)
+def _word_hashes(word: str) -> Tuple[int, ...]:
+    """Hashes of an identifier and, when it has several, of its camelCase / snake_case parts."""
+    parts = _SUBWORD.findall(word)
+    if len(parts) > 1:
+        return (_stable_hash(word), *map(_stable_hash, parts))
+    return (_stable_hash(word),)
+
+
+class HashingEmbeddingBackend:
+    """Local embedding backend: hashed word and character n-gram features, in NumPy.
+
+    Each text becomes counts of its identifiers (whole, and split into
+    camelCase / snake_case parts) and of its lowercased byte 3- to 5-grams.
+    Features are hashed, with a hash-derived sign, into a fixed number of
+    dimensions (a sparse random projection of the feature counts); counts
+    are damped with log(1 + n) and each vector is scaled to unit length,
+    so cosine similarity reflects shared vocabulary and spelling.
+
+    Vectors depend only on the text, never on a corpus or the network, so
+    ingestion and queries agree across runs and machines. Quality is well
+    below a learned model: meant for tests, demos, load tests and as a
+    fallback when the API is unavailable.
+    """
+
+    cacheable = False  # Recomputing is cheaper than a cache lookup
+
+    def __init__(self, dimensions: int = 0):
+        """
+        Initialize the backend.
+
+        Args:
+            dimensions: Vector size (0 = 1536, the size of text-embedding-3-small,
+                so existing vector store indexes keep their shape)
+        """
+        self.dimensions = dimensions or 1536
+
+    def _embed_matrix(self, texts: Sequence[str]) -> np.ndarray:
+        """Unit-length embeddings of texts as a (len(texts), dimensions) float32 matrix."""
+        size = self.dimensions
+        rows, hashes, weights = [], [], []
+
+        # Byte n-grams of all texts at once, from rolling polynomial hashes over one buffer
+        encoded = [text.lower().encode('utf-8') for text in texts]
+        lengths = np.array([len(data) for data in encoded], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        row_of_byte = np.repeat(np.arange(len(texts)), lengths)
+        for n in _NGRAM_SIZES:
+            count = len(buffer) - n + 1
+            if count <= 0:
+                continue
+            h = np.zeros(count, dtype=np.uint64)
+            for k in range(n):
+                h = h * _PRIME + buffer[k:k + count] + np.uint64(1)
+            starts = np.arange(count)
+            row = row_of_byte[:count]
+            inside = starts + n <= ends[row]  # n-grams must not span two texts
+            rows.append(row[inside])
+            hashes.append(_mix(h[inside] + np.uint64(n)))
+            weights.append(np.full(int(inside.sum()), _NGRAM_WEIGHT))
+
+        word_rows, word_hashes = [], []
+        for i, text in enumerate(texts):
+            start = len(word_hashes)
+            for word in _WORD.findall(text):
+                word_hashes.extend(_word_hashes(word))
+            word_rows.append(len(word_hashes) - start)
+        if word_hashes:
+            rows.append(np.repeat(np.arange(len(texts)), word_rows))
+            hashes.append(_mix(np.array(word_hashes, dtype=np.uint64)))
+            weights.append(np.ones(len(word_hashes)))
+
+        matrix = np.zeros((len(texts), size))
+        if rows:
+            row = np.concatenate(rows)
+            h = np.concatenate(hashes)
+            sign = np.where((h >> np.uint64(63)) == 1, -1.0, 1.0)
+            bucket = (h % np.uint64(size)).astype(np.int64)
+            flat = np.bincount(row * size + bucket, weights=sign * np.concatenate(weights), minlength=len(texts) * size)
+            matrix = flat.reshape(len(texts), size)
+
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        matrix[empty, 0] = norms[empty] = 1.0  # Texts without features still get a valid unit vector
+        return (matrix / norms).astype(np.float32)
+
+    def embed(
+        self,
+        texts: List[str],
+        token_counts: Optional[Sequence[Optional[int]]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[List[List[float]], List[int]]:
+        """
+        Embed texts on the CPU.
+
+        Args:
+            texts: Texts to embed
+            token_counts: Ignored (nothing is billed)
+            progress_callback: Optional callable(done, total), called after each block of texts
+
+        Returns:
+            (one vector per text, in order; zero tokens per text)
+        """
+        vectors = []
+        for start in range(0, len(texts), _BATCH_SIZE):
+            vectors.extend(self._embed_matrix(texts[start:start + _BATCH_SIZE]).tolist())
+            if progress_callback:
+                progress_callback(min(start + _BATCH_SIZE, len(texts)), len(texts))
+        return vectors, [0] * len(texts)
@@ -3,6 +3,7 @@ from typing import List, Dict
 from pinecone import Pinecone, ServerlessSpec
 from dotenv import load_dotenv
 from github_rag.utils.config import get_vector_store_config
+from github_rag.rag.vector_store import get_chunk_id
 
 load_dotenv()
 
@@ -37,7 +38,7 @@ class PineconeStore:
         # Prepare vectors for upsert
         vectors = []
         for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            vector_id = f"{chunk['metadata']['file_path']}_chunk_{chunk['metadata']['chunk_index']}"
+            vector_id = get_chunk_id(chunk)
             
             # Pinecone metadata (all values must be strings, numbers, or booleans)
             metadata = {
@@ -50,6 +51,8 @@ class PineconeStore:
                 'token_count': int(chunk['metadata']['token_count']),
                 'content': chunk['content']  # Store content in metadata for retrieval
             }
+            if 'duplicate_locations' in chunk['metadata']:
+                metadata['duplicate_locations'] = chunk['metadata']['duplicate_locations']
             
             vectors.append({
                 'id': vector_id,
@@ -63,6 +66,13 @@ class PineconeStore:
             batch = vectors[i:i + batch_size]
             self.index.upsert(vectors=batch)
     
+    def delete_chunks(self, chunk_ids: List[str]) -> None:
+        """Delete vectors by ID."""
+        # Pinecone accepts at most 1000 IDs per delete call
+        batch_size = 1000
+        for i in range(0, len(chunk_ids), batch_size):
+            self.index.delete(ids=chunk_ids[i:i + batch_size])
+    
     def search(self, query_embedding: List[float], n_results: int = 5) -> Dict:
         """Search for similar chunks using query embedding."""
         results = self.index.query(
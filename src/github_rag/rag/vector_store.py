@@ -1,5 +1,12 @@
+from typing import Dict
 from github_rag.utils.config import get_vector_store_config
 
+
+def get_chunk_id(chunk: Dict) -> str:
+    """Stable vector ID for a chunk: file path plus chunk index."""
+    return f"{chunk['metadata']['file_path']}_chunk_{chunk['metadata']['chunk_index']}"
+
+
 def get_vector_store():
     """Factory function to get the appropriate vector store based on config."""
     config = get_vector_store_config()
@@ -1,10 +1,14 @@
 import streamlit as st
-from github_rag.ingestion.github_client import GitHubClient
-from github_rag.ingestion.file_filter import FileFilter
+from github_rag.ingestion.repo_source import get_repo_source
+from github_rag.ingestion.file_filter import FileFilter, REASON_LABELS
+from github_rag.ingestion.file_classifier import FileClassifier, SKIP_LABELS
 from github_rag.ingestion.content_normalizer import ContentNormalizer
 from github_rag.ingestion.chunker import Chunker
+from github_rag.ingestion.deduplicator import ChunkDeduplicator, dedup_enabled
 from github_rag.rag.embeddings import EmbeddingGenerator
 from github_rag.utils.chunk_validator import ChunkValidator
+from github_rag.utils.config import get_ingestion_config
+from github_rag.utils.token_estimator import get_token_estimator
 
 st.set_page_config(page_title="GitHub RAG Assistant", page_icon="🤖")
 
@@ -33,6 +37,10 @@ with st.sidebar:
         with st.expander("Details"):
             st.write(f"Embedding calls: {stats['embedding_calls']}")
             st.write(f"LLM calls: {stats['llm_calls']}")
+            st.write(
+                f"Embedding cache: {stats['cache_hit_rate']:.0%} hit rate, "
+                f"{stats['tokens_saved']:,} tokens (${stats['cost_saved']:.4f}) saved"
+            )
     except Exception as e:
         st.caption("Usage tracking unavailable")
 
@@ -41,12 +49,16 @@ st.markdown("---")
 # Initialize components
 @st.cache_resource
 def get_github_client():
-    return GitHubClient()
+    return get_repo_source()
 
 @st.cache_resource
 def get_file_filter():
     return FileFilter()
 
+@st.cache_resource
+def get_file_classifier():
+    return FileClassifier(get_github_client())
+
 @st.cache_resource
 def get_content_normalizer():
     return ContentNormalizer(get_github_client())
@@ -55,6 +67,11 @@ def get_content_normalizer():
 def get_chunker():
     return Chunker()
 
+@st.cache_resource
+def get_parallel_chunker():
+    from github_rag.ingestion.parallel_chunker import ParallelChunker
+    return ParallelChunker(get_content_normalizer(), get_chunker())
+
 @st.cache_resource
 def get_embedding_generator():
     return EmbeddingGenerator()
@@ -65,20 +82,44 @@ def get_vector_store():
         st.session_state.vector_store = create_vector_store()
     return st.session_state.vector_store
 
+def get_manifest():
+    """Ingestion manifest for the current repository and collection."""
+    from github_rag.ingestion.manifest import IngestionManifest
+    collection = getattr(vector_store, 'collection_name', None) or getattr(vector_store, 'index_name', '')
+    return IngestionManifest(st.session_state.repo.full_name, collection)
+
 client = get_github_client()
 file_filter = get_file_filter()
+file_classifier = get_file_classifier()
 normalizer = get_content_normalizer()
 chunker = get_chunker()
+parallel_chunker = get_parallel_chunker()
 embedding_gen = get_embedding_generator()
 vector_store = get_vector_store()
 
+with st.sidebar:
+    rate_limit = client.get_rate_limit_status()
+    if rate_limit['remaining'] is not None:
+        # Limit and reset headers are not on every response
+        budget = f"{rate_limit['remaining']:,}"
+        if rate_limit['limit'] is not None:
+            budget += f" / {rate_limit['limit']:,}"
+        reset_in = rate_limit['reset_in_seconds']
+        st.metric(
+            "GitHub API Budget",
+            budget,
+            help=f"Resets in {reset_in // 60} min" if reset_in is not None else None
+        )
+        if rate_limit['throttled']:
+            st.caption(f"⏳ Pacing requests ({rate_limit['concurrency']} in flight)")
+
 # Repository input section
 st.subheader("📂 Step 1: Enter Repository")
 
 repo_url = st.text_input(
     "GitHub Repository URL",
     placeholder="https://github.com/owner/repository",
-    help="Enter the URL of a public GitHub repository"
+    help="Enter the URL of a public GitHub repository (or a local path when [ingestion] source = \"local\")"
 )
 
 if st.button("🔍 Validate Repository", type="primary"):
@@ -118,11 +159,15 @@ if "repo" in st.session_state:
     if st.button("🔎 Scan Folders", type="primary"):
         with st.spinner("Scanning folder structure..."):
             try:
-                from github_rag.utils.folder_utils import scan_folder_structure
+                from github_rag.ingestion.repo_tree import get_tree_snapshot
+                from github_rag.utils.folder_utils import scan_folder_structure, use_tree_listing
                 
                 repo = st.session_state.repo
-                folder_structure = scan_folder_structure(repo)
+                # One tree snapshot serves both the folder scan and the file fetch
+                snapshot = get_tree_snapshot(repo) if use_tree_listing(repo) else None
+                folder_structure = scan_folder_structure(repo, snapshot=snapshot)
                 
+                st.session_state.tree_snapshot = snapshot
                 st.session_state.folder_structure = folder_structure
                 
                 st.success(f"✅ Found {len(folder_structure)} folders")
@@ -133,7 +178,7 @@ if "repo" in st.session_state:
                 for folder, info in folder_structure.items():
                     folder_data.append({
                         "Folder": folder,
-                        "Files": info['count'],
+                        "Files": info['count'] if info['count'] is not None else "not listed yet",
                         "Extensions": ", ".join(info['extensions'][:5])  # Show first 5
                     })
                 
@@ -145,6 +190,11 @@ if "repo" in st.session_state:
     st.markdown("---")
 
 # Step 2b: Select Folders and Fetch Files
+def _folder_label(folder, info):
+    if info['count'] is None:
+        return f"{folder} (not listed yet)"
+    return f"{folder} ({info['count']} files, {', '.join(info['extensions'][:3])})"
+
 if "folder_structure" in st.session_state:
     st.subheader("📁 Step 2b: Select Folders to Process")
     
@@ -182,13 +232,13 @@ if "folder_structure" in st.session_state:
     
     with col1:
         for folder, info in folder_items[:mid]:
-            label = f"{folder} ({info['count']} files, {', '.join(info['extensions'][:3])})"
+            label = _folder_label(folder, info)
             if st.checkbox(label, key=f"folder_{folder}"):
                 selected_folders.append(folder)
     
     with col2:
         for folder, info in folder_items[mid:]:
-            label = f"{folder} ({info['count']} files, {', '.join(info['extensions'][:3])})"
+            label = _folder_label(folder, info)
             if st.checkbox(label, key=f"folder_{folder}"):
                 selected_folders.append(folder)
     
@@ -199,14 +249,24 @@ if "folder_structure" in st.session_state:
                 from github_rag.utils.folder_utils import get_files_from_folders
                 
                 repo = st.session_state.repo
-                all_files = get_files_from_folders(repo, selected_folders)
+                all_files = get_files_from_folders(
+                    repo, selected_folders, snapshot=st.session_state.get('tree_snapshot')
+                )
                 
                 # Apply file filter
-                filtered_files = [f for f in all_files  
-                    if any(f.name.endswith(ext) for ext in st.session_state.selected_extensions) and
-                    file_filter.is_within_size_limit(f) and
-                    not file_filter.is_excluded_path(f.path)]
-                excluded_files = [f for f in all_files if f not in filtered_files]
+                filtered_files, excluded_files = file_filter.filter_entries(
+                    all_files, extensions=st.session_state.selected_extensions
+                )
+                
+                # Skip binaries, lockfiles, minified and generated code before downloading them
+                # .gitattributes inside the selected folders, plus those above them (without listing the whole tree)
+                attribute_files = {f.path: f for f in all_files if f.name == ".gitattributes"}
+                snapshot = st.session_state.get('tree_snapshot')
+                if snapshot is not None:
+                    attribute_files.update((f.path, f) for f in snapshot.files_above(".gitattributes", selected_folders))
+                file_classifier.load_gitattributes(attribute_files.values())
+                filtered_files, skipped_files = file_classifier.filter_entries(filtered_files)
+                excluded_files += skipped_files
                 
                 st.session_state.filtered_files = filtered_files
                 st.session_state.excluded_files = excluded_files
@@ -230,12 +290,8 @@ if "folder_structure" in st.session_state:
                 if excluded_files:
                     with st.expander("🚫 Excluded Files"):
                         excluded_data = [
-                            {
-                                "File Path": f.path,
-                                "Reason": "Binary/Unsupported" if f.type != "file" 
-                                         else "Unsupported extension"
-                            }
-                            for f in excluded_files
+                            {"File Path": f.path, "Reason": REASON_LABELS.get(reason) or SKIP_LABELS[reason]}
+                            for f, reason in excluded_files
                         ]
                         st.dataframe(excluded_data, use_container_width=True)
                 
@@ -248,26 +304,87 @@ if "folder_structure" in st.session_state:
 if "filtered_files" in st.session_state:
     st.subheader("✂️ Step 3: Extract and Chunk Content")
     
+    manifest = get_manifest()
+    incremental = st.checkbox(
+        "🔁 Incremental sync (only process new or changed files)",
+        value=len(manifest) > 0,
+        help="Compares blob SHAs with the last ingestion of this repository; unchanged files are skipped"
+    )
+
+    with st.expander("🧮 Dry run: estimate tokens, cost and time before processing"):
+        budget = st.number_input("Embedding budget (USD, 0 = no budget)", min_value=0.0, value=0.0, step=0.01, format="%.4f")
+
+        if st.button("🧮 Estimate"):
+            with st.spinner("Sampling a few files to calibrate the estimate..."):
+                try:
+                    from github_rag.ingestion.planner import IngestionPlanner
+
+                    planned_files = st.session_state.filtered_files
+                    if incremental:
+                        planned_files = manifest.files_to_ingest(manifest.plan(planned_files))
+
+                    planner = IngestionPlanner(normalizer, chunker)
+                    planner.sample(planned_files)
+                    ingestion_plan = planner.plan(planned_files)
+
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Chunks", f"~{ingestion_plan['chunks']:,}")
+                        st.metric("GitHub Requests", f"{ingestion_plan['github_requests']:,}")
+                    with col2:
+                        st.metric("Embedding Tokens", f"~{ingestion_plan['embedding_tokens']:,}")
+                        st.metric("Embedding Requests", f"{ingestion_plan['embedding_requests']:,}")
+                    with col3:
+                        st.metric("Est. Cost", f"${ingestion_plan['cost_usd']:.4f}")
+                        st.metric("Est. Time", f"~{ingestion_plan['seconds'] / 60:.1f} min")
+
+                    st.caption(
+                        f"Calibrated on {len(ingestion_plan['sampled'])} sampled files; bytes per token: "
+                        + ", ".join(f"{ext or 'no-ext'} {ratio:.2f}" for ext, ratio in ingestion_plan['ratios'].items())
+                    )
+
+                    folder_data = [
+                        {"Folder": name, "Files": f['files'], "Chunks": f['chunks'],
+                         "Embedding Tokens": f['embedding_tokens'], "Cost (USD)": round(f['cost_usd'], 5)}
+                        for name, f in sorted(ingestion_plan['folders'].items(), key=lambda item: -item[1]['cost_usd'])
+                    ]
+                    st.dataframe(folder_data, use_container_width=True)
+
+                    if budget > 0:
+                        drops = IngestionPlanner.suggest_drops(ingestion_plan, budget)
+                        if drops:
+                            st.warning(f"⚠️ Over budget. Deselect these folders in Step 2b to fit: {', '.join(drops)}")
+                        else:
+                            st.success("✅ Fits within the budget")
+
+                except Exception as e:
+                    st.error(f"❌ Error: {str(e)}")
+
     if st.button("⚙️ Process Files", type="primary"):
         with st.spinner("Processing files and creating chunks..."):
             try:
                 filtered_files = st.session_state.filtered_files
-                all_chunks = []
+                
+                if incremental:
+                    sync_plan = manifest.plan(filtered_files)
+                    filtered_files = manifest.files_to_ingest(sync_plan)
+                    st.info(
+                        f"🔁 {len(sync_plan['added'])} new, {len(sync_plan['modified'])} changed, "
+                        f"{len(sync_plan['deleted'])} deleted, {len(sync_plan['unchanged'])} unchanged files"
+                    )
+                else:
+                    sync_plan = None
+                st.session_state.sync_plan = sync_plan
                 
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
-                for idx, file in enumerate(filtered_files):
+                def report_progress(done, total, file):
                     status_text.text(f"Processing: {file.path}")
-                    
-                    processed = normalizer.process_file(file)
-                    if processed:
-                        content = processed['content']
-                        metadata = processed['metadata']
-                        chunks = chunker.split_by_lines(content, metadata)
-                        all_chunks.extend(chunks)
-                    
-                    progress_bar.progress((idx + 1) / len(filtered_files))
+                    progress_bar.progress(done / total)
+                
+                # Files are fetched concurrently and chunked on a process pool, in order
+                all_chunks = parallel_chunker.chunk_files(filtered_files, report_progress)
                 
                 status_text.text("✅ Processing complete!")
                 
@@ -279,12 +396,24 @@ if "filtered_files" in st.session_state:
                 with col1:
                     st.metric("Total Chunks", len(all_chunks))
                 with col2:
-                    avg_tokens = sum(c['metadata']['token_count'] for c in all_chunks) / len(all_chunks)
+                    avg_tokens = sum(all_chunks.token_count) / max(len(all_chunks), 1)
                     st.metric("Avg Tokens/Chunk", f"{avg_tokens:.0f}")
                 with col3:
-                    total_tokens = sum(c['metadata']['token_count'] for c in all_chunks)
+                    total_tokens = sum(all_chunks.token_count)
                     st.metric("Total Tokens", total_tokens)
                 
+                estimator = get_token_estimator()
+                if estimator is not None:
+                    # Chunk token counts are exact: calibrate on this repo and report the estimate's error
+                    estimator.calibrate(all_chunks)
+                    accuracy = estimator.stats()
+                    st.caption(
+                        f"Token estimator: mean error {accuracy['mean_abs_error']:.1%}, "
+                        f"worst under-estimate {accuracy['max_under_estimate']:.1%} "
+                        f"({accuracy['margin_violations']} of {accuracy['samples']} beyond the "
+                        f"{accuracy['margin']:.0%} margin)"
+                    )
+                
                 with st.expander("📋 View Sample Chunks"):
                     for i, chunk in enumerate(all_chunks[:3]):
                         st.markdown(f"**Chunk {i+1}** from `{chunk['metadata']['file_path']}`")
@@ -296,6 +425,65 @@ if "filtered_files" in st.session_state:
                 st.error(f"❌ Error: {str(e)}")
                 import traceback
                 st.code(traceback.format_exc())
+    
+    if st.button("🚀 Stream Ingest (process, embed & store in one pass)",
+                 help="Overlaps downloading, chunking, embedding and storing; chunks are not kept in memory"):
+        with st.spinner("Streaming files into the vector store..."):
+            try:
+                from github_rag.ingestion.pipeline import IngestionPipeline
+                
+                filtered_files = st.session_state.filtered_files
+                if incremental:
+                    sync_plan = manifest.plan(filtered_files)
+                    filtered_files = manifest.files_to_ingest(sync_plan)
+                    vector_store.delete_chunks(manifest.stale_chunk_ids(sync_plan))
+                    manifest.apply(sync_plan, [])
+                else:
+                    vector_store.clear_collection()
+                    manifest.clear()
+                    manifest.save()  # A failed run must not leave the old manifest describing a wiped collection
+                
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                
+                def report_progress(stats):
+                    status_text.text(
+                        f"Stored {stats['chunks_stored']} chunks from "
+                        f"{stats['files_processed']}/{stats['files_total']} files"
+                    )
+                    progress_bar.progress(stats['files_processed'] / max(stats['files_total'], 1))
+                
+                pipeline = IngestionPipeline(normalizer, chunker, embedding_gen, vector_store, manifest=manifest)
+                stats = pipeline.run(filtered_files, report_progress)
+                manifest.save()
+                
+                status_text.empty()
+                progress_bar.empty()
+                st.success(f"✅ Stored {stats['chunks_stored']} chunks from {stats['files_processed']} files!")
+                if stats['duplicate_chunks']:
+                    st.info(
+                        f"♻️ Reused embeddings for {stats['duplicate_chunks']} duplicate chunks, "
+                        f"saving {stats['tokens_saved']:,} embedding tokens"
+                    )
+                st.session_state.ingestion_complete = True
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Chunks Stored", stats['chunks_stored'])
+                with col2:
+                    st.metric("Total Tokens", stats['tokens_stored'])
+                with col3:
+                    st.metric("Files Skipped", stats['files_failed'])
+                
+                if stats['warnings']:
+                    with st.expander("⚠️ Validation Warnings"):
+                        for warning in stats['warnings']:
+                            st.warning(warning)
+                
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+                import traceback
+                st.code(traceback.format_exc())
 
     st.markdown("---")
 
@@ -314,6 +502,8 @@ if "chunks" in st.session_state:
             with st.spinner("Generating embeddings and storing..."):
                 try:
                     chunks = st.session_state.chunks
+                    sync_plan = st.session_state.get('sync_plan')
+                    manifest = get_manifest()
 
                     # Validate chunks before embedding
                     validator = ChunkValidator(max_chunk_tokens=500)
@@ -324,34 +514,64 @@ if "chunks" in st.session_state:
                             for warning in warnings:
                                 st.warning(warning)
                     
-                    if not valid_chunks:
+                    if not valid_chunks and (sync_plan is None or not (manifest.stale_chunk_ids(sync_plan) or chunks.files)):
                         st.error("❌ No valid chunks to embed!")
                         st.stop()
                     
                     st.info(f"✅ Validated {len(valid_chunks)} chunks (from {len(chunks)} total)")
                                         
-                    # Clear existing data
                     status_text = st.empty()
-                    status_text.text("🧹 Clearing previous data...")
-                    vector_store.clear_collection()
+                    if sync_plan is None:
+                        # Full re-ingestion: clear existing data
+                        status_text.text("🧹 Clearing previous data...")
+                        vector_store.clear_collection()
+                        manifest.clear()
+                        manifest.save()  # Saved now, so a failure below cannot leave a stale manifest
+                    else:
+                        # Incremental sync: drop only vectors of changed or deleted files
+                        stale_ids = manifest.stale_chunk_ids(sync_plan)
+                        status_text.text(f"🧹 Removing {len(stale_ids)} outdated chunks...")
+                        vector_store.delete_chunks(stale_ids)
                     
                     # Generate embeddings
                     status_text.text("🔮 Generating embeddings...")
-                    chunk_texts = [chunk['content'] for chunk in valid_chunks]
-                    
-                    # Batch process (OpenAI allows up to 2048 inputs per request)
-                    batch_size = 100
-                    all_embeddings = []
                     
+                    # Requests are packed by chunk token counts up to the [embeddings] limits
                     progress_bar = st.progress(0)
-                    for i in range(0, len(chunk_texts), batch_size):
-                        batch = chunk_texts[i:i + batch_size]
-                        embeddings = embedding_gen.generate_embeddings_batch(batch)
-                        all_embeddings.extend(embeddings)
-                        progress_bar.progress(min((i + batch_size) / len(chunk_texts), 1.0))
                     
-                    status_text.text("💾 Storing in ChromaDB...")
-                    vector_store.add_chunks(chunks, all_embeddings)
+                    def report_embedding_progress(done, total):
+                        progress_bar.progress(done / max(total, 1))
+                    
+                    def embed_texts(texts, token_counts):
+                        return embedding_gen.generate_embeddings_batch(texts, token_counts, report_embedding_progress)
+                    
+                    deduplicator = None
+                    stored_chunks = valid_chunks
+                    merged = None  # Sets of copies stored as one chunk
+                    if dedup_enabled():
+                        # Identical chunks (vendored copies, license headers) are embedded once
+                        deduplicator = ChunkDeduplicator()
+                        all_embeddings = deduplicator.embed(valid_chunks, embed_texts)
+                        if sync_plan is None and get_ingestion_config().get("merge_duplicates", False):
+                            stored_chunks, all_embeddings = deduplicator.merge(valid_chunks, all_embeddings)
+                            merged = list(deduplicator.group(valid_chunks).values())
+                    else:
+                        all_embeddings = embed_texts(
+                            [chunk['content'] for chunk in valid_chunks],
+                            [chunk['metadata'].get('token_count') for chunk in valid_chunks]
+                        )
+                    
+                    status_text.text("💾 Storing in vector database...")
+                    if stored_chunks:
+                        vector_store.add_chunks(stored_chunks, all_embeddings)
+                    
+                    # Processed files are recorded even when none of their chunks were valid
+                    if sync_plan is None:
+                        manifest.record_files(chunks.files)
+                        manifest.record_chunks(valid_chunks, merged)
+                    else:
+                        manifest.apply(sync_plan, valid_chunks, chunks.files)
+                    manifest.save()
                     
                     # Verify storage
                     info = vector_store.get_collection_info()
@@ -360,13 +580,18 @@ if "chunks" in st.session_state:
                     progress_bar.empty()
                     
                     st.success(f"✅ Successfully stored {info['count']} chunks in vector database!")
+                    if deduplicator is not None and deduplicator.duplicate_chunks:
+                        st.info(
+                            f"♻️ Reused embeddings for {deduplicator.duplicate_chunks} duplicate chunks, "
+                            f"saving {deduplicator.tokens_saved:,} embedding tokens"
+                        )
                     st.session_state.ingestion_complete = True
                     
                     col1, col2, col3 = st.columns(3)
                     with col1:
                         st.metric("Chunks Stored", info['count'])
                     with col2:
-                        st.metric("Embedding Dimension", len(all_embeddings[0]))
+                        st.metric("Embedding Dimension", len(all_embeddings[0]) if all_embeddings else "-")
                     with col3:
                         st.metric("Collection", info['name'])
                     
@@ -378,6 +603,9 @@ if "chunks" in st.session_state:
     with col2:
         if st.button("🗑️ Clear Vector Store"):
             vector_store.clear_collection()
+            manifest = get_manifest()
+            manifest.clear()
+            manifest.save()
             if 'ingestion_complete' in st.session_state:
                 del st.session_state.ingestion_complete
             st.success("✅ Vector store cleared!")
@@ -0,0 +1,167 @@
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+from github_rag.utils.config import get_cache_config
+
+
+class BlobCache:
+    """Content-addressed on-disk cache of file bodies, keyed by git blob SHA.
+
+    A blob SHA identifies the exact file content, so entries never go stale;
+    the cache only needs a size bound. Reads bump the file's mtime and
+    eviction removes the least recently used blobs first.
+    """
+
+    def __init__(self, cache_directory: Optional[str] = None, max_size_mb: Optional[float] = None):
+        """
+        Initialize the cache from config.toml.
+
+        Args:
+            cache_directory: Override for [cache] directory
+            max_size_mb: Override for [cache] max_blob_cache_mb
+        """
+        config = get_cache_config()
+        root = Path(cache_directory or config.get("directory", "data/cache"))
+        self.directory = root / "blobs"
+        self.max_size_bytes = int((max_size_mb or config.get("max_blob_cache_mb", 512)) * 1024 * 1024)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.size_bytes = sum(f.stat().st_size for f in self.directory.glob("*/*"))
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, sha: str) -> Path:
+        """Blob path, fanned out by the first two hex digits like .git/objects."""
+        return self.directory / sha[:2] / sha[2:]
+
+    def __contains__(self, sha: str) -> bool:
+        """Whether a blob is cached, without counting a hit or miss."""
+        return self._path(sha).exists()
+
+    def get(self, sha: str) -> Optional[bytes]:
+        """Return cached content for a blob SHA, or None on a miss."""
+        path = self._path(sha)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            # Missing, or evicted by another thread in between: a miss either way
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return data
+
+    def peek(self, sha: str, size: int) -> Optional[bytes]:
+        """Return up to ``size`` leading bytes of a cached blob, without counting a hit or miss."""
+        try:
+            with open(self._path(sha), 'rb') as f:
+                return f.read(size)
+        except FileNotFoundError:
+            return None
+
+    def open(self, sha: str) -> Optional[BinaryIO]:
+        """Open a cached blob for reading in blocks, or return None on a miss."""
+        path = self._path(sha)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            f.close()  # Evicted since it was opened
+            self.misses += 1
+            return None
+        self.hits += 1
+        return f
+
+    def put_stream(self, sha: str, blocks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Pass blocks through, storing them as the blob's content once all
+        have been read. A stream that is abandoned or fails is not stored.
+        """
+        path = self._path(sha)
+        if path.exists():
+            yield from blocks
+            return
+
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for block in blocks:
+                    f.write(block)
+                    size += len(block)
+                    yield block
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if size > self.max_size_bytes:
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.size_bytes += size
+            if self.size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def put(self, sha: str, data: bytes) -> None:
+        """Store content for a blob SHA, evicting old entries if over budget."""
+        if len(data) > self.max_size_bytes:
+            return
+
+        path = self._path(sha)
+        if path.exists():
+            return
+
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.size_bytes += len(data)
+            if self.size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def get_or_load(self, sha: str, loader: Callable[[], bytes]) -> bytes:
+        """Return cached content, or call loader() and cache its result."""
+        data = self.get(sha)
+        if data is None:
+            data = loader()
+            self.put(sha, data)
+        return data
+
+    def _evict(self) -> None:
+        """Delete least recently used blobs until the cache is 90% of its budget."""
+        target = self.max_size_bytes * 0.9
+        blobs = []
+        for path in self.directory.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            blobs.append((stat.st_mtime, stat.st_size, path))
+        blobs.sort()
+
+        self.size_bytes = sum(size for _, size, _ in blobs)
+        for _, size, path in blobs:
+            if self.size_bytes <= target:
+                break
+            path.unlink(missing_ok=True)
+            self.size_bytes -= size
+
+
+@lru_cache(maxsize=None)
+def get_blob_cache() -> BlobCache:
+    """Process-wide blob cache configured from config.toml."""
+    return BlobCache()
@@ -1,12 +1,13 @@
-import tiktoken
 from typing import List, Dict, Tuple
+from github_rag.ingestion.chunk_batch import ChunkBatch
+from github_rag.utils.tokenizer import get_tokenizer
 
 
 class ChunkValidator:
     """Validate chunks before embedding to catch issues early."""
     
     def __init__(self, max_chunk_tokens: int = 500):
-        self.encoder = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = get_tokenizer()
         self.max_chunk_tokens = max_chunk_tokens
     
     def validate_chunks(self, chunks: List[Dict]) -> Tuple[List[Dict], List[str]]:
@@ -19,8 +20,21 @@ class ChunkValidator:
         valid_chunks = []
         warnings = []
         
+        if isinstance(chunks, ChunkBatch):
+            # Token counts are already a column; no metadata dicts needed
+            token_counts = chunks.token_count
+        else:
+            # Chunker already records token_count; only count chunks without one, in one batch
+            token_counts = [c['metadata'].get('token_count') for c in chunks]
+            uncounted = [i for i, tokens in enumerate(token_counts) if tokens is None]
+            if uncounted:
+                counted = self.tokenizer.count_batch([chunks[i]['content'] for i in uncounted])
+                for i, tokens in zip(uncounted, counted):
+                    token_counts[i] = tokens
+        
         for i, chunk in enumerate(chunks):
             content = chunk['content']
+            tokens = token_counts[i]
             
             # Check if empty
             if not content.strip():
@@ -28,9 +42,7 @@ class ChunkValidator:
                 continue
             
             # Check token count
-            tokens = len(self.encoder.encode(content))
-            
-            if tokens > self.max_chunk_tokens:
+            if tokens is not None and tokens > self.max_chunk_tokens:
                 warnings.append(
                     f"Chunk {i}: {tokens} tokens (max: {self.max_chunk_tokens}), "
                     f"from {chunk['metadata']['file_path']}"
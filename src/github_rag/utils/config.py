@@ -34,4 +34,39 @@ def get_filtering_config() -> Dict[str, Any]:
 def get_vector_store_config() -> Dict[str, Any]:
     """Get vector store configuration."""
     config = load_config()
-    return config.get("vector_store", {})
\ No newline at end of file
+    return config.get("vector_store", {})
+
+def get_ingestion_config() -> Dict[str, Any]:
+    """Get ingestion configuration."""
+    config = load_config()
+    return config.get("ingestion", {})
+
+
+def get_cache_config() -> Dict[str, Any]:
+    """Get local cache configuration."""
+    config = load_config()
+    return config.get("cache", {})
+
+
+def get_notebook_config() -> Dict[str, Any]:
+    """Get Jupyter notebook parsing configuration."""
+    config = load_config()
+    return config.get("notebooks", {})
+
+
+def get_tokenizer_config() -> Dict[str, Any]:
+    """Get tokenizer configuration."""
+    config = load_config()
+    return config.get("tokenizer", {})
+
+
+def get_planner_config() -> Dict[str, Any]:
+    """Get dry-run planner configuration."""
+    config = load_config()
+    return config.get("planner", {})
+
+
+def get_embeddings_config() -> Dict[str, Any]:
+    """Get embedding request configuration."""
+    config = load_config()
+    return config.get("embeddings", {})
@@ -0,0 +1,168 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from github_rag.utils.config import get_cache_config
+
+_ROW_OVERHEAD_BYTES = 100  # key, counters and SQLite bookkeeping per row, on top of the vector
+_SQL_VARIABLES = 500       # hashes per SELECT, well under SQLite's parameter limit
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of the exact text that is sent for embedding."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Disk-backed cache of embedding vectors in a SQLite database.
+
+    Rows are keyed by (embedding model, dimensions, SHA-256 of the text), so
+    changing either setting never returns a vector from another embedding
+    space. Vectors are stored as float32 blobs together with the tokens the
+    text cost to embed, which is what a hit saves. Lookups bump a row's
+    last-used time, and eviction drops the least recently used rows once
+    the cache is over its size budget.
+    """
+
+    def __init__(self, cache_directory: Optional[str] = None, max_size_mb: Optional[float] = None):
+        """
+        Initialize the cache from config.toml.
+
+        Args:
+            cache_directory: Override for [cache] directory
+            max_size_mb: Override for [cache] max_embedding_cache_mb
+        """
+        config = get_cache_config()
+        root = Path(cache_directory or config.get("directory", "data/cache"))
+        root.mkdir(parents=True, exist_ok=True)
+        self.path = root / "embeddings.sqlite"
+        self.max_size_bytes = int((max_size_mb or config.get("max_embedding_cache_mb", 256)) * 1024 * 1024)
+        self._lock = threading.Lock()
+        # Shared by the UI and pipeline threads; every use holds the lock
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, dimensions INTEGER NOT NULL, text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL, tokens INTEGER NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, dimensions, text_hash))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._db.commit()
+        self.size_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) + COUNT(*) * ? FROM embeddings", (_ROW_OVERHEAD_BYTES,)
+        ).fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    def get_many(self, model: str, dimensions: int, hashes: Sequence[str]) -> Dict[str, Tuple[List[float], int]]:
+        """
+        Look up cached vectors.
+
+        Args:
+            model: Embedding model name
+            dimensions: Requested dimensions (0 for the model default)
+            hashes: text_hash() of each text
+
+        Returns:
+            Dictionary mapping each cached hash to (vector, tokens it cost to embed)
+        """
+        wanted = list(dict.fromkeys(hashes))
+        found: Dict[str, Tuple[List[float], int]] = {}
+        with self._lock:
+            for i in range(0, len(wanted), _SQL_VARIABLES):
+                part = wanted[i:i + _SQL_VARIABLES]
+                rows = self._db.execute(
+                    f"SELECT text_hash, vector, tokens FROM embeddings WHERE model = ? AND dimensions = ?"
+                    f" AND text_hash IN ({', '.join('?' * len(part))})",
+                    (model, dimensions, *part)
+                ).fetchall()
+                for key, blob, row_tokens in rows:
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[key] = (vector.tolist(), row_tokens)
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND dimensions = ? AND text_hash = ?",
+                    [(now, model, dimensions, key) for key in found]
+                )
+                self._db.commit()
+
+            hit_keys = [key for key in hashes if key in found]
+            self.hits += len(hit_keys)
+            self.misses += len(hashes) - len(hit_keys)
+            self.tokens_saved += sum(found[key][1] for key in hit_keys)
+        return found
+
+    def put_many(self, model: str, dimensions: int, entries: Sequence[Tuple[str, List[float], int]]) -> None:
+        """
+        Store vectors.
+
+        Args:
+            model: Embedding model name
+            dimensions: Requested dimensions (0 for the model default)
+            entries: (text hash, vector, tokens it cost to embed) triples
+        """
+        if not entries:
+            return
+        now = time.time()
+        rows = [
+            (model, dimensions, key, array('f', vector).tobytes(), tokens, now)
+            for key, vector, tokens in entries
+        ]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+            self.size_bytes += sum(len(row[3]) + _ROW_OVERHEAD_BYTES for row in rows)
+            if self.size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used rows until the cache is 90% of its budget (lock held)."""
+        target = self.max_size_bytes * 0.9
+        cursor = self._db.execute("SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used")
+        doomed = []
+        for rowid, size in cursor:
+            if self.size_bytes <= target:
+                break
+            doomed.append((rowid,))
+            self.size_bytes -= size + _ROW_OVERHEAD_BYTES
+        cursor.close()
+        self._db.executemany("DELETE FROM embeddings WHERE rowid = ?", doomed)
+        self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """Lookups that hit and missed, the hit rate, and embedding tokens saved by hits."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'tokens_saved': self.tokens_saved
+        }
+
+    def clear(self) -> None:
+        """Delete every cached vector."""
+        with self._lock:
+            self._db.execute("DELETE FROM embeddings")
+            self._db.commit()
+            self.size_bytes = 0
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide embedding cache, or None if disabled in config.toml."""
+    if not get_cache_config().get("embedding_cache", True):
+        return None
+    return EmbeddingCache()
@@ -1,68 +1,111 @@
 from typing import List, Dict
 from github import ContentFile, Repository
+from github_rag.ingestion.github_client import get_directory_contents
+from github_rag.ingestion.repo_tree import get_tree_snapshot
+from github_rag.utils.config import get_ingestion_config
 
 
-def scan_folder_structure(repo):
+def use_tree_listing(repo) -> bool:
+    """Check whether folders should be listed from a full tree listing."""
+    if hasattr(repo, "list_entries"):
+        return True  # On-disk checkouts have no get_contents
+    return get_ingestion_config().get("listing_mode", "tree") == "tree"
+
+
+def scan_folder_structure(repo, entries=None, snapshot=None):
     """Scan repository and return folder structure."""
+    if snapshot is None and entries is None and use_tree_listing(repo):
+        snapshot = get_tree_snapshot(repo)
+
+    if snapshot is not None:
+        return snapshot.folder_summary()
+
     folders = {}
-    
+
+    def add_file(item):
+        if '/' in item.path:
+            folder = '/'.join(item.path.split('/')[:-1])
+        else:
+            folder = '.'
+
+        extension = item.name.split('.')[-1] if '.' in item.name else 'no-ext'
+
+        if folder not in folders:
+            folders[folder] = {'count': 0, 'extensions': set()}
+
+        folders[folder]['count'] += 1
+        folders[folder]['extensions'].add(f".{extension}")
+
     def scan_directory(path=""):
-        contents = repo.get_contents(path)
-        contents = contents if isinstance(contents, list) else [contents]
-        
+        contents = get_directory_contents(repo, path)
+
         for item in contents:
             if item.type == "dir":
                 scan_directory(item.path)
             else:
-                if '/' in item.path:
-                    folder = '/'.join(item.path.split('/')[:-1])
-                else:
-                    folder = '.'
-                
-                extension = item.name.split('.')[-1] if '.' in item.name else 'no-ext'
-                
-                if folder not in folders:
-                    folders[folder] = {'count': 0, 'extensions': set()}
-                
-                folders[folder]['count'] += 1
-                folders[folder]['extensions'].add(f".{extension}")
-    
-    scan_directory()
-    
+                add_file(item)
+
+    if entries is not None:
+        for item in entries:
+            if item.type == "file":
+                add_file(item)
+    else:
+        scan_directory()
+
     for folder in folders:
         folders[folder]['extensions'] = sorted(folders[folder]['extensions'])
-    
+
     return dict(sorted(folders.items()))
 
 
-def get_files_from_folders(repo, selected_folders):
+def get_files_from_folders(repo, selected_folders, entries=None, snapshot=None):
     """Fetch files from selected folders."""
+    if snapshot is None and entries is None and use_tree_listing(repo):
+        snapshot = get_tree_snapshot(repo)
+
+    if snapshot is not None:
+        return snapshot.files_under(selected_folders)
+
+    if entries is not None:
+        if "." in selected_folders:
+            return [item for item in entries if item.type == "file"]
+        prefixes = tuple(folder.rstrip('/') + '/' for folder in selected_folders)
+        return [item for item in entries if item.type == "file" and item.path.startswith(prefixes)]
+
     files = []
-    
+
     for folder in selected_folders:
         path = "" if folder == "." else folder
-        contents = repo.get_contents(path)
-        contents = contents if isinstance(contents, list) else [contents]
-        
+        contents = get_directory_contents(repo, path)
+
         for item in contents:
             if item.type == "file":
                 files.append(item)
             elif item.type == "dir":
                 files.extend(get_files_recursively(repo, item.path))
-    
+
     return files
 
 
-def get_files_recursively(repo, path):
+def get_files_recursively(repo, path, entries=None, snapshot=None):
     """Recursively get all files."""
+    if snapshot is None and entries is None and use_tree_listing(repo):
+        snapshot = get_tree_snapshot(repo)
+
+    if snapshot is not None:
+        return snapshot.files_under([path or "."])
+
+    if entries is not None:
+        prefix = path.rstrip('/') + '/' if path else ''
+        return [item for item in entries if item.type == "file" and item.path.startswith(prefix)]
+
     files = []
-    contents = repo.get_contents(path)
-    contents = contents if isinstance(contents, list) else [contents]
-    
+    contents = get_directory_contents(repo, path)
+
     for item in contents:
         if item.type == "file":
             files.append(item)
         elif item.type == "dir":
             files.extend(get_files_recursively(repo, item.path))
-    
-    return files
\ No newline at end of file
+
+    return files
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from github_rag.utils.config import get_cache_config
+
+
+class ETagCache:
+    """On-disk cache of GitHub API responses keyed by URL, stored with their ETags.
+
+    Cached ETags are sent back as If-None-Match; GitHub answers unchanged
+    resources with 304 Not Modified, which does not count against the
+    rate limit, and the cached body is reused. Reads bump the entry's
+    mtime and the least recently used entries are evicted beyond
+    [cache] max_etag_cache_mb.
+    """
+
+    def __init__(self, cache_directory: Optional[str] = None, max_size_mb: Optional[float] = None):
+        """
+        Initialize the cache from config.toml.
+
+        Args:
+            cache_directory: Override for [cache] directory
+            max_size_mb: Override for [cache] max_etag_cache_mb
+        """
+        config = get_cache_config()
+        root = Path(cache_directory or config.get("directory", "data/cache"))
+        self.directory = root / "etags"
+        self.max_size_bytes = int((max_size_mb or config.get("max_etag_cache_mb", 64)) * 1024 * 1024)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.size_bytes = sum(f.stat().st_size for f in self.directory.glob("*.json"))
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached {'etag', 'data'} entry for a key, if any."""
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            return None  # Missing, being evicted, or unreadable
+        return entry
+
+    def put(self, key: str, url: str, etag: str, data: Any) -> None:
+        """Store a response body with its ETag."""
+        path = self._path(key)
+        # Concurrent fetches may store the same key: each writes its own temporary file
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"url": url, "etag": etag, "data": data}, f)
+        size = tmp_path.stat().st_size
+        if size > self.max_size_bytes:
+            tmp_path.unlink(missing_ok=True)
+            return
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.size_bytes += size
+            if self.size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is 90% of its budget."""
+        target = self.max_size_bytes * 0.9
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        self.size_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size_bytes <= target:
+                break
+            path.unlink(missing_ok=True)
+            self.size_bytes -= size
+
+
+@lru_cache(maxsize=None)
+def get_etag_cache() -> Optional[ETagCache]:
+    """Process-wide ETag cache, or None if disabled in config.toml."""
+    if not get_cache_config().get("etag_cache", True):
+        return None
+    return ETagCache()
+
+
+def conditional_get(requester, url: str, parameters: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, Any]]:
+    """
+    GET a GitHub API resource, revalidating any cached copy with its ETag.
+
+    Args:
+        requester: PyGithub Requester (e.g. ``repo.requester``)
+        url: API URL, absolute or relative to the API root
+        parameters: Optional query parameters
+
+    Returns:
+        Tuple of (decoded JSON body, response headers)
+    """
+    cache = get_etag_cache()
+    if cache is None:
+        response_headers, data = requester.requestJsonAndCheck("GET", url, parameters)
+        return data, response_headers
+
+    # Responses depend on who asks (private repositories, rate limits): key by credentials too
+    token = getattr(getattr(requester, "auth", None), "token", None)
+    identity = hashlib.sha256(token.encode()).hexdigest()[:16] if token else "anonymous"
+    cache_key = f"{identity} {url}" + ("?" + json.dumps(parameters, sort_keys=True) if parameters else "")
+    cached = cache.get(cache_key)
+    headers = {"If-None-Match": cached["etag"]} if cached else None
+
+    status, response_headers, output = requester.requestJson("GET", url, parameters, headers)
+
+    if status == 304 and cached:
+        cache.hits += 1
+        return cached["data"], response_headers
+
+    data = json.loads(output) if output else None
+    if status >= 400:
+        raise requester.createException(status, response_headers, data)
+
+    cache.misses += 1
+    etag = response_headers.get("etag")
+    if etag:
+        cache.put(cache_key, url, etag, data)
+    return data, response_headers
@@ -0,0 +1,258 @@
+import math
+import string
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from github_rag.utils.config import get_tokenizer_config
+from github_rag.utils.tokenizer import Tokenizer, get_tokenizer
+
+_PUNCTUATION = string.punctuation.encode()
+
+# Tokens per feature unit (bytes, punctuation, spaces, newlines/tabs, extra
+# UTF-8 bytes), used until a fit has samples; roughly 3.5 bytes per token for code
+_DEFAULT_WEIGHTS = (0.22, 0.25, -0.05, 0.25, 0.2)
+_RIDGE = 1.0            # pulls sparse fits towards the defaults
+_MIN_SAMPLE_TOKENS = 20  # shorter texts are too noisy to calibrate on
+_CALIBRATED_KEYS = 65536  # chunks remembered by calibrate(), so re-runs do not count them twice
+
+
+def _features(text: str) -> tuple:
+    """Byte length and character-class counts, all C-speed passes over the UTF-8 bytes."""
+    data = text.encode('utf-8')
+    size = len(data)
+    return (
+        size,
+        size - len(data.translate(None, _PUNCTUATION)),
+        data.count(b' '),
+        data.count(b'\n') + data.count(b'\t'),
+        size - len(text)
+    )
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> Optional[List[float]]:
+    """Solve a small linear system by Gaussian elimination (None if singular)."""
+    n = len(vector)
+    rows = [matrix[i][:] + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, n):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, n + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        solution[r] = (rows[r][n] - sum(rows[r][c] * solution[c] for c in range(r + 1, n))) / rows[r][r]
+    return solution
+
+
+class _Fit:
+    """Running least-squares fit of token count on features, weighted for relative error."""
+
+    def __init__(self):
+        size = len(_DEFAULT_WEIGHTS)
+        self.xtx = [[0.0] * size for _ in range(size)]
+        self.xty = [0.0] * size
+        self.samples = 0
+        self.weights = _DEFAULT_WEIGHTS
+        self._dirty = False
+
+    def add(self, features: tuple, tokens: int) -> None:
+        row = [f / tokens for f in features]  # so each sample's error counts relative to its size
+        for i, xi in enumerate(row):
+            self.xty[i] += xi
+            for j, xj in enumerate(row):
+                self.xtx[i][j] += xi * xj
+        self.samples += 1
+        self._dirty = True
+
+    def current(self) -> tuple:
+        if self._dirty:
+            size = len(_DEFAULT_WEIGHTS)
+            matrix = [[self.xtx[i][j] + (_RIDGE if i == j else 0.0) for j in range(size)] for i in range(size)]
+            vector = [self.xty[i] + _RIDGE * _DEFAULT_WEIGHTS[i] for i in range(size)]
+            self.weights = tuple(_solve(matrix, vector) or self.weights)
+            self._dirty = False
+        return self.weights
+
+
+class TokenEstimator:
+    """Predicts token counts from byte length and character classes.
+
+    Weights are fitted per file extension (falling back to all extensions,
+    then to built-in defaults) from texts whose exact count is already
+    known, e.g. chunks just produced by the Chunker, so the estimator is
+    calibrated on the repository being ingested. Limit checks (fits(),
+    bounded_count()) are answered from the estimate alone when it is clear
+    of the limit by the safety margin, and by exact encoding otherwise.
+
+    Every exact count seen is also compared against the estimate; stats()
+    reports the error so the margin can be checked.
+    """
+
+    def __init__(self, tokenizer: Tokenizer, margin: float = 0.15, min_samples: int = 10):
+        """
+        Initialize the estimator.
+
+        Args:
+            tokenizer: Tokenizer used for exact counts
+            margin: Relative safety margin around limits
+            min_samples: Samples an extension needs before its own fit is used
+        """
+        self.tokenizer = tokenizer
+        self.margin = margin
+        self.min_samples = min_samples
+        self._fits: Dict[str, _Fit] = {}
+        self._all = _Fit()
+        self._calibrated: OrderedDict = OrderedDict()  # (hash, length) of chunks calibrate() has seen
+        self._lock = threading.Lock()
+
+        self.estimated = 0     # limit checks decided from the estimate alone
+        self.refined = 0       # limit checks that fell back to an exact count
+        self._errors = 0       # exact counts compared against the estimate
+        self._abs_error = 0.0
+        self._max_under = 0.0
+        self._violations = 0   # exact count above the estimate's upper bound
+
+    def _weights(self, extension: str) -> tuple:
+        fit = self._fits.get(extension)
+        if fit is not None and fit.samples >= self.min_samples:
+            return fit.current()
+        return self._all.current()
+
+    def estimate(self, text: str, extension: str = "") -> float:
+        """Estimated token count of text from a file with this extension (e.g. "py")."""
+        features = _features(text)
+        with self._lock:
+            weights = self._weights(extension)
+        return max(sum(w * f for w, f in zip(weights, features)), 0.0)
+
+    def upper_bound(self, text: str, extension: str = "") -> int:
+        """Estimate plus the safety margin."""
+        return math.ceil(self.estimate(text, extension) * (1 + self.margin))
+
+    def observe(self, text: str, tokens: int, extension: str = "") -> None:
+        """
+        Record an exact token count: updates the error statistics and the fit.
+
+        Args:
+            text: Text that was counted
+            tokens: Its exact token count
+            extension: File extension the text came from
+        """
+        if tokens < _MIN_SAMPLE_TOKENS:
+            return
+        features = _features(text)
+        with self._lock:
+            estimate = max(sum(w * f for w, f in zip(self._weights(extension), features)), 0.0)
+            error = (estimate - tokens) / tokens
+            self._errors += 1
+            self._abs_error += abs(error)
+            self._max_under = max(self._max_under, -error)
+            if tokens > estimate * (1 + self.margin):
+                self._violations += 1
+
+            self._fits.setdefault(extension, _Fit()).add(features, tokens)
+            self._all.add(features, tokens)
+
+    def calibrate(self, chunks: Iterable[Dict], max_samples: int = 2000) -> None:
+        """
+        Calibrate from chunks that carry an exact metadata token_count, without encoding.
+
+        Each distinct chunk is observed once, so calibrating again on the
+        same chunks (e.g. re-processing a repository) does not weight them twice.
+
+        Args:
+            chunks: Chunk dicts (or views), e.g. the output of the Chunker
+            max_samples: Chunks sampled, evenly spaced
+        """
+        chunks = list(chunks) if not hasattr(chunks, '__getitem__') else chunks
+        step = max(len(chunks) // max_samples, 1)
+        for i in range(0, len(chunks), step):
+            metadata = chunks[i]['metadata']
+            if 'token_count' not in metadata:
+                continue
+            content = chunks[i]['content']
+            key = (hash(content), len(content))
+            with self._lock:
+                if key in self._calibrated:
+                    continue
+                self._calibrated[key] = True
+                if len(self._calibrated) > _CALIBRATED_KEYS:
+                    self._calibrated.popitem(last=False)
+            self.observe(content, int(metadata['token_count']), metadata.get('file_extension', ''))
+
+    def bounded_count(self, text: str, limit: int, extension: str = "") -> Tuple[int, bool]:
+        """
+        Token count of text, or an upper bound on it when that is already within ``limit``.
+
+        A memoized exact count is used when there is one; otherwise the
+        estimate decides when its upper bound is within the limit, and
+        the text is encoded exactly only when it is not.
+
+        Returns:
+            (tokens, exact): the count, and whether it is exact
+        """
+        tokens = self.tokenizer.cached_count(text)
+        if tokens is not None:
+            return tokens, True
+        bound = self.upper_bound(text, extension)
+        if bound <= limit:
+            with self._lock:
+                self.estimated += 1
+            return bound, False
+        tokens = self.tokenizer.count(text)
+        with self._lock:
+            self.refined += 1
+        self.observe(text, tokens, extension)
+        return tokens, True
+
+    def fits(self, text: str, limit: int, extension: str = "") -> bool:
+        """Whether text has at most ``limit`` tokens, encoding it only when the estimate is near the limit."""
+        return self.bounded_count(text, limit, extension)[0] <= limit
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Estimator accuracy and how often encoding was skipped.
+
+        Returns:
+            Dictionary with 'samples' (exact counts compared), 'mean_abs_error'
+            and 'max_under_estimate' (relative), 'margin_violations' (exact
+            count above the upper bound), 'estimated' and 'refined' limit
+            checks, and the 'margin'
+        """
+        with self._lock:
+            return {
+                'samples': self._errors,
+                'mean_abs_error': self._abs_error / self._errors if self._errors else 0.0,
+                'max_under_estimate': self._max_under,
+                'margin_violations': self._violations,
+                'estimated': self.estimated,
+                'refined': self.refined,
+                'margin': self.margin
+            }
+
+
+@lru_cache(maxsize=None)
+def _load_estimator(encoding_name: str) -> TokenEstimator:
+    config = get_tokenizer_config()
+    return TokenEstimator(
+        get_tokenizer(encoding_name),
+        margin=config.get("estimate_margin", 0.15),
+        min_samples=config.get("estimate_min_samples", 10)
+    )
+
+
+def get_token_estimator(tokenizer: Optional[Tokenizer] = None) -> Optional[TokenEstimator]:
+    """
+    Shared TokenEstimator for a tokenizer's encoding (default: [tokenizer] encoding).
+
+    Returns:
+        The estimator, or None when [tokenizer] estimate is off
+    """
+    if not get_tokenizer_config().get("estimate", True):
+        return None
+    return _load_estimator((tokenizer or get_tokenizer()).encoding_name)
@@ -1,17 +1,19 @@
-import tiktoken
 from typing import List, Dict
+from github_rag.utils.token_estimator import get_token_estimator
+from github_rag.utils.tokenizer import get_tokenizer_for_model
 
 
 class TokenCounter:
     """Count and manage tokens to stay within limits."""
     
     def __init__(self, model="gpt-4o-mini", max_tokens=100):  # Set to 100 for testing
-        self.encoder = tiktoken.encoding_for_model(model)
+        self.tokenizer = get_tokenizer_for_model(model)
+        self.estimator = get_token_estimator(self.tokenizer)
         self.max_tokens = max_tokens
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text."""
-        return len(self.encoder.encode(text))
+        return self.tokenizer.count(text)
     
     def truncate_chunks(self, chunks: List[Dict], system_prompt: str, user_query: str) -> List[Dict]:
         """Truncate chunks to fit within token limit."""
@@ -25,12 +27,14 @@ class TokenCounter:
         if available_tokens < 20:
             return []  # Not enough room
         
+        counts = self._count_candidates(chunks, available_tokens)
+        
         # Add chunks until limit
         truncated = []
         current_tokens = 0
         
-        for chunk in chunks:
-            chunk_tokens = self.count_tokens(chunk['content'])
+        for i, chunk in enumerate(chunks):
+            chunk_tokens = counts[i] if i < len(counts) else self.count_tokens(chunk['content'])
             
             if current_tokens + chunk_tokens <= available_tokens:
                 truncated.append(chunk)
@@ -39,15 +43,15 @@ class TokenCounter:
                 # Try to fit partial chunk
                 remaining = available_tokens - current_tokens
                 if remaining > 10:
-                    # Truncate this chunk's content
-                    words = chunk['content'].split()
-                    truncated_content = ""
-                    for word in words:
-                        test = truncated_content + " " + word
-                        if self.count_tokens(test) < remaining:
-                            truncated_content = test
-                        else:
-                            break
+                    # Truncate this chunk's content at the token limit (one encode instead of one per word), leaving room for "..."
+                    limit = remaining - self.count_tokens("...")
+                    truncated_content = self.tokenizer.truncate(chunk['content'], limit).rstrip('\ufffd')
+                    rest = chunk['content'][len(truncated_content):]
+                    if truncated_content[-1:].strip() and rest[:1].strip():
+                        # The cut fell inside a word: drop the partial word, unless it is all there is
+                        words = truncated_content.rsplit(None, 1)
+                        truncated_content = words[0] if len(words) > 1 else truncated_content
+                    truncated_content = truncated_content.rstrip()
                     
                     if truncated_content:
                         chunk_copy = chunk.copy()
@@ -55,4 +59,28 @@ class TokenCounter:
                         truncated.append(chunk_copy)
                 break
         
-        return truncated
\ No newline at end of file
+        return truncated
+    
+    def _count_candidates(self, chunks: List[Dict], available_tokens: int) -> List[int]:
+        """
+        Exact token counts of the leading chunks likely to be in the prompt, encoded in one batch.
+
+        The estimator only picks the candidates: chunks are taken while
+        their estimates fit, plus the first one that does not (it may be
+        truncated). The budget is always decided on exact counts; chunks
+        past the candidates are counted one by one if they are reached.
+        Memoized counts, e.g. from chunking, are reused.
+        """
+        if self.estimator is None:
+            return []
+        candidates, estimated = 0, 0.0
+        for chunk in chunks:
+            candidates += 1
+            tokens = self.tokenizer.cached_count(chunk['content'])
+            if tokens is None:
+                extension = chunk.get('metadata', {}).get('file_extension', '')
+                tokens = self.estimator.estimate(chunk['content'], extension)
+            estimated += tokens
+            if estimated > available_tokens:
+                break
+        return self.tokenizer.count_batch([chunk['content'] for chunk in chunks[:candidates]])
@@ -0,0 +1,127 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional
+import tiktoken
+from tiktoken.model import encoding_name_for_model
+from github_rag.utils.config import get_tokenizer_config
+
+
+class Tokenizer:
+    """Process-wide wrapper around a tiktoken encoding with memoized token counts.
+
+    Counts are kept in a bounded LRU keyed by (hash, length) of the text, so
+    a chunk counted while chunking is not re-encoded by validation or
+    prompt building. Text is always encoded as ordinary text; strings that
+    look like special tokens are counted, never rejected.
+    """
+
+    def __init__(self, encoding_name: str, cache_size: int = 65536):
+        """
+        Load an encoding.
+
+        Args:
+            encoding_name: tiktoken encoding, e.g. "cl100k_base"
+            cache_size: Maximum number of memoized token counts
+        """
+        self.encoding_name = encoding_name
+        self.encoder = tiktoken.get_encoding(encoding_name)
+        self.cache_size = cache_size
+        self._counts: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._token_lengths: Optional[List[int]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text: str) -> tuple:
+        return hash(text), len(text)
+
+    def _lookup(self, key: tuple) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._counts.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def _remember(self, key: tuple, count: int) -> None:
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+
+    def encode(self, text: str) -> List[int]:
+        """Encode text, remembering its token count."""
+        tokens = self.encoder.encode_ordinary(text)
+        self._remember(self._key(text), len(tokens))
+        return tokens
+
+    def decode(self, tokens: List[int]) -> str:
+        """Decode tokens back to text."""
+        return self.encoder.decode(tokens)
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text (memoized)."""
+        key = self._key(text)
+        count = self._lookup(key)
+        if count is None:
+            count = len(self.encoder.encode_ordinary(text))
+            self._remember(key, count)
+        return count
+
+    def cached_count(self, text: str) -> Optional[int]:
+        """Memoized token count of text, or None if it has not been counted."""
+        return self._lookup(self._key(text))
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts; cache misses are encoded together with encode_batch."""
+        keys = [self._key(text) for text in texts]
+        counts = [self._lookup(key) for key in keys]
+        missing = [i for i, count in enumerate(counts) if count is None]
+        if missing:
+            encoded = self.encoder.encode_ordinary_batch([texts[i] for i in missing])
+            for i, tokens in zip(missing, encoded):
+                counts[i] = len(tokens)
+                self._remember(keys[i], counts[i])
+        return counts
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text that fits in max_tokens tokens."""
+        tokens = self.encoder.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoder.decode(tokens[:max(max_tokens, 0)])
+
+    def token_byte_lengths(self) -> List[int]:
+        """Byte length of every token id, built once per process."""
+        if self._token_lengths is None:
+            lengths = []
+            for token in range(self.encoder.n_vocab):
+                try:
+                    lengths.append(len(self.encoder.decode_single_token_bytes(token)))
+                except KeyError:
+                    lengths.append(0)  # Unused id between the ranks and the special tokens
+            self._token_lengths = lengths
+        return self._token_lengths
+
+
+@lru_cache(maxsize=None)
+def _load_tokenizer(encoding_name: str) -> Tokenizer:
+    return Tokenizer(encoding_name, cache_size=get_tokenizer_config().get("count_cache_size", 65536))
+
+
+def get_tokenizer(encoding_name: Optional[str] = None) -> Tokenizer:
+    """Shared Tokenizer for an encoding (default: [tokenizer] encoding), loaded once per process."""
+    return _load_tokenizer(encoding_name or get_tokenizer_config().get("encoding", "cl100k_base"))
+
+
+def get_tokenizer_for_model(model: str) -> Tokenizer:
+    """Shared Tokenizer for the encoding an OpenAI model uses."""
+    try:
+        return get_tokenizer(encoding_name_for_model(model))
+    except KeyError:
+        return get_tokenizer()
@@ -15,11 +15,26 @@ class UsageTracker:
         self.input_cost = 0.15      # gpt-4o-mini input
         self.output_cost = 0.60     # gpt-4o-mini output
     
+    def embedding_cost_usd(self, num_tokens):
+        """Cost of embedding num_tokens tokens."""
+        return (num_tokens / 1_000_000) * self.embedding_cost
+    
     def log_embedding(self, num_tokens):
         """Log embedding tokens."""
-        cost = (num_tokens / 1_000_000) * self.embedding_cost
+        cost = self.embedding_cost_usd(num_tokens)
         self._save_log("embedding", num_tokens, cost)
     
+    def log_embedding_cache(self, hits, misses, tokens_saved):
+        """Log embedding cache lookups and the tokens (and cost) hits saved."""
+        if hits + misses == 0:
+            return
+        self._save_log("embedding_cache", 0, 0.0, {
+            "hits": hits,
+            "misses": misses,
+            "tokens_saved": tokens_saved,
+            "cost_saved_usd": round(self.embedding_cost_usd(tokens_saved), 6)
+        })
+    
     def log_llm_call(self, input_tokens, output_tokens):
         """Log LLM tokens."""
         input_cost = (input_tokens / 1_000_000) * self.input_cost
@@ -67,10 +82,17 @@ class UsageTracker:
         today = datetime.now().date().isoformat()
         
         today_logs = [log for log in logs if log['timestamp'].startswith(today)]
+        cache_logs = [l for l in today_logs if l['operation'] == 'embedding_cache']
+        cache_hits = sum(l['hits'] for l in cache_logs)
+        cache_lookups = cache_hits + sum(l['misses'] for l in cache_logs)
         
         return {
             "total_tokens": sum(log['tokens'] for log in today_logs),
             "total_cost": sum(log['cost_usd'] for log in today_logs),
             "embedding_calls": len([l for l in today_logs if l['operation'] == 'embedding']),
-            "llm_calls": len([l for l in today_logs if l['operation'] == 'llm'])
+            "llm_calls": len([l for l in today_logs if l['operation'] == 'llm']),
+            "cache_hits": cache_hits,
+            "cache_hit_rate": cache_hits / cache_lookups if cache_lookups else 0.0,
+            "tokens_saved": sum(l['tokens_saved'] for l in cache_logs),
+            "cost_saved": sum(l['cost_saved_usd'] for l in cache_logs)
         }
\ No newline at end of file
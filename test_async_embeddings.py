@@ -0,0 +1,120 @@
+import base64
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from openai import OpenAI
+from github_rag.rag.embeddings import EmbeddingGenerator
+
+
+def fake_vector(text):
+    """Deterministic 3-dimensional "embedding" of a text."""
+    return [float(len(text)), float(sum(map(ord, text)) % 997), 1.0]
+
+
+class FakeEmbeddingsServer(ThreadingHTTPServer):
+    """Local stand-in for POST /v1/embeddings with slow, out-of-order and failing requests."""
+
+    def __init__(self, fail_requests):
+        super().__init__(("127.0.0.1", 0), FakeEmbeddingsHandler)
+        self.fail_requests = dict(fail_requests)  # request number -> (status, headers)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class FakeEmbeddingsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, headers=()):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            number = server.requests
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(random.uniform(0.01, 0.05))  # Completion order differs from send order
+            if number in server.fail_requests:
+                status, headers = server.fail_requests[number]
+                self._reply(status, {"error": {"message": "try again", "type": "server_error"}}, headers)
+                return
+
+            data = []
+            for index, text in enumerate(body["input"]):
+                vector = fake_vector(text)
+                if body.get("encoding_format") == "base64":
+                    vector = base64.b64encode(array('f', vector).tobytes()).decode()
+                data.append({"object": "embedding", "index": index, "embedding": vector})
+            random.shuffle(data)
+            tokens = sum(len(text.split()) for text in body["input"])
+            self._reply(200, {
+                "object": "list", "data": data, "model": body["model"],
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+def test_async_embeddings():
+    """Test concurrent embedding requests with retries against a local fake server."""
+    print("Testing async embeddings against a local fake server")
+    print("=" * 60)
+
+    # Request 2 is rate limited with Retry-After, request 4 fails with a 503
+    server = FakeEmbeddingsServer({2: (429, [("Retry-After", "0.2")]), 4: (503, [])})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.setdefault("OPENAI_API_KEY", "test-key")
+    with tempfile.TemporaryDirectory() as directory:
+        generator = EmbeddingGenerator()
+        backend = generator.backend
+        backend.base_url = server.base_url
+        backend.client = OpenAI(api_key="test-key", base_url=server.base_url, max_retries=0)
+        generator.cache = None
+        generator.tracker.log_file = Path(directory) / "usage_log.json"
+        backend.max_request_items = 10
+        backend.retry_base_delay = 0.01
+
+        texts = [f"chunk number {i} " * (i % 7 + 1) for i in range(95)]
+        progress = []
+        started = time.perf_counter()
+        vectors = generator.generate_embeddings_batch(texts, [10] * len(texts), lambda done, total: progress.append(done))
+        elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    print(f"  {len(texts)} texts in {elapsed:.2f}s: {server.requests} requests "
+          f"(10 batches + 2 retries), at most {server.max_in_flight} in flight")
+    assert [v[:2] for v in vectors] == [fake_vector(t)[:2] for t in texts]  # Re-stitched in input order
+    assert server.requests == 12
+    assert 1 < server.max_in_flight <= backend.max_concurrent_requests
+    assert progress[-1] == len(texts)
+    assert elapsed >= 0.2  # The rate-limited batch waited for Retry-After
+    print("✅ Results in order; 429 and 503 retried; concurrency bounded")
+
+
+if __name__ == "__main__":
+    test_async_embeddings()
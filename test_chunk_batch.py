@@ -0,0 +1,47 @@
+from github_rag.ingestion.chunk_batch import ChunkBatch
+
+
+def make_chunks():
+    chunks = []
+    for f in range(3):
+        file_metadata = {'file_path': f"src/mod_{f}.py", 'file_name': f"mod_{f}.py", 'file_extension': "py", 'file_sha': f"sha{f}"}
+        for i in range(4):
+            metadata = {**file_metadata, 'chunk_index': i, 'start_line': i * 10, 'end_line': i * 10 + 9, 'token_count': 100 + i}
+            chunks.append({'content': f"body {f}.{i}", 'metadata': metadata})
+    chunks[5]['metadata']['duplicate_locations'] = "src/mod_1.py:10-19, src/mod_2.py:10-19"
+    return chunks
+
+
+def test_chunk_batch():
+    """Test that a ChunkBatch round-trips chunk dicts and exposes read-only views."""
+    print("Testing compact chunk storage")
+    print("=" * 60)
+
+    chunks = make_chunks()
+    batch = ChunkBatch(chunks)
+    assert len(batch) == len(chunks) and len(batch.files) == 3
+    assert batch.to_dicts() == chunks
+    assert list(batch.token_count) == [c['metadata']['token_count'] for c in chunks]
+    assert batch[-1]['content'] == "body 2.3" and batch[5]['metadata']['duplicate_locations']
+    assert [v['content'] for v in batch.select([5, 0])] == ["body 1.1", "body 0.0"]
+    assert batch.select([5])[0]['metadata']['duplicate_locations'] == chunks[5]['metadata']['duplicate_locations']
+    print("✅ Chunks round-trip through the columns, per-chunk extras included\n")
+
+    view = batch[0]
+    try:
+        view['metadata']['token_count'] = 1
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("view metadata accepted a write that would be lost")
+    assert dict(view['metadata']) == chunks[0]['metadata']
+    assert {**view['metadata'], 'extra': 1}['extra'] == 1
+
+    copy = view.copy()
+    copy['metadata']['token_count'] = 1
+    assert batch[0]['metadata']['token_count'] == 100  # The copy is independent of the batch
+    print("✅ View metadata is read-only; copy() gives a mutable, independent dict")
+
+
+if __name__ == "__main__":
+    test_chunk_batch()
@@ -0,0 +1,107 @@
+import ast
+from github_rag.ingestion.chunker import Chunker
+
+
+def small_chunker(chunk_size=50, chunk_overlap=10):
+    chunker = Chunker()
+    chunker.chunk_size = chunk_size
+    chunker.chunk_overlap = chunk_overlap
+    chunker.estimator = None  # Always go through the layout, never the single-chunk shortcut
+    return chunker
+
+
+def test_long_line_characters():
+    """Test that cutting an over-long line on token boundaries keeps every multi-byte character."""
+    print("Testing long line splitting with multi-byte characters")
+    print("=" * 60)
+
+    chunker = small_chunker()
+    metadata = {'file_path': "docs/notes.md", 'file_extension': "md"}
+    line = "".join("日本語のテキスト🙂émoji" for _ in range(40))
+    content = f"# Notes\n{line}\nend"
+
+    for name, chunks in (
+        ("split_document", chunker.split_document(content, metadata)),
+        ("split_stream", list(chunker.split_stream(content.split('\n'), metadata))),
+    ):
+        pieces = [c['content'] for c in chunks if c['metadata']['start_line'] == 1 == c['metadata']['end_line']]
+        print(f"  {name}: {len(pieces)} pieces of the long line")
+        assert len(pieces) > 1
+        assert "".join(pieces) == line
+        assert all(c['metadata']['token_count'] <= chunker.chunk_size for c in chunks)
+    print("✅ Pieces rejoin to the original line, each within chunk_size")
+
+
+
+def python_module():
+    """Small functions around a class too large for one chunk."""
+    parts = ["import os\n"]
+    for i in range(6):
+        parts.append(f"def helper_{i}(path):\n    \"\"\"Helper {i}.\"\"\"\n    return os.path.join(path, 'part_{i}')\n")
+    methods = "".join(
+        f"    def method_{i}(self, value):\n        total = value * {i}\n        return total + self.offset\n\n"
+        for i in range(12)
+    )
+    parts.append(f"class Service:\n    offset = 1\n\n{methods}")
+    parts.append("def main():\n    return Service().method_0(1)\n")
+    return "\n\n".join(parts)
+
+
+def test_python_blocks():
+    """Test that Python files are chunked on function and class boundaries."""
+    print("Testing Python structure-aware chunking")
+    print("=" * 60)
+
+    chunker = small_chunker(chunk_size=80)
+    content = python_module()
+    metadata = {'file_path': "src/service.py", 'file_extension': "py"}
+    chunks = chunker.split_document(content, metadata)
+    for chunk in chunks:
+        m = chunk['metadata']
+        print(f"  chunk {m['chunk_index']}: lines {m['start_line']}-{m['end_line']} ({m['token_count']} tokens)")
+
+    # Every function and method is whole in some chunk
+    tree = ast.parse(content)
+    functions = [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
+    for node in functions:
+        start, end = node.lineno - 1, node.end_lineno - 1
+        assert any(c['metadata']['start_line'] <= start and end <= c['metadata']['end_line'] for c in chunks), node.name
+    assert all(c['metadata']['token_count'] <= chunker.chunk_size for c in chunks)
+    covered = set()
+    for c in chunks:
+        covered.update(range(c['metadata']['start_line'], c['metadata']['end_line'] + 1))
+    assert covered == set(range(content.count('\n') + 1))
+    print(f"✅ {len(functions)} functions and methods kept whole; every line covered\n")
+
+    service = next(node for node in tree.body if isinstance(node, ast.ClassDef))
+    inside = [c for c in chunks if service.lineno - 1 <= c['metadata']['start_line'] <= service.end_lineno - 1]
+    assert len(inside) > 1  # The class is opened into its methods
+    print(f"✅ Oversized class split between its methods ({len(inside)} chunks)\n")
+
+    # A small class that does not fit after load() starts the next chunk whole
+    content = (
+        "def load(path):\n    with open(path) as handle:\n        return handle.read()\n\n\n"
+        "class Point:\n    x = 1\n\n    def norm(self):\n        return self.x * 2\n"
+    )
+    chunks = chunker.split_document(content, metadata)
+    spans = [(c['metadata']['start_line'], c['metadata']['end_line']) for c in chunks]
+    print(f"  load() and Point: {spans}")
+    assert spans == [(0, 2), (3, 10)]
+    print("✅ Classes that fit in a chunk are not opened up\n")
+
+    # Small functions after an oversized one fill its last line window
+    body = "".join(f"    total += values[{i}] * {i}\n" for i in range(40))
+    content = f"def weigh(values):\n    total = 0\n{body}    return total\n\n\ndef one():\n    return 1\n"
+    chunks = chunker.split_document(content, metadata)
+    spans = [(c['metadata']['start_line'], c['metadata']['end_line']) for c in chunks]
+    print(f"  weigh() and one(): {spans}")
+    one = content.split("\n").index("def one():")
+    assert spans[-1][0] < one - 2 and spans[-1][1] == content.count("\n")
+    assert len(chunks) <= len(chunker.split_by_lines(content, metadata))
+    print("✅ The tail of an oversized function is packed with what follows")
+
+
+if __name__ == "__main__":
+    test_long_line_characters()
+    print()
+    test_python_blocks()
@@ -0,0 +1,56 @@
+import random
+import threading
+import time
+from github_rag.ingestion.content_normalizer import ContentNormalizer
+from github_rag.ingestion.repo_tree import TreeEntry
+
+
+class SlowClient:
+    """Stand-in for GitHubClient whose downloads take a random time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_file_content(self, content_file):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(random.uniform(0.001, 0.02))
+            if content_file.path == "broken.py":
+                return None
+            return f"# {content_file.path}\n\n\n\n\nbody   \n"
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_concurrent_fetch():
+    """Test that files are fetched concurrently, boundedly, and returned in input order."""
+    print("Testing concurrent content fetch")
+    print("=" * 60)
+
+    client = SlowClient()
+    normalizer = ContentNormalizer(client)
+    normalizer.fetch_workers = 4
+    files = [TreeEntry(f"src/file_{i}.py", "file", size=100, sha=str(i)) for i in range(40)]
+    files.insert(7, TreeEntry("broken.py", "file", size=100, sha="x"))
+
+    progress = []
+    started = time.perf_counter()
+    results = normalizer.process_files(files, lambda done, total, f: progress.append((done, f.path)))
+    elapsed = time.perf_counter() - started
+
+    print(f"  {len(files)} files in {elapsed:.2f}s, at most {client.max_in_flight} downloads at once")
+    assert results[7] is None
+    assert [r['metadata']['file_path'] for r in results if r] == [f.path for f in files if f.path != "broken.py"]
+    assert results[0]['content'] == "# src/file_0.py\n\n\nbody"  # Normalized
+    assert 1 < client.max_in_flight <= normalizer.fetch_workers
+    assert progress == [(i + 1, f.path) for i, f in enumerate(files)]
+    print("✅ Results in input order, failures as None, concurrency bounded")
+
+
+if __name__ == "__main__":
+    test_concurrent_fetch()
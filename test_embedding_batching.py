@@ -0,0 +1,27 @@
+from github_rag.rag.embeddings import combine_embeddings, pack_batches
+
+
+def test_embedding_batching():
+    """Test that embedding inputs are packed by tokens and items, in order."""
+    print("Testing embedding request packing")
+    print("=" * 60)
+
+    counts = [300, 300, 300, 900, 100, 100, 1000, 50]
+    batches = pack_batches(counts, max_tokens=1000, max_items=3)
+    for batch in batches:
+        print(f"  inputs {list(batch)}: {sum(counts[i] for i in batch)} tokens")
+
+    assert [list(b) for b in batches] == [[0, 1, 2], [3, 4], [5], [6], [7]]
+    assert [i for b in batches for i in b] == list(range(len(counts)))  # Order kept, nothing dropped
+    assert all(sum(counts[i] for i in b) <= 1000 and len(b) <= 3 for b in batches)
+    assert pack_batches([], 1000, 3) == []
+    print("✅ Requests filled up to the token and item limits, in input order\n")
+
+    combined = combine_embeddings([[1.0, 0.0], [0.0, 1.0]], [3, 1])
+    print(f"  combined: {combined}")
+    assert abs(combined[0] - 0.9486833) < 1e-6 and abs(combined[1] - 0.3162278) < 1e-6
+    print("✅ Pieces of an oversized input averaged by length and normalized")
+
+
+if __name__ == "__main__":
+    test_embedding_batching()
@@ -0,0 +1,33 @@
+import tempfile
+from github_rag.utils.embedding_cache import EmbeddingCache, text_hash
+
+
+def test_embedding_cache():
+    """Test that cached vectors are keyed by model and dimensions and evicted by size."""
+    print("Testing embedding cache")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EmbeddingCache(directory, max_size_mb=0.05)
+        keys = [text_hash(f"chunk {i}") for i in range(3)]
+        cache.put_many("text-embedding-3-small", 0, [(key, [0.25, -0.5, 1.0], 7) for key in keys[:2]])
+
+        found = cache.get_many("text-embedding-3-small", 0, keys)
+        assert sorted(found) == sorted(keys[:2])
+        assert found[keys[0]] == ([0.25, -0.5, 1.0], 7)
+        assert cache.get_many("text-embedding-3-large", 0, keys) == {}
+        assert cache.get_many("text-embedding-3-small", 256, keys) == {}
+        print(f"  {cache.stats()}")
+        assert cache.stats()['hits'] == 2 and cache.stats()['tokens_saved'] == 14
+        print("✅ Hits only for the same model and dimensions; tokens saved counted\n")
+
+        # ~6 KB per 1536-dimension vector against a 50 KB budget
+        cache.put_many("m", 0, [(text_hash(str(i)), [0.1] * 1536, 10) for i in range(20)])
+        print(f"  {len(cache)} rows, {cache.size_bytes} bytes after eviction")
+        assert cache.size_bytes <= cache.max_size_bytes and len(cache) < 20
+        assert text_hash("19") in cache.get_many("m", 0, [text_hash("19")])  # Newest kept
+        print("✅ Least recently used vectors evicted to stay within the size budget")
+
+
+if __name__ == "__main__":
+    test_embedding_cache()
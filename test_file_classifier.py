@@ -0,0 +1,56 @@
+import tempfile
+from types import SimpleNamespace
+from github_rag.ingestion.file_classifier import FileClassifier
+from github_rag.ingestion.repo_tree import TreeEntry
+from github_rag.utils.blob_cache import BlobCache
+
+GITATTRIBUTES = {
+    ".gitattributes": "*.snap linguist-generated\nsrc/generated/** -linguist-generated\n",
+    "web/.gitattributes": "legacy/** linguist-vendored=true\n",
+}
+
+
+def test_file_classifier():
+    """Test that binary, generated, vendored and data files are skipped before download."""
+    print("Testing file classifier")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        blob_cache = BlobCache(directory)
+        blob_cache.put("nul", b"\x00\x01\x02 not text")
+        blob_cache.put("banner", b"// Code generated by protoc-gen-go. DO NOT EDIT.\npackage api\n")
+        client = SimpleNamespace(blob_cache=blob_cache, get_file_content=lambda entry: GITATTRIBUTES[entry.path])
+        classifier = FileClassifier(client)
+        classifier.load_gitattributes([TreeEntry(path, "file", size=40) for path in GITATTRIBUTES])
+
+        big = 10 * 1024 * 1024
+        cases = {
+            ("src/app.py", 900, None): None,
+            ("assets/logo.png", 900, None): "binary",
+            ("src/empty.py", 0, None): "empty",
+            ("package-lock.json", 900, None): "lockfile",
+            ("web/app.min.js", 900, None): "minified",
+            ("api/service_pb2.py", 900, None): "generated",
+            ("src/generated/models.py", 900, None): None,     # .gitattributes overrides the heuristic
+            ("tests/ui.snap", 900, None): "generated",        # ...and adds its own markers
+            ("third_party/lib/x.py", 900, None): "vendored",
+            ("web/legacy/old.js", 900, None): "vendored",     # Nested .gitattributes, scoped to web/
+            ("legacy/old.js", 900, None): None,
+            ("data/dump.json", big, None): "data",
+            ("notebooks/analysis.ipynb", big, None): None,    # Not data: scanned cell by cell as it streams
+            ("docs/notes.txt", big, None): None,
+            ("src/blob.py", 900, "nul"): "binary",            # Sniffed from the blob cache
+            ("api/client.go", 900, "banner"): "generated",
+        }
+        for (path, size, sha), expected in cases.items():
+            reason = classifier.classify(TreeEntry(path, "file", size=size, sha=sha))
+            print(f"  {reason or 'keep':9} {path}")
+            assert reason == expected, path
+
+        kept, skipped = classifier.filter_entries(TreeEntry(p, "file", size=s, sha=h) for p, s, h in cases)
+        assert len(kept) == sum(1 for reason in cases.values() if reason is None)
+        print("✅ Useless files skipped from path, size, .gitattributes and cached content")
+
+
+if __name__ == "__main__":
+    test_file_classifier()
@@ -0,0 +1,49 @@
+from github_rag.ingestion.file_filter import FileFilter, PathMatcher
+from github_rag.ingestion.repo_tree import TreeEntry
+
+
+def test_file_filter():
+    """Test gitignore-style exclude patterns and bulk filtering."""
+    print("Testing file filter patterns")
+    print("=" * 60)
+
+    file_filter = FileFilter(["build", ".git", "docs/generated", "*.min.js", "tests/**/fixtures", "cache/", "!keep.py"])
+    cases = {
+        "build/out.py": True,              # Directory named "build"
+        "src/build/out.py": True,          # ...at any depth
+        "src/rebuild.py": False,           # Names match whole segments only
+        "build.py": False,
+        ".git/config.py": True,
+        ".github/workflows/ci.py": False,  # ".git" is not a prefix match
+        "docs/generated/api.md": True,     # Patterns with a slash are anchored
+        "src/docs/generated/api.md": False,
+        "web/app.min.js": True,
+        "web/app.js": False,
+        "tests/unit/fixtures/data.py": True,
+        "tests/fixtures/data.py": True,    # "**/" also matches no directories
+        "cache/index.py": True,            # Trailing slash: directories only
+        "src/cache": False,
+        "keep.py": False,
+        "build/keep.py": True,             # Not re-included under an excluded directory
+    }
+    for path, excluded in cases.items():
+        result = file_filter.is_excluded_path(path)
+        print(f"  {'excluded' if result else 'kept    '} {path}")
+        assert result == excluded, path
+
+    keep = FileFilter(["*.py", "!keep.py"])
+    assert keep.is_excluded_path("src/other.py") and not keep.is_excluded_path("src/keep.py")
+    assert PathMatcher(["/build"]).matches("build", "build", is_dir=True)
+    assert not PathMatcher(["/build"]).matches("src/build", "build", is_dir=True)
+    print("✅ Segment, anchored, directory-only, ** and ! patterns follow gitignore\n")
+
+    entries = [TreeEntry(path, "file", size=10) for path in cases] + [TreeEntry("src", "dir")]
+    included, rejected = file_filter.filter_entries(entries, extensions=[".py", ".md", ".js"])
+    assert [e.path for e in included] == [p for p, excluded in cases.items() if not excluded and p != "src/cache"]
+    assert all(file_filter.rejection_reason(e, [".py", ".md", ".js"]) == reason for e, reason in rejected)
+    print(f"  bulk: {len(included)} included, {len(rejected)} rejected")
+    print("✅ Bulk filtering agrees with per-file checks")
+
+
+if __name__ == "__main__":
+    test_file_filter()
@@ -0,0 +1,72 @@
+import json
+import tempfile
+import threading
+from types import SimpleNamespace
+from github_rag.utils import http_cache
+from github_rag.utils.blob_cache import BlobCache
+from github_rag.utils.http_cache import ETagCache, conditional_get
+
+
+class FakeRequester:
+    """Answers with an ETag per token, and 304 when If-None-Match matches it."""
+
+    def __init__(self, token):
+        self.auth = SimpleNamespace(token=token)
+        self.statuses = []
+
+    def requestJson(self, verb, url, parameters=None, headers=None):
+        etag = f'"{self.auth.token}"'
+        status = 304 if headers and headers.get("If-None-Match") == etag else 200
+        self.statuses.append(status)
+        return status, {"etag": etag}, "" if status == 304 else json.dumps({"seen_by": self.auth.token})
+
+
+def test_http_cache():
+    """Test ETag revalidation per credential, the cache size bound, and concurrent blob cache use."""
+    print("Testing ETag and blob caches")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ETagCache(directory)
+        get_etag_cache, http_cache.get_etag_cache = http_cache.get_etag_cache, lambda: cache
+        try:
+            alice, bob = FakeRequester("alice"), FakeRequester("bob")
+            assert conditional_get(alice, "/repos/o/r")[0] == {"seen_by": "alice"}
+            assert conditional_get(alice, "/repos/o/r")[0] == {"seen_by": "alice"}
+            assert conditional_get(bob, "/repos/o/r")[0] == {"seen_by": "bob"}
+            print(f"  alice: {alice.statuses}, bob: {bob.statuses}")
+            assert alice.statuses == [200, 304] and bob.statuses == [200]
+            print("✅ Revalidated with 304; responses never shared across tokens\n")
+        finally:
+            http_cache.get_etag_cache = get_etag_cache
+
+        small = ETagCache(directory + "/small", max_size_mb=0.01)
+        threads = [
+            threading.Thread(target=lambda i=i: small.put(f"key {i % 4}", "url", "etag", "x" * 1000))
+            for i in range(40)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for i in range(20):
+            small.put(f"other {i}", "url", "etag", "y" * 1000)
+        files = list(small.directory.iterdir())
+        print(f"  {len(files)} entries, {small.size_bytes} bytes")
+        assert all(f.suffix == ".json" for f in files)  # No temporary files left behind
+        assert small.size_bytes <= small.max_size_bytes
+        assert small.get("other 19")["data"] == "y" * 1000
+        print("✅ Concurrent writes to one key are safe; size bounded by LRU eviction\n")
+
+        blobs = BlobCache(directory, max_size_mb=1)
+        blobs.put("ab" * 20, b"content")
+        path = blobs._path("ab" * 20)
+        with blobs.open("ab" * 20) as f:
+            assert f.read() == b"content"
+        path.unlink()  # Evicted by another thread
+        assert blobs.get("ab" * 20) is None and blobs.open("ab" * 20) is None
+        print("✅ Blob evicted between lookups is a miss, not an error")
+
+
+if __name__ == "__main__":
+    test_http_cache()
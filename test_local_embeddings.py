@@ -0,0 +1,39 @@
+import math
+from github_rag.rag.embeddings import EmbeddingGenerator, get_embedding_backend
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_local_embeddings():
+    """Test the NumPy hashing backend: deterministic, normalized, similarity-preserving, offline."""
+    print("Testing local hashing embeddings")
+    print("=" * 60)
+
+    backend = get_embedding_backend("local-hashing", 256)
+    generator = EmbeddingGenerator(backend=backend)  # No OPENAI_API_KEY or network needed
+
+    texts = [
+        "def acquire_token(self):\n    with self.rate_limiter:\n        return self.bucket.take()",
+        "class RateLimiter:\n    def acquire(self):\n        self.tokens -= 1",
+        "## Installation\n\nRun pip install -r requirements.txt to install the dependencies.",
+        "",
+    ]
+    vectors = generator.generate_embeddings_batch(texts)
+    again = generator.generate_embeddings_batch(texts[:1])
+
+    assert all(len(v) == 256 for v in vectors)
+    assert all(abs(math.sqrt(cosine(v, v)) - 1) < 1e-5 for v in vectors)  # Unit length, even for ""
+    assert again[0] == vectors[0]
+    print("✅ Deterministic unit-length vectors\n")
+
+    query = generator.generate_embedding("how does the rate limiter acquire tokens?")
+    scores = [cosine(query, v) for v in vectors[:3]]
+    print(f"  similarity to query: {[round(s, 3) for s in scores]}")
+    assert min(scores[0], scores[1]) > scores[2]
+    print("✅ Related code ranks above unrelated text")
+
+
+if __name__ == "__main__":
+    test_local_embeddings()
@@ -0,0 +1,108 @@
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+import git
+from github_rag.ingestion.local_source import LocalRepoClient, LocalRepository, git_blob_sha
+
+
+def hash_object(root, path):
+    """Blob SHA git itself assigns to a file on disk."""
+    return subprocess.run(["git", "hash-object", path], cwd=root, capture_output=True, text=True).stdout.strip()
+
+
+def test_local_source():
+    """Test that on-disk listings describe the working tree, with SHAs git agrees with."""
+    print("Testing on-disk ingestion source")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        (root / "src").mkdir()
+        (root / "src/app.py").write_text("print('committed')\n")
+        (root / "src/old.py").write_text("x = 1\n")
+        (root / "README.md").write_text("# Demo\n")
+        (root / ".gitignore").write_text("*.log\n")
+        git_repo = git.Repo.init(root)
+        git_repo.index.add(["src/app.py", "src/old.py", "README.md", ".gitignore"])
+        git_repo.index.commit("initial", author=git.Actor("t", "t@t"), committer=git.Actor("t", "t@t"))
+
+        (root / "src/app.py").write_text("print('edited, not committed')\n")  # Modified
+        (root / "src/old.py").unlink()                                        # Deleted
+        (root / "docs").mkdir()
+        (root / "docs/new.md").write_text("untracked\n")                      # Untracked
+        (root / "debug.log").write_text("ignored\n")                          # Ignored
+
+        repo = LocalRepository(root, "demo")
+        entries = repo.list_entries()
+        for entry in entries:
+            print(f"  {entry.type:4} {entry.path} {entry.sha or ''}")
+
+        files = {e.path: e for e in entries if e.type == "file"}
+        assert sorted(files) == [".gitignore", "README.md", "docs/new.md", "src/app.py"]
+        assert sorted(e.path for e in entries if e.type == "dir") == ["docs", "src"]
+        for path, entry in files.items():
+            assert entry.sha == hash_object(root, path), path
+            assert entry.size == (root / path).stat().st_size
+        assert files["src/app.py"].decoded_content == b"print('edited, not committed')\n"
+        print("✅ Local edits and untracked files listed under their working-tree SHAs\n")
+
+        plain = LocalRepository(root / "docs", "docs")
+        first = plain.list_entries()
+        assert first[0].sha == git_blob_sha(root / "docs/new.md")
+        assert plain.list_entries()[0] is first[0]  # Listing kept until refreshed
+        (root / "docs/new.md").write_text("changed on disk\n")
+        assert plain.list_entries(refresh=True)[0].sha == hash_object(root, "docs/new.md")
+        print("✅ Plain directories hashed once; refresh picks up changes")
+
+
+
+def test_checkout_boundaries():
+    """Test that symlinks cannot pull files from outside a checkout, and clones keep no token."""
+    print("Testing checkout boundaries")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        outside = Path(directory) / "home"
+        outside.mkdir()
+        (outside / "id_rsa").write_text("PRIVATE KEY\n")
+        root = Path(directory) / "repo"
+        root.mkdir()
+        (root / "app.py").write_text("print('hi')\n")
+        (root / "key").symlink_to(outside / "id_rsa")    # Committed symlink
+        (root / "dir").symlink_to(outside)                # Untracked directory symlink
+        git_repo = git.Repo.init(root)
+        git_repo.index.add(["app.py", "key"])
+        git_repo.index.commit("initial", author=git.Actor("t", "t@t"), committer=git.Actor("t", "t@t"))
+
+        repo = LocalRepository(root, "demo")
+        assert [e.path for e in repo.list_entries() if e.type == "file"] == ["app.py"]
+        escaped = repo._file_entry("dir/id_rsa", 12, "0" * 40)
+        try:
+            escaped.decoded_content
+            raise AssertionError("read a file outside the checkout")
+        except ValueError:
+            pass
+        print("✅ Symlinks skipped; paths resolving outside the checkout refused\n")
+
+        remote = Path(directory) / "demo.git"
+        git.Repo.clone_from(root, remote, bare=True)
+        os.environ["GITHUB_TOKEN"] = "ghp_secret"
+        try:
+            client = LocalRepoClient(mode="clone")
+        finally:
+            del os.environ["GITHUB_TOKEN"]
+        assert "Authorization: Basic" in client._git_auth_env()["GIT_CONFIG_VALUE_0"]
+        target = Path(directory) / "checkout"
+        sha = client._shallow_clone(str(remote)[:-len(".git")], target)
+        assert sha == git_repo.head.commit.hexsha
+        assert client._shallow_clone(str(remote)[:-len(".git")], target) == sha  # Refresh by fetch
+        config = (target / ".git" / "config").read_text()
+        assert "ghp_secret" not in config and str(remote) in config
+        print("✅ Clone and fetch authenticate without storing the token")
+
+
+if __name__ == "__main__":
+    test_local_source()
+    print()
+    test_checkout_boundaries()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+from github_rag.ingestion.deduplicator import ChunkDeduplicator
+from github_rag.ingestion.manifest import IngestionManifest
+from github_rag.ingestion.repo_tree import TreeEntry
+from github_rag.rag.vector_store import get_chunk_id
+
+
+def file_metadata(path, sha):
+    return {'file_path': path, 'file_sha': sha}
+
+
+def chunk(path, sha, index):
+    return {'content': f"{path} {index}", 'metadata': dict(file_metadata(path, sha), chunk_index=index)}
+
+
+def test_manifest():
+    """Test incremental sync plans, including files that produced no chunks."""
+    print("Testing ingestion manifest")
+    print("=" * 60)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # [ingestion] manifest_directory is relative
+        try:
+            manifest = IngestionManifest("octo/demo", "collection")
+            files = [TreeEntry("a.py", "file", sha="a1"), TreeEntry("b.py", "file", sha="b1"),
+                     TreeEntry("empty.py", "file", sha="e1"), TreeEntry("gone.py", "file", sha="g1")]
+            plan = manifest.plan(files)
+            assert [f.path for f in manifest.files_to_ingest(plan)] == ["a.py", "b.py", "empty.py", "gone.py"]
+
+            # empty.py was processed but yielded no chunks
+            chunks = [chunk("a.py", "a1", 0), chunk("a.py", "a1", 1), chunk("b.py", "b1", 0), chunk("gone.py", "g1", 0)]
+            manifest.apply(plan, chunks, [file_metadata(f.path, f.sha) for f in files])
+            manifest.save()
+            assert manifest.files["empty.py"] == {'sha': "e1", 'chunk_ids': []}
+            print("✅ Files without chunks recorded by blob SHA\n")
+
+            manifest = IngestionManifest("octo/demo", "collection")
+            files = [TreeEntry("a.py", "file", sha="a1"), TreeEntry("b.py", "file", sha="b2"),
+                     TreeEntry("empty.py", "file", sha="e1"), TreeEntry("new.py", "file", sha="n1")]
+            plan = manifest.plan(files)
+            summary = {key: [f if isinstance(f, str) else f.path for f in value] for key, value in plan.items()}
+            print(f"  {summary}")
+            assert summary == {'added': ["new.py"], 'modified': ["b.py"],
+                               'unchanged': ["a.py", "empty.py"], 'deleted': ["gone.py"]}
+            assert manifest.stale_chunk_ids(plan) == ["b.py_chunk_0", "gone.py_chunk_0"]
+
+            manifest.apply(plan, [chunk("b.py", "b2", 0)], [file_metadata("b.py", "b2"), file_metadata("new.py", "n1")])
+            assert manifest.files["b.py"] == {'sha': "b2", 'chunk_ids': ["b.py_chunk_0"]}
+            assert "gone.py" not in manifest.files and manifest.files["new.py"]['chunk_ids'] == []
+            assert len(IngestionManifest("octo/demo", "other collection")) == 0
+            manifest.discard_files([file_metadata("b.py", "b2")])  # Its stream failed part-way
+            assert "b.py" not in manifest.files and "b.py" in [f.path for f in manifest.plan(files)['added']]
+            print("✅ Only added and modified files re-ingested; stale chunk IDs removed")
+        finally:
+            os.chdir(cwd)
+
+
+
+def test_sync_after_merge():
+    """Test that merged copies are recorded under the stored chunk and re-ingested together."""
+    print("Testing incremental sync after merging duplicates")
+    print("=" * 60)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            # vendor/lib.py is a copy of lib.py; other.py has a chunk of its own
+            chunks = [chunk("lib.py", "l1", 0), chunk("other.py", "o1", 0), chunk("vendor/lib.py", "v1", 0)]
+            chunks[2]['content'] = chunks[0]['content']
+            for c in chunks:
+                c['metadata'].update(start_line=0, end_line=9)
+            deduplicator = ChunkDeduplicator()
+            embeddings = deduplicator.embed(chunks, lambda texts, counts: [[float(len(t))] for t in texts])
+            stored, _ = deduplicator.merge(chunks, embeddings)
+            stored_ids = {get_chunk_id(c) for c in stored}
+
+            manifest = IngestionManifest("octo/demo", "collection")
+            manifest.record_files([c['metadata'] for c in chunks])
+            manifest.record_chunks(chunks, list(deduplicator.group(chunks).values()))
+            manifest.save()
+            recorded = {path: entry['chunk_ids'] for path, entry in manifest.files.items()}
+            print(f"  stored {sorted(stored_ids)}, recorded {recorded}")
+            assert recorded == {"lib.py": ["lib.py_chunk_0"], "other.py": ["other.py_chunk_0"],
+                                "vendor/lib.py": ["lib.py_chunk_0"]}
+            assert all(chunk_id in stored_ids for ids in recorded.values() for chunk_id in ids)
+            print("✅ Only stored chunk IDs recorded; copies map to the stored chunk\n")
+
+            manifest = IngestionManifest("octo/demo", "collection")
+            files = [TreeEntry("lib.py", "file", sha="l2"), TreeEntry("other.py", "file", sha="o1"),
+                     TreeEntry("vendor/lib.py", "file", sha="v1")]
+            plan = manifest.plan(files)
+            assert [f.path for f in plan['modified']] == ["lib.py", "vendor/lib.py"]
+            assert [f.path for f in plan['unchanged']] == ["other.py"]
+            assert manifest.stale_chunk_ids(plan) == ["lib.py_chunk_0"]
+            print("✅ Changing one copy re-ingests every file that shared its stored chunk")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    test_manifest()
+    print()
+    test_sync_after_merge()
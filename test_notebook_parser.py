@@ -0,0 +1,114 @@
+import base64
+import json
+import os
+import random
+import time
+from types import SimpleNamespace
+from github_rag.ingestion.content_normalizer import ContentNormalizer
+from github_rag.ingestion.file_filter import FileFilter
+from github_rag.ingestion.notebook_parser import CELL_SEPARATOR, parse_notebook_cells, iter_notebook_cells
+from github_rag.ingestion.repo_tree import TreeEntry
+
+
+def build_notebook(num_cells: int = 40, image_bytes: int = 1_000_000) -> str:
+    """Build a notebook whose code cells carry large base64 image outputs."""
+    image = base64.b64encode(os.urandom(image_bytes)).decode()
+    cells = []
+    for i in range(num_cells):
+        cells.append({"cell_type": "markdown", "metadata": {}, "source": [f"# Step {i}\n", 'Uses "quotes" and \\ escapes']})
+        cells.append({
+            "cell_type": "code",
+            "execution_count": i,
+            "metadata": {"tags": ["]{ tricky"]},
+            "outputs": [{"output_type": "display_data", "data": {"image/png": image, "text/plain": ["<Figure>"]}, "metadata": {}}],
+            "source": f"x = {i}\nprint('{{[')"
+        })
+    return json.dumps({"cells": cells, "metadata": {"kernelspec": {"name": "python3"}}, "nbformat": 4, "nbformat_minor": 5}, indent=1)
+
+
+def test_notebook_parser():
+    """Test the streaming notebook parser against a full json.loads parse."""
+    notebook = build_notebook()
+    print(f"Testing notebook parser with a {len(notebook) / 1e6:.1f} MB notebook")
+    print("=" * 60)
+
+    # Every cell matches a full parse
+    expected = [
+        (cell["cell_type"], "".join(cell["source"]) if isinstance(cell["source"], list) else cell["source"])
+        for cell in json.loads(notebook)["cells"]
+    ]
+    assert list(iter_notebook_cells(notebook)) == expected
+    print(f"✅ Streamed {len(expected)} cells, identical to json.loads")
+
+    # First N code cells, stopping early
+    start = time.perf_counter()
+    code = parse_notebook_cells(notebook, max_cells=3, include_markdown=False)
+    elapsed = time.perf_counter() - start
+    assert code.count("# --- Next Cell ---") == 2
+    assert "x = 0" in code and "x = 2" in code and "x = 3" not in code
+    print(f"✅ First 3 code cells in {elapsed * 1000:.1f} ms")
+
+    # Markdown cells, in notebook order
+    mixed = parse_notebook_cells(notebook, max_cells=2, include_markdown=True, max_markdown_cells=1)
+    assert mixed.index("# Step 0") < mixed.index("x = 0")
+    assert "# Step 1" not in mixed
+    print("✅ Markdown cells included in order")
+
+    # Unlimited
+    everything = parse_notebook_cells(notebook, max_cells=0, include_markdown=True, max_markdown_cells=0)
+    assert everything.count("# --- Next Cell ---") == len(expected) - 1
+    print("✅ max_cells = 0 keeps every cell")
+
+    # Malformed notebooks fall back to regular normalization
+    assert parse_notebook_cells("{not json") is None
+    assert parse_notebook_cells('{"cells": []}') is None
+    print("✅ Malformed and empty notebooks return None")
+
+
+def split_pieces(text: str, max_piece: int):
+    """Cut text into pieces of random length, as a streamed download arrives."""
+    start = 0
+    while start < len(text):
+        end = start + random.randint(1, max_piece)
+        yield text[start:end]
+        start = end
+
+
+def test_streamed_notebook():
+    """Test that large notebooks are admitted and scanned as they are read."""
+    print("Testing streamed notebooks")
+    print("=" * 60)
+
+    small = build_notebook(num_cells=6, image_bytes=3000)
+    expected = list(iter_notebook_cells(small))
+    for max_piece in (1, 7, 500, 70000):
+        assert list(iter_notebook_cells(split_pieces(small, max_piece))) == expected, max_piece
+    assert parse_notebook_cells(split_pieces('{"cells": [{"cell_type": "code", "source": "x"', 3)) is None
+    print("✅ Cells parsed from pieces of any size match the whole-text parse")
+
+    notebook = build_notebook(num_cells=20)
+    entry = TreeEntry("notebooks/analysis.ipynb", "file", size=len(notebook))
+    assert FileFilter().rejection_reason(entry, [".ipynb"]) is None
+
+    read = []
+    def iter_file_content(content_file):
+        for piece in split_pieces(notebook, 65536):
+            read.append(len(piece))
+            yield piece
+
+    client = SimpleNamespace(iter_file_content=iter_file_content)
+    normalizer = ContentNormalizer(client)
+    fetched = normalizer.fetch_file(entry)
+    assert 'lines' in fetched
+    lines = list(fetched['lines'])
+    cells = parse_notebook_cells(notebook)
+    assert lines == normalizer.normalize_content(cells, entry.path).split('\n')
+    assert lines.count(CELL_SEPARATOR.strip()) == cells.count(CELL_SEPARATOR)
+    assert sum(read) < len(notebook) / 2
+    print(f"✅ {len(notebook) / 1e6:.0f} MB notebook admitted; read {sum(read) / 1e6:.1f} MB to extract its cells")
+
+
+if __name__ == "__main__":
+    test_notebook_parser()
+    print()
+    test_streamed_notebook()
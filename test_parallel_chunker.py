@@ -0,0 +1,47 @@
+from github_rag.ingestion.chunker import Chunker
+from github_rag.ingestion.content_normalizer import ContentNormalizer
+from github_rag.ingestion.parallel_chunker import ParallelChunker
+from github_rag.ingestion.repo_tree import TreeEntry
+
+
+def source(i):
+    return "".join(f"def function_{i}_{j}(x):\n    return x * {j}\n\n\n\n" for j in range(i % 40 + 1))
+
+
+class FakeClient:
+    def get_file_content(self, content_file):
+        return source(int(content_file.sha))
+
+    def iter_file_content(self, content_file, chunk_size=65536):
+        text = source(int(content_file.sha))
+        for i in range(0, len(text), 1000):
+            if content_file.path == "src/broken.py" and i:
+                raise ConnectionError("connection reset")
+            yield text[i:i + 1000]
+
+
+def test_parallel_chunker():
+    """Test that the process pool produces exactly the serial chunks, in file order."""
+    print("Testing parallel chunking")
+    print("=" * 60)
+
+    normalizer = ContentNormalizer(FakeClient())
+    normalizer.stream_threshold_bytes = 1000  # The longest files are streamed
+    files = [TreeEntry(f"src/module_{i}.py", "file", size=len(source(i)), sha=str(i)) for i in range(60)]
+    files.insert(30, TreeEntry("src/broken.py", "file", size=len(source(39)), sha="39"))  # Stream fails part-way
+
+    serial = ParallelChunker(normalizer, Chunker(), workers=1).chunk_files(files)
+    with ParallelChunker(normalizer, Chunker(), workers=2) as parallel_chunker:
+        parallel = parallel_chunker.chunk_files(files)
+
+    streamed = sum(1 for f in files if normalizer.should_stream(f))
+    print(f"  {len(parallel)} chunks from {len(files)} files ({streamed} streamed)")
+    assert streamed > 0
+    assert parallel.to_dicts() == serial.to_dicts()
+    assert [f['file_path'] for f in parallel.files] == [f.path for f in files if f.path != "src/broken.py"]
+    assert all(c['metadata']['file_path'] != "src/broken.py" for c in parallel)
+    print("✅ Process pool output identical to the serial path, in input order; truncated files dropped")
+
+
+if __name__ == "__main__":
+    test_parallel_chunker()
@@ -0,0 +1,132 @@
+import threading
+import time
+from github_rag.ingestion.chunker import Chunker
+from github_rag.ingestion.pipeline import IngestionPipeline
+from github_rag.rag.vector_store import get_chunk_id
+
+
+class FakeNormalizer:
+    """Yields small documents lazily, counting how far fetching has run ahead."""
+
+    def __init__(self):
+        self.fetched = 0
+
+    def iter_process_files(self, content_files):
+        for path in content_files:
+            self.fetched += 1
+            if path == "broken.py":
+                # Oversized file whose download fails after a few chunks' worth of lines
+                yield {'lines': self.broken_lines(), 'metadata': {'file_path': path, 'file_sha': "x", 'file_extension': 'py'}}
+                continue
+            content = "" if path == "empty.py" else f"def {path[:-3]}():\n    return {self.fetched}\n"
+            yield {'content': content, 'metadata': {'file_path': path, 'file_sha': path + "-sha", 'file_extension': 'py'}}
+
+    @staticmethod
+    def broken_lines():
+        for i in range(2000):
+            yield f"value_{i} = compute({i}, scale=2)"
+        raise ConnectionError("connection reset")
+
+
+class FakeEmbedder:
+    def generate_embeddings_batch(self, texts, token_counts=None, progress_callback=None):
+        return [[float(len(text))] for text in texts]
+
+
+class FakeStore:
+    """Slow vector store that can fail on a given batch."""
+
+    def __init__(self, normalizer, fail_on_batch=None):
+        self.normalizer = normalizer
+        self.fail_on_batch = fail_on_batch
+        self.chunks = []
+        self.max_lead = 0
+        self.deleted = 0
+
+    def add_chunks(self, chunks, embeddings):
+        if len(self.chunks) // 2 + 1 == self.fail_on_batch:
+            raise RuntimeError("upsert failed")
+        time.sleep(0.002)
+        self.chunks.extend(chunks)
+        self.max_lead = max(self.max_lead, self.normalizer.fetched - len(self.chunks))
+
+    def delete_chunks(self, chunk_ids):
+        chunk_ids = set(chunk_ids)
+        kept = [c for c in self.chunks if get_chunk_id(c) not in chunk_ids]
+        self.deleted += len(self.chunks) - len(kept)
+        self.chunks = kept
+
+
+class FakeManifest:
+    def __init__(self):
+        self.chunk_files, self.files = [], []
+
+    def record_chunks(self, chunks):
+        self.chunk_files.extend(c['metadata']['file_path'] for c in chunks)
+
+    def record_files(self, files):
+        # A file is recorded only after all of its chunks
+        assert all(f['file_path'] in self.chunk_files or f['file_path'] == "empty.py" for f in files)
+        self.files.extend(f['file_path'] for f in files)
+
+    def discard_files(self, files):
+        paths = {f['file_path'] for f in files}
+        self.chunk_files = [path for path in self.chunk_files if path not in paths]
+
+
+def make_pipeline(store, normalizer, manifest=None):
+    pipeline = IngestionPipeline(normalizer, Chunker(), FakeEmbedder(), store, manifest=manifest)
+    pipeline.deduplicator = None
+    pipeline.batch_size = 2
+    pipeline.queue_size = 2
+    return pipeline
+
+
+def test_pipeline():
+    """Test that the streaming pipeline keeps order, bounds its queues and propagates errors."""
+    print("Testing streaming ingestion pipeline")
+    print("=" * 60)
+
+    files = [f"file_{i}.py" for i in range(200)]
+    files.insert(5, "empty.py")
+    normalizer = FakeNormalizer()
+    store = FakeStore(normalizer)
+    manifest = FakeManifest()
+    stats = make_pipeline(store, normalizer, manifest).run(files)
+
+    print(f"  {stats['chunks_stored']} chunks in {stats['batches_stored']} batches; "
+          f"fetching ran at most {store.max_lead} files ahead of storage")
+    assert [c['metadata']['file_path'] for c in store.chunks] == [f for f in files if f != "empty.py"]
+    assert manifest.files == files  # Every processed file, in order, including the empty one
+    assert store.max_lead <= 20  # Bounded by the queue sizes, not the repository size
+    print("✅ Chunks stored in file order; memory bounded by the queues\n")
+
+    files.insert(50, "broken.py")
+    normalizer = FakeNormalizer()
+    store = FakeStore(normalizer)
+    manifest = FakeManifest()
+    stats = make_pipeline(store, normalizer, manifest).run(files)
+    print(f"  broken.py: {store.deleted} chunks deleted after its stream failed")
+    assert stats['files_failed'] == 1 and store.deleted > 0
+    assert [c['metadata']['file_path'] for c in store.chunks] == [f for f in files if f not in ("empty.py", "broken.py")]
+    assert "broken.py" not in manifest.files and "broken.py" not in manifest.chunk_files
+    files.remove("broken.py")
+    print("✅ A stream failing part-way leaves none of its chunks stored or recorded\n")
+
+    normalizer = FakeNormalizer()
+    store = FakeStore(normalizer, fail_on_batch=3)
+    started = time.perf_counter()
+    try:
+        make_pipeline(store, normalizer).run(files)
+        raise AssertionError("pipeline should have failed")
+    except RuntimeError as e:
+        assert str(e) == "upsert failed"
+    print(f"  failed after {len(store.chunks)} chunks, {normalizer.fetched} files fetched, "
+          f"{time.perf_counter() - started:.2f}s")
+    assert normalizer.fetched < len(files)  # Stages stopped early
+    assert threading.active_count() == 1
+    print("✅ A failing stage stops the others and its error is raised")
+
+
+if __name__ == "__main__":
+    test_pipeline()
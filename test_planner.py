@@ -0,0 +1,52 @@
+from github_rag.ingestion.planner import IngestionPlanner
+from github_rag.ingestion.repo_tree import TreeEntry
+
+
+def test_planner():
+    """Test dry-run projections from tree sizes and budget suggestions."""
+    print("Testing ingestion planner")
+    print("=" * 60)
+
+    entries = [
+        TreeEntry("README.md", "file", size=4200, sha="a" * 40),
+        TreeEntry("src/app.py", "file", size=36000, sha="b" * 40),
+        TreeEntry("src/util.py", "file", size=3600, sha="c" * 40),
+        TreeEntry("vendor/lib.js", "file", size=340000, sha="d" * 40),
+        TreeEntry("vendor/copy/lib.js", "file", size=340000, sha="d" * 40),  # Same blob
+    ]
+
+    planner = IngestionPlanner()  # No normalizer: sizes only, no sampling
+    plan = planner.plan(entries)
+
+    for key in ('files', 'tokens', 'chunks', 'embedding_tokens', 'cost_usd', 'github_requests', 'embedding_requests', 'seconds'):
+        print(f"  {key}: {plan[key]}")
+    for folder, totals in plan['folders'].items():
+        print(f"  {folder}: {totals}")
+
+    assert plan['folders']['.']['tokens'] == 1000  # 4200 bytes / 4.2 bytes per .md token
+    size, overlap = planner.chunker.chunk_size, planner.chunker.chunk_overlap
+    assert plan['folders']['.']['chunks'] == max(1, -(-(1000 - overlap) // (size - overlap)))
+    assert plan['folders']['src']['tokens'] == 11000
+    assert plan['folders']['vendor/copy']['chunks'] == plan['folders']['vendor']['chunks']
+    assert plan['folders']['vendor/copy']['embedding_tokens'] == 0  # Duplicate blob is embedded once
+    assert plan['github_requests'] <= 4
+    print("✅ Tokens and chunks projected from sizes; duplicate blobs embedded once\n")
+
+    distinct_chunks = plan['chunks'] - plan['folders']['vendor/copy']['chunks']
+    assert plan['embedding_requests'] == 1  # Every distinct chunk fits one request's token and input limits
+    planner.max_request_items = 50
+    assert planner.plan(entries)['embedding_requests'] == -(-distinct_chunks // 50)
+    planner.max_request_items, planner.max_request_tokens = 2048, 20000
+    requests = planner.plan(entries)['embedding_requests']
+    assert requests >= plan['embedding_tokens'] / 20000 and requests <= plan['embedding_tokens'] / 20000 + 4
+    print(f"✅ Embedding requests packed by token and input limits ({requests} at 20k tokens per request)\n")
+
+    assert IngestionPlanner.suggest_drops(plan, plan['cost_usd']) == []
+    budget = plan['folders']['.']['cost_usd'] + plan['folders']['src']['cost_usd']
+    assert IngestionPlanner.suggest_drops(plan, budget) == ['vendor']
+    assert IngestionPlanner.suggest_drops(plan, 0) == ['vendor', 'src', '.']
+    print("✅ Most expensive folders suggested for removal to fit a budget")
+
+
+if __name__ == "__main__":
+    test_planner()
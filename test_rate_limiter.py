@@ -0,0 +1,41 @@
+import time
+from github_rag.ingestion.rate_limiter import RateLimitScheduler
+
+
+def test_rate_limiter():
+    """Test budget tracking, pacing below the threshold, and rate-limit retries."""
+    print("Testing GitHub rate-limit scheduler")
+    print("=" * 60)
+
+    scheduler = RateLimitScheduler(max_concurrency=8, reserve=10, slowdown_threshold=0.25)
+    assert scheduler.status()['remaining'] is None and scheduler.concurrency() == 8
+
+    scheduler.update({"x-ratelimit-remaining": "4000"})  # No limit or reset header
+    status = scheduler.status()
+    assert status['limit'] is None and status['reset_in_seconds'] is None and not status['throttled']
+
+    reset = time.time() + 600
+    scheduler.update({"x-ratelimit-remaining": "4000", "x-ratelimit-limit": "5000", "x-ratelimit-reset": str(reset)})
+    assert scheduler.concurrency() == 8 and scheduler.pacing_interval() == 0
+    scheduler.update({"x-ratelimit-remaining": "510", "x-ratelimit-limit": "5000", "x-ratelimit-reset": str(reset)})
+    print(f"  510 of 5000 left: {scheduler.concurrency()} in flight, "
+          f"{scheduler.pacing_interval():.2f}s between requests")
+    assert scheduler.concurrency() == 3
+    assert abs(scheduler.pacing_interval() - 600 / 500) < 0.05  # Budget above the reserve lasts until the reset
+    print("✅ Full speed with a healthy budget; paced to last until the reset below the threshold\n")
+
+    scheduler = RateLimitScheduler(max_retries=2)
+    responses = [
+        (429, {"retry-after": "0.05", "x-ratelimit-remaining": "0"}, ""),
+        (200, {"x-ratelimit-remaining": "99", "x-ratelimit-limit": "100"}, "{}"),
+    ]
+    request = scheduler.wrap(lambda: responses.pop(0))
+    status, headers, body = request()
+    print(f"  after a 429: status {status}, waited {scheduler.seconds_waited}s")
+    assert status == 200 and scheduler.requests_made == 2 and scheduler.seconds_waited >= 0.05
+    assert scheduler.status()['remaining'] == 99
+    print("✅ Rate-limited request retried after Retry-After")
+
+
+if __name__ == "__main__":
+    test_rate_limiter()
@@ -0,0 +1,134 @@
+import base64
+import json
+from types import SimpleNamespace
+from github_rag.ingestion import repo_tree
+from github_rag.utils import http_cache
+
+# tree SHA -> direct children, as the Git Trees API returns them
+TREES = {
+    "root": [
+        {"path": "README.md", "type": "blob", "size": 120, "sha": "b-readme"},
+        {"path": "src", "type": "tree", "sha": "t-src"},
+        {"path": "docs", "type": "tree", "sha": "t-docs"},
+    ],
+    "t-src": [
+        {"path": "app.py", "type": "blob", "size": 900, "sha": "b-app"},
+        {"path": "lib", "type": "tree", "sha": "t-lib"},
+    ],
+    "t-lib": [{"path": "util.py", "type": "blob", "size": 300, "sha": "b-util"}],
+    "t-docs": [{"path": "guide.md", "type": "blob", "size": 500, "sha": "b-guide"}],
+}
+
+
+def flatten(sha, prefix=""):
+    """Recursive listing of a tree, paths relative to it."""
+    elements = []
+    for element in TREES[sha]:
+        elements.append(dict(element, path=prefix + element["path"]))
+        if element["type"] == "tree":
+            elements.extend(flatten(element["sha"], prefix + element["path"] + "/"))
+    return elements
+
+
+class FakeRequester:
+    """Serves /git/trees/<sha> like GitHub, truncating recursive listings of the given trees."""
+
+    def __init__(self, truncate=()):
+        self.truncate = set(truncate)
+        self.requests = []
+
+    def requestJson(self, verb, url, parameters=None, headers=None):
+        sha = url.rsplit('/', 1)[-1]
+        sha = "root" if sha == "main" else sha
+        recursive = bool(parameters and parameters.get("recursive"))
+        self.requests.append((sha, recursive))
+        truncated = recursive and sha in self.truncate
+        elements = flatten(sha) if recursive and not truncated else TREES[sha]
+        if truncated:
+            elements = elements[:1]
+        return 200, {}, json.dumps({"sha": sha, "tree": elements, "truncated": truncated})
+
+    def requestJsonAndCheck(self, verb, url, parameters=None, headers=None):
+        _, response_headers, output = self.requestJson(verb, url, parameters, headers)
+        return response_headers, json.loads(output)
+
+
+def fake_repo(requester):
+    return SimpleNamespace(
+        full_name="octo/demo", default_branch="main", requester=requester,
+        url="https://api.github.com/repos/octo/demo", html_url="https://github.com/octo/demo",
+        get_git_blob=lambda sha: SimpleNamespace(content=base64.b64encode(f"body of {sha}".encode()))
+    )
+
+
+def test_repo_tree():
+    """Test listing a repository from the Git Trees API, including truncated trees."""
+    print("Testing Git Trees listing")
+    print("=" * 60)
+
+    # Without the ETag cache every listing goes to the fake requester
+    get_etag_cache, http_cache.get_etag_cache = http_cache.get_etag_cache, lambda: None
+    try:
+        requester = FakeRequester()
+        entries = repo_tree.list_repo_tree(fake_repo(requester))
+        for entry in entries:
+            print(f"  {entry.type:4} {entry.path} ({entry.size} bytes)")
+        assert [e.path for e in entries] == [
+            "README.md", "docs", "docs/guide.md", "src", "src/app.py", "src/lib", "src/lib/util.py"
+        ]
+        assert requester.requests == [("root", False), ("root", True)]
+        app = next(e for e in entries if e.path == "src/app.py")
+        assert (app.type, app.size, app.sha) == ("file", 900, "b-app")
+        assert app.html_url == "https://github.com/octo/demo/blob/main/src/app.py"
+        assert app.decoded_content == b"body of b-app"  # Fetched lazily through the blobs API
+        print("✅ Whole tree listed with one recursive request\n")
+
+        repo_tree._snapshots.clear()
+        requester = FakeRequester(truncate={"root"})
+        truncated = repo_tree.list_repo_tree(fake_repo(requester))
+        assert [e.path for e in truncated] == [e.path for e in entries]
+        print(f"  truncated root: {len(requester.requests)} requests")
+        print("✅ Truncated listing completed by walking subtrees")
+    finally:
+        http_cache.get_etag_cache = get_etag_cache
+        repo_tree._snapshots.clear()
+
+
+def test_tree_snapshot():
+    """Test snapshot reuse per tree SHA and lazy expansion of selected folders."""
+    print("Testing repository tree snapshots")
+    print("=" * 60)
+
+    get_etag_cache, http_cache.get_etag_cache = http_cache.get_etag_cache, lambda: None
+    try:
+        requester = FakeRequester()
+        repo = fake_repo(requester)
+        snapshot = repo_tree.get_tree_snapshot(repo, lazy=False)
+        assert repo_tree.get_tree_snapshot(repo, lazy=False) is snapshot
+        assert requester.requests == [("root", False), ("root", True), ("root", False)]
+        summary = snapshot.folder_summary()
+        assert summary["src/lib"] == {'count': 1, 'extensions': [".py"]}
+        assert [e.path for e in snapshot.files_under(["src"])] == ["src/app.py", "src/lib/util.py"]
+        print("✅ Snapshot reused for an unchanged tree; folder queries answered locally\n")
+
+        repo_tree._snapshots.clear()
+        requester = FakeRequester()
+        lazy = repo_tree.get_tree_snapshot(fake_repo(requester), lazy=True)
+        summary = lazy.folder_summary()
+        print(f"  lazy root: {summary}")
+        assert summary["src"]['count'] is None and not lazy.fully_listed
+        assert [e.path for e in lazy.files_under(["docs"])] == ["docs/guide.md"]
+        assert requester.requests == [("root", False), ("t-docs", True)]  # src never listed
+        assert [e.path for e in lazy.files_above("README.md", ["src/lib"])] == ["README.md"]
+        assert len(requester.requests) == 2  # Looking up files above a folder lists nothing
+        assert len(lazy.files_under(["."])) == 4 and lazy.fully_listed
+        print("✅ Lazy snapshots list only the folders that are selected")
+    finally:
+        http_cache.get_etag_cache = get_etag_cache
+        repo_tree._snapshots.clear()
+
+
+if __name__ == "__main__":
+    test_repo_tree()
+    print()
+    test_tree_snapshot()
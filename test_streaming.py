@@ -0,0 +1,122 @@
+import random
+import tempfile
+from github_rag.ingestion.chunker import Chunker
+from github_rag.ingestion.content_normalizer import ContentNormalizer
+from github_rag.ingestion.github_client import GitHubClient
+from github_rag.ingestion.repo_tree import TreeEntry
+from github_rag.utils.blob_cache import BlobCache
+
+WORDS = ["def", "return", "self", "x", "=", "(", ")", "naïve", "日本語", "🙂", "Ünïcode", "{", "}", "#", "0x1F"]
+
+
+def random_text(rng):
+    """Random source-like text: indented lines, blank runs, trailing whitespace, multi-byte characters."""
+    lines = []
+    for _ in range(rng.randint(0, 120)):
+        kind = rng.random()
+        if kind < 0.2:
+            lines.extend([rng.choice(["", "  ", "\t"])] * rng.randint(1, 5))
+        elif kind < 0.25:
+            lines.append("".join(rng.choice(WORDS) for _ in range(rng.randint(100, 300))))  # Long line
+        else:
+            words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+            lines.append(" " * rng.randint(0, 8) + words + rng.choice(["", " ", "\t ", "  "]))
+    return "\n".join(lines) + rng.choice(["", "\n", "\n\n\n"])
+
+
+def random_blocks(data, rng):
+    """Split bytes at random offsets, often inside multi-byte characters."""
+    blocks, start = [], 0
+    while start < len(data):
+        end = start + rng.randint(1, 64)
+        blocks.append(data[start:end])
+        start = end
+    return blocks
+
+
+def make_client(directory, rng, fail_after=None):
+    """GitHubClient whose blob downloads come in random blocks, cached in a temporary blob cache."""
+    client = GitHubClient()
+    client.blob_cache = BlobCache(directory, max_size_mb=16)
+    client.bodies = {}
+    client.downloads = 0
+
+    def stream_blob(url, chunk_size):
+        client.downloads += 1
+        for i, block in enumerate(random_blocks(client.bodies[url], rng)):
+            if fail_after is not None and i == fail_after:
+                raise ConnectionError("connection reset")
+            yield block
+
+    client._stream_blob = stream_blob
+    return client
+
+
+def blob(client, path, text, sha):
+    url = f"https://api.github.com/repos/octo/demo/git/blobs/{sha}"
+    client.bodies[url] = text.encode('utf-8')
+    return TreeEntry(path, "file", size=len(client.bodies[url]), sha=sha, git_url=url)
+
+
+def test_stream_equivalence():
+    """Test that the streaming path matches normalize_content and chunks within exact token counts."""
+    print("Testing streamed content against the in-memory path")
+    print("=" * 60)
+
+    rng = random.Random(20261017)
+    chunker = Chunker()
+    chunker.chunk_size = rng.choice([40, 64, 100])
+    chunker.chunk_overlap = chunker.chunk_size // 5
+    with tempfile.TemporaryDirectory() as directory:
+        client = make_client(directory, rng)
+        normalizer = ContentNormalizer(client)
+        chunks_seen = 0
+        for i in range(150):
+            text = random_text(rng)
+            content_file = blob(client, f"src/file_{i}.py", text, sha=f"{i:040x}")
+            expected = normalizer.normalize_content(text, content_file.path)
+
+            # Downloaded (and cached through put_stream) in random blocks, then read back from the cache
+            for attempt in range(2):
+                pieces = client.iter_file_content(content_file, chunk_size=rng.randint(1, 64))
+                lines = list(normalizer.iter_normalized_lines(pieces, max_line_length=1 << 20))
+                assert "\n".join(lines) == expected, content_file.path
+            assert client.downloads == i + 1  # The second read came from the cache
+            assert client.blob_cache.get(content_file.sha) == text.encode('utf-8')
+
+            metadata = normalizer.create_file_metadata(content_file)
+            for chunk in chunker.split_stream(normalizer.iter_file_lines(content_file), metadata):
+                tokens = len(chunker.encoder.encode_ordinary(chunk['content']))
+                assert chunk['metadata']['token_count'] == tokens, (content_file.path, chunk['metadata'])
+                assert tokens <= chunker.chunk_size, (tokens, chunk["metadata"], chunk["content"][:300])
+                chunks_seen += 1
+    print(f"  150 random files, chunk_size {chunker.chunk_size}: {chunks_seen} streamed chunks")
+    print("✅ Streamed lines equal normalize_content; token counts exact and within chunk_size")
+
+
+def test_stream_failure():
+    """Test that a download failing part-way raises and leaves nothing cached."""
+    print("Testing a stream that fails part-way")
+    print("=" * 60)
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        client = make_client(directory, rng, fail_after=3)
+        normalizer = ContentNormalizer(client)
+        content_file = blob(client, "src/big.py", "def f():\n    return 1\n" * 50, sha="ab" * 20)
+        lines = []
+        try:
+            for line in normalizer.iter_file_lines(content_file):
+                lines.append(line)
+            raise AssertionError("a truncated stream ended normally")
+        except ConnectionError:
+            pass
+        print(f"  failed after {len(lines)} lines")
+        assert content_file.sha not in client.blob_cache
+    print("✅ The error reaches the consumer; the partial body is not cached")
+
+
+if __name__ == "__main__":
+    test_stream_equivalence()
+    print()
+    test_stream_failure()
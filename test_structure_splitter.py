@@ -0,0 +1,123 @@
+from github_rag.ingestion.structure_splitter import split_python, split_braces, split_markdown
+
+
+PYTHON_SOURCE = '''import os
+
+
+# Helper with a leading comment
+@decorator
+def helper(x):
+    return x
+
+
+class Service:
+    """Docstring."""
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+'''
+
+TS_SOURCE = '''import { a } from "./a";
+
+// Adds numbers { not a brace
+export function add(a: number, b: number) {
+  const s = "}";
+  return a + b;
+}
+
+@Component({
+  selector: "app"
+})
+export class App {
+  run() {
+    if (ready) { return '{'; }
+  }
+}
+'''
+
+REGEX_SOURCE = '''const open = /[{]/;
+const close = str.replace(/}+$/g, "");
+
+function first() {
+  return /\\/(\\w+)/.exec(path);
+}
+
+function second() {
+  return total / count / 2;
+}
+'''
+
+MARKDOWN_SOURCE = '''Intro
+# Guide
+Overview
+## Install
+```
+# not a heading
+```
+## Usage
+Run it
+'''
+
+
+def describe(blocks, lines, indent=""):
+    for block in blocks:
+        print(f"{indent}lines {block.start}-{block.end}: {lines[block.start].strip()[:40]!r}")
+        describe(block.children, lines, indent + "    ")
+
+
+def assert_covers(blocks, start, end):
+    """Blocks must cover start..end contiguously, and so must every block's children."""
+    assert blocks[0].start == start and blocks[-1].end == end
+    for prev, block in zip(blocks, blocks[1:]):
+        assert block.start == prev.end + 1
+    for block in blocks:
+        if block.children:
+            assert_covers(block.children, block.start, block.end)
+
+
+def test_structure_splitters():
+    """Test that structure splitters keep declarations whole and cover every line."""
+    print("Testing structure splitters")
+    print("=" * 60)
+
+    lines = PYTHON_SOURCE.split("\n")
+    blocks = split_python(PYTHON_SOURCE)
+    describe(blocks, lines)
+    assert_covers(blocks, 0, len(lines) - 1)
+    assert [b.start for b in blocks] == [0, 1, 7]  # comment and decorator stay with helper()
+    assert len(blocks[2].children) == 3  # docstring, start(), stop()
+    assert split_python("def broken(:\n") is None
+    print("✅ Python: definitions, decorators and comments kept together\n")
+
+    lines = TS_SOURCE.split("\n")
+    blocks = split_braces(TS_SOURCE)
+    describe(blocks, lines)
+    assert_covers(blocks, 0, len(lines) - 1)
+    add = next(b for b in blocks if b.start <= 3 <= b.end)
+    assert add.start <= 2 and add.end == 6  # braces inside strings/comments ignored
+    app = next(b for b in blocks if b.start <= 8 <= b.end)
+    assert app.end == 16  # decorator stays with the class
+    print("✅ Braces: strings, comments and decorators handled\n")
+
+    lines = REGEX_SOURCE.split("\n")
+    blocks = split_braces(REGEX_SOURCE)
+    describe(blocks, lines)
+    assert [(b.start, b.end) for b in blocks] == [(0, 0), (1, 1), (2, 5), (6, 10)]
+    assert split_braces("function f() {\n  if (x) {\n}\n") is None
+    assert split_braces("}\nfunction f() {}\n") is None
+    print("✅ Braces: regex literals skipped, unbalanced sources fall back\n")
+
+    lines = MARKDOWN_SOURCE.split("\n")
+    blocks = split_markdown(MARKDOWN_SOURCE)
+    describe(blocks, lines)
+    assert_covers(blocks, 0, len(lines) - 1)
+    guide = blocks[-1]
+    assert [lines[c.start] for c in guide.children][1:] == ["## Install", "## Usage"]
+    print("✅ Markdown: sections nest by heading level, fenced code ignored")
+
+
+if __name__ == "__main__":
+    test_structure_splitters()
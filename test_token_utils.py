@@ -0,0 +1,78 @@
+from github_rag.utils.token_estimator import TokenEstimator
+from github_rag.utils.token_utils import TokenCounter
+
+
+def test_truncate_chunks():
+    """Test that the last chunk is cut at the token limit, dropping only a word the cut split."""
+    print("Testing prompt chunk truncation")
+    print("=" * 60)
+
+    words = ("retrieval", "chunk", "a", "tokenizer", "über", "naïve", "index", "on", "embedding", "𝔘nicode")
+    content = " ".join(words[i % len(words)] for i in range(200))
+    counter = TokenCounter(max_tokens=100)
+    count = counter.count_tokens
+
+    for max_tokens in range(80, 180):
+        counter.max_tokens = max_tokens
+        limit = max_tokens - 50 - count("system") - count("query") - count("...")
+        [chunk] = counter.truncate_chunks([{'content': content}], "system", "query")
+        kept = chunk['content'][:-len("...")]
+        rest = content[len(kept):]
+
+        assert content.startswith(kept) and rest[:1] == " "  # Whole words only
+        assert count(kept) <= limit
+        next_word = rest.split()[0]
+        assert count(kept + " " + next_word) > limit  # The next whole word did not fit
+    print("✅ Truncated chunks keep every whole word that fits, and no partial ones")
+
+
+
+class UnderEstimator(TokenEstimator):
+    """Estimator whose predictions are far too low, as an uncalibrated extension can be."""
+
+    def estimate(self, text, extension=""):
+        return super().estimate(text, extension) * 0.3
+
+
+def test_estimated_fit():
+    """Test that estimates only choose what to count, and calibration counts chunks once."""
+    print("Testing estimated prompt budgets")
+    print("=" * 60)
+
+    counter = TokenCounter(max_tokens=100)
+    counter.estimator = TokenEstimator(counter.tokenizer)
+    chunks = [
+        {'content': f"def handler_{i}(request):\n    return render(request, 'page_{i}.html')\n" * 3,
+         'metadata': {'file_extension': "py"}}
+        for i in range(8)
+    ]
+    encode = counter.tokenizer.encoder.encode_ordinary  # Bypasses the count cache
+    calibrated = [dict(c, metadata={'file_extension': "py", 'token_count': len(encode(c['content']))}) for c in chunks]
+    counter.estimator.calibrate(calibrated)
+    samples = counter.estimator.stats()['samples']
+    counter.estimator.calibrate(calibrated)
+    assert samples == len(chunks) and counter.estimator.stats()['samples'] == samples
+    print("✅ Calibrating on the same chunks again adds no samples\n")
+
+    exact = sum(c['metadata']['token_count'] for c in calibrated)
+    assert counter._count_candidates(chunks, exact * 2) == [c['metadata']['token_count'] for c in calibrated]
+    assert len(counter._count_candidates(chunks, exact // 2)) < len(chunks)
+    under = UnderEstimator(counter.tokenizer)
+    under.calibrate(calibrated)
+    count = counter.count_tokens
+    for estimator in (counter.estimator, under):
+        for max_tokens in range(exact // 2, exact * 2 + 100, 23):
+            counter.max_tokens = max_tokens
+            counter.estimator = estimator
+            with_estimates = counter.truncate_chunks(chunks, "system", "query")
+            counter.estimator = None
+            assert with_estimates == counter.truncate_chunks(chunks, "system", "query")
+            available = max_tokens - count("system") - count("query") - 50
+            assert sum(count(c['content']) for c in with_estimates) <= available
+    print(f"✅ Prompts of {exact // 2}-{exact * 2} tokens: same chunks as exact counting, even with estimates 70% low")
+
+
+if __name__ == "__main__":
+    test_truncate_chunks()
+    print()
+    test_estimated_fit()